@@ -0,0 +1,18 @@
+(function () {
+    'use strict';
+
+    function ready(fn) {
+        if (document.readyState !== 'loading') {
+            fn();
+        } else {
+            document.addEventListener('DOMContentLoaded', fn);
+        }
+    }
+
+    ready(function () {
+        var forms = document.querySelectorAll('form');
+        for (var i = 0; i < forms.length; i++) {
+            forms[i].setAttribute('autocomplete', 'off');
+        }
+    });
+})();
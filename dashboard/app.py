@@ -5,7 +5,7 @@ import sys
 import json
 import yaml
 from datetime import datetime, timedelta
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, Response, render_template, jsonify, request
 from flask_cors import CORS
 from flask_socketio import SocketIO, emit
 import threading
@@ -16,6 +16,8 @@ import logging
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from honeypots.threat_intelligence import ThreatIntelligence, AttackAnalyzer
+from honeypots.recordings import find_recording, list_recordings, to_asciicast
+from honeypots.payloads import find_payload, list_payloads
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your-secret-key-change-this'
@@ -28,6 +30,7 @@ threat_intel = None
 attack_analyzer = None
 recent_attacks = []
 attack_stats = {}
+log_offsets = {}
 
 def load_config():
     """Load configuration"""
@@ -44,36 +47,50 @@ def init_threat_intelligence():
     threat_intel.start_auto_update()
 
 def read_log_files():
-    """Read and parse log files"""
+    """Read and parse new entries from the log files"""
     global recent_attacks, attack_stats
     
     log_files = [
         'logs/ssh_honeypot.log',
         'logs/http_honeypot.log',
+        'logs/https_honeypot.log',
         'logs/ftp_honeypot.log',
         'logs/telnet_honeypot.log'
     ]
     
-    all_attacks = []
+    new_attacks = []
     
     for log_file in log_files:
         if os.path.exists(log_file):
             try:
-                with open(log_file, 'r') as f:
+                # Only analyze lines appended since the last pass so streaming
+                # statistics count every event exactly once
+                offset = log_offsets.get(log_file, 0)
+                if offset > os.path.getsize(log_file):
+                    offset = 0  # File was truncated or rotated
+                
+                with open(log_file, 'rb') as f:
+                    f.seek(offset)
                     for line in f:
+                        if not line.endswith(b'\n'):
+                            break  # Partially written line, retry next pass
+                        offset += len(line)
                         line = line.strip()
                         if line:
                             try:
                                 log_entry = json.loads(line)
                                 analysis = attack_analyzer.analyze_attack(log_entry)
                                 if analysis:
-                                    all_attacks.append(analysis)
+                                    new_attacks.append(analysis)
                             except json.JSONDecodeError:
                                 continue
+                
+                log_offsets[log_file] = offset
             except Exception as e:
                 logging.error(f"Error reading {log_file}: {e}")
     
     # Sort by timestamp and keep recent attacks
+    all_attacks = new_attacks + recent_attacks
     all_attacks.sort(key=lambda x: x['timestamp'], reverse=True)
     recent_attacks = all_attacks[:100]  # Keep last 100 attacks
     
@@ -95,6 +112,16 @@ def log_monitor_thread():
             logging.error(f"Error in log monitor: {e}")
             time.sleep(10)
 
+def campaign_cluster_thread():
+    """Background thread to regroup attackers into campaigns"""
+    interval = config.get('campaigns', {}).get('recluster_interval', 60)
+    while True:
+        try:
+            time.sleep(interval)
+            attack_analyzer.campaigns.recluster()
+        except Exception as e:
+            logging.error(f"Error in campaign clustering: {e}")
+
 @app.route('/')
 def dashboard():
     """Main dashboard page"""
@@ -126,6 +153,113 @@ def get_top_attackers():
         'top_attackers': attack_analyzer.get_top_attackers() if attack_analyzer else []
     })
 
+@app.route('/api/campaigns')
+def get_campaigns():
+    """Get attacker campaigns grouped by shared credentials, commands and paths"""
+    limit = request.args.get('limit', 50, type=int)
+    campaigns = attack_analyzer.campaigns.get_campaigns(limit) if attack_analyzer else []
+    return jsonify({
+        'campaigns': campaigns,
+        'total': len(attack_analyzer.campaigns.campaigns) if attack_analyzer else 0
+    })
+
+@app.route('/api/credentials')
+def get_credentials():
+    """Get the most attempted usernames, passwords and pairs"""
+    if not attack_analyzer:
+        return jsonify({'error': 'Attack analyzer not available'})
+    
+    service = request.args.get('service')
+    day = request.args.get('day', datetime.utcnow().strftime('%Y-%m-%d'))
+    limit = request.args.get('limit', 10, type=int)
+    return jsonify({
+        'service': service,
+        'day': day,
+        'credentials': attack_analyzer.credential_stats.summary(service, day, limit),
+        'buckets': attack_analyzer.credential_stats.buckets_available()
+    })
+
+@app.route('/api/credentials/spraying')
+def get_credential_spraying():
+    """Get credential pairs tried from many distinct source IPs"""
+    limit = request.args.get('limit', 20, type=int)
+    return jsonify({
+        'spraying': attack_analyzer.spray_detector.get_spraying(limit) if attack_analyzer else [],
+        'threshold': attack_analyzer.spray_detector.threshold if attack_analyzer else None
+    })
+
+@app.route('/api/credentials/sketch', methods=['GET'])
+def export_credential_sketch():
+    """Export credential sketches for merging on another sensor"""
+    if not attack_analyzer:
+        return jsonify({'error': 'Attack analyzer not available'})
+    return jsonify(attack_analyzer.credential_stats.export())
+
+@app.route('/api/credentials/sketch', methods=['POST'])
+def merge_credential_sketch():
+    """Merge credential sketches exported by another sensor"""
+    if not attack_analyzer:
+        return jsonify({'error': 'Attack analyzer not available'})
+    try:
+        attack_analyzer.credential_stats.merge(request.get_json(force=True))
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid sketch: {e}'}), 400
+    return jsonify({'merged': True, 'buckets': attack_analyzer.credential_stats.buckets_available()})
+
+@app.route('/api/signatures')
+def get_signatures():
+    """Get loaded attack signature categories"""
+    return jsonify({
+        'signatures': attack_analyzer.signatures.describe() if attack_analyzer else {}
+    })
+
+def recordings_directory():
+    """Directory holding session recordings"""
+    return (config or {}).get('recordings', {}).get('directory', 'recordings')
+
+@app.route('/api/recordings')
+def get_recordings():
+    """List recorded SSH/Telnet sessions, newest first"""
+    service = request.args.get('service')
+    limit = request.args.get('limit', 50, type=int)
+    recordings = list_recordings(recordings_directory(), service, limit)
+    return jsonify({
+        'recordings': [
+            {'session_id': item['session_id'], 'bytes': item['bytes']} for item in recordings
+        ]
+    })
+
+@app.route('/api/recordings/<session_id>/asciicast')
+def export_recording(session_id):
+    """Export a recorded session as asciicast v2"""
+    path = find_recording(recordings_directory(), session_id)
+    if path is None:
+        return jsonify({'error': 'Recording not found'}), 404
+    return Response(
+        to_asciicast(path),
+        mimetype='application/x-asciicast',
+        headers={'Content-Disposition': f'attachment; filename={session_id}.cast'}
+    )
+
+def payloads_directory():
+    """Directory holding the payload store"""
+    return (config or {}).get('payloads', {}).get('directory', 'payloads')
+
+@app.route('/api/payloads')
+def get_payloads():
+    """List captured payloads by hash, most recently seen first"""
+    kind = request.args.get('kind')
+    limit = request.args.get('limit', 50, type=int)
+    return jsonify({'payloads': list_payloads(payloads_directory(), kind, limit)})
+
+@app.route('/api/payloads/<sha256>')
+def get_payload(sha256):
+    """Index record of one captured payload"""
+    payload = find_payload(payloads_directory(), sha256)
+    if payload is None:
+        return jsonify({'error': 'Payload not found'}), 404
+    return jsonify(payload)
+
 @app.route('/api/geolocation/<ip>')
 def get_ip_geolocation(ip):
     """Get geolocation for specific IP"""
@@ -548,6 +682,12 @@ def main():
     monitor_thread.daemon = True
     monitor_thread.start()
     
+    # Start campaign clustering thread
+    if config.get('campaigns', {}).get('enabled', True):
+        campaign_thread = threading.Thread(target=campaign_cluster_thread)
+        campaign_thread.daemon = True
+        campaign_thread.start()
+    
     # Get dashboard configuration
     dashboard_config = config.get('dashboard', {})
     host = dashboard_config.get('host', '0.0.0.0')
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+
+import os
+import time
+import logging
+import ipaddress
+import threading
+from collections import Counter, OrderedDict
+
+DEFAULT_ADMISSION = {
+    'enabled': True,
+    'rate': 2.0,
+    'burst': 20,
+    'max_concurrent_per_ip': 10,
+    'allowlist': [],
+    'max_tracked_ips': 50000,
+    'idle_expiry': 600,
+    'summary_window': 60
+}
+
+
+class AdmissionController:
+    """Per-IP admission control shared by the honeypot listeners.
+
+    Each source IP gets a token bucket limiting how fast it may open
+    connections and a cap on concurrent sessions. State lives in a bounded
+    table that evicts the least recently seen IP and forgets idle ones.
+    Refused connections are not logged one by one; a single rate_limited
+    event per service summarizes each window, closed by a timer thread so
+    the last window is reported even after traffic stops. With a tarpit attached,
+    refused connections and sources it has flagged are handed to it
+    instead of being closed.
+    """
+
+    def __init__(self, service, config=None, log_event=None, tarpit=None):
+        settings = dict(DEFAULT_ADMISSION)
+        settings.update((config or {}).get('admission', {}))
+        settings.update((config or {}).get('honeypot', {}).get(service, {}).get('admission', {}))
+
+        self.service = service
+        self.enabled = settings['enabled']
+        self.rate = float(settings['rate'])
+        self.burst = float(settings['burst'])
+        self.max_concurrent = settings['max_concurrent_per_ip']
+        self.max_tracked = settings['max_tracked_ips']
+        self.idle_expiry = settings['idle_expiry']
+        self.summary_window = settings['summary_window']
+        self.allowlist = [ipaddress.ip_network(entry, strict=False) for entry in settings['allowlist']]
+        self.log_event = log_event
+        self.tarpit = tarpit
+        self.logger = logging.getLogger(f'{service}_Admission')
+
+        # ip -> [tokens, last_refill, active_sessions]
+        self.table = OrderedDict()
+        self.dropped = Counter()
+        self.dropped_reasons = Counter()
+        self.window_start = time.monotonic()
+        self.timer_pid = None
+        self.lock = threading.Lock()
+
+    def _allowlisted(self, client_ip):
+        """Whether an IP belongs to one of our own scanners"""
+        if not self.allowlist:
+            return False
+        try:
+            address = ipaddress.ip_address(client_ip)
+        except ValueError:
+            return False
+        return any(address in network for network in self.allowlist)
+
+    def admit(self, client_ip):
+        """Decide whether a new connection from client_ip may be served.
+
+        An admitted connection holds a concurrency slot until release().
+        """
+        if not self.enabled or self._allowlisted(client_ip):
+            return True
+
+        now = time.monotonic()
+        with self.lock:
+            entry = self.table.get(client_ip)
+            if entry is None:
+                entry = [self.burst, now, 0]
+                self.table[client_ip] = entry
+                if len(self.table) > self.max_tracked:
+                    self._evict()
+            else:
+                self.table.move_to_end(client_ip)
+                entry[0] = min(self.burst, entry[0] + (now - entry[1]) * self.rate)
+                entry[1] = now
+
+            if self.tarpit is not None and self.tarpit.wants(self.service, client_ip):
+                reason = 'tarpit'
+            elif entry[2] >= self.max_concurrent:
+                reason = 'concurrency'
+            elif entry[0] < 1:
+                reason = 'rate'
+            else:
+                entry[0] -= 1
+                entry[2] += 1
+                reason = None
+
+            if reason:
+                self.dropped[client_ip] += 1
+                self.dropped_reasons[reason] += 1
+            summary = self._roll_window(now)
+
+        if summary:
+            self._log_summary(summary)
+        if reason and self.timer_pid != os.getpid():
+            self._start_timer()
+        return reason is None
+
+    def _evict(self):
+        """Forget the least recently seen IP without live sessions (lock held).
+
+        IPs holding sessions stay, or their later release() would find no
+        entry; they are bounded by the connection pools anyway.
+        """
+        for client_ip, entry in self.table.items():
+            if entry[2] == 0:
+                del self.table[client_ip]
+                return
+
+    def _start_timer(self):
+        """Start the thread closing summary windows (one per process)"""
+        with self.lock:
+            if self.timer_pid == os.getpid():
+                return
+            self.timer_pid = os.getpid()
+        timer = threading.Thread(target=self._timer, name=f'{self.service}_Admission')
+        timer.daemon = True
+        timer.start()
+
+    def _timer(self):
+        while True:
+            time.sleep(max(1, self.summary_window / 4))
+            self.flush(force=False)
+
+    def flush(self, force=True):
+        """Report the open summary window; by default even if it has not elapsed"""
+        with self.lock:
+            summary = self._roll_window(time.monotonic(), force)
+        if summary:
+            self._log_summary(summary)
+
+    def refuse(self, client_socket, client_ip):
+        """Dispose of a connection admit() turned down"""
+        if self.tarpit is not None:
+            self.tarpit.hold(client_socket, client_ip, self.service)
+        client_socket.close()
+
+    def release(self, client_ip):
+        """Free the concurrency slot held by an admitted connection"""
+        if not self.enabled:
+            return
+        with self.lock:
+            entry = self.table.get(client_ip)
+            if entry is not None and entry[2] > 0:
+                entry[2] -= 1
+
+    def _roll_window(self, now, force=False):
+        """Close the summary window if it has elapsed, or now if forced (lock held)"""
+        if not force and now - self.window_start < self.summary_window:
+            return None
+
+        summary = None
+        if self.dropped:
+            summary = {
+                'window_seconds': round(now - self.window_start),
+                'dropped_connections': sum(self.dropped.values()),
+                'distinct_sources': len(self.dropped),
+                'reasons': dict(self.dropped_reasons),
+                'top_sources': [
+                    {'source_ip': ip, 'dropped': count}
+                    for ip, count in self.dropped.most_common(10)
+                ]
+            }
+        self.dropped = Counter()
+        self.dropped_reasons = Counter()
+        self.window_start = now
+        self._expire(now)
+        return summary
+
+    def _expire(self, now):
+        """Forget idle IPs whose bucket has refilled (lock held)"""
+        for client_ip, entry in list(self.table.items()):
+            if now - entry[1] < self.idle_expiry:
+                break
+            if entry[2] == 0:
+                del self.table[client_ip]
+
+    def _log_summary(self, summary):
+        """Log one rate_limited event for the closed window"""
+        self.logger.warning(
+            f"Refused {summary['dropped_connections']} {self.service} connections "
+            f"from {summary['distinct_sources']} sources"
+        )
+        if self.log_event:
+            self.log_event('rate_limited', '0.0.0.0', **summary)
+
+    def guard(self, handler):
+        """Wrap a threaded connection handler so it releases its slot"""
+        def guarded(client_socket, client_address):
+            try:
+                handler(client_socket, client_address)
+            finally:
+                self.release(client_address[0])
+        return guarded
+
+    def guard_async(self, handler):
+        """Wrap an asyncio connection handler with admission control"""
+        async def guarded(reader, writer):
+            client_ip = writer.get_extra_info('peername')[0]
+            if not self.admit(client_ip):
+                if self.tarpit is not None:
+                    self.tarpit.hold(writer.get_extra_info('socket'), client_ip, self.service)
+                writer.close()
+                return
+            try:
+                await handler(reader, writer)
+            finally:
+                self.release(client_ip)
+        return guarded
+
+    def stats(self):
+        """Current table size and refusals in the open window"""
+        with self.lock:
+            return {
+                'tracked_ips': len(self.table),
+                'dropped_in_window': sum(self.dropped.values())
+            }
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+
+import hashlib
+import logging
+import random
+import threading
+from collections import Counter, OrderedDict
+
+# Mersenne prime used for the universal hash family
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+class MinHasher:
+    """MinHash signatures over sets of string indicators"""
+
+    def __init__(self, num_perm=64, seed=1):
+        self.num_perm = num_perm
+        rng = random.Random(seed)
+        self._permutations = [
+            (rng.randint(1, _MERSENNE_PRIME - 1), rng.randint(0, _MERSENNE_PRIME - 1))
+            for _ in range(num_perm)
+        ]
+
+    def _base_hash(self, token):
+        """Hash a token to a 32-bit integer"""
+        digest = hashlib.blake2b(token.encode('utf-8', errors='ignore'), digest_size=4).digest()
+        return int.from_bytes(digest, 'little')
+
+    def signature(self, tokens):
+        """Compute the MinHash signature of a set of tokens"""
+        hashes = [self._base_hash(token) for token in tokens]
+        return tuple(
+            min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+            for a, b in self._permutations
+        )
+
+
+class CampaignClusterer:
+    """Group attacking sources into campaigns with MinHash and LSH banding.
+
+    Each source IP is represented by the set of indicators it used
+    (credential pairs, shell commands, HTTP paths). Sources whose signatures
+    collide in at least one LSH band are merged, so clustering is near
+    linear in the number of sources instead of comparing every pair.
+    """
+
+    def __init__(self, config=None):
+        campaign_config = (config or {}).get('campaigns', {})
+        self.num_perm = campaign_config.get('num_perm', 64)
+        self.bands = campaign_config.get('bands', 16)
+        self.rows = max(1, self.num_perm // self.bands)
+        self.min_indicators = campaign_config.get('min_indicators', 3)
+        self.min_members = campaign_config.get('min_members', 2)
+        self.max_sources = campaign_config.get('max_sources', 50000)
+        self.max_indicators_per_source = campaign_config.get('max_indicators_per_source', 256)
+
+        self.logger = logging.getLogger('CampaignClusterer')
+        self.hasher = MinHasher(self.num_perm)
+        self.sources = OrderedDict()
+        self.signatures = {}
+        self.campaigns = []
+        self.lock = threading.Lock()
+
+    def _extract_indicators(self, log_entry):
+        """Extract clustering indicators from a log entry"""
+        event_type = log_entry.get('event_type')
+        indicators = []
+
+        if event_type == 'login_attempt' and log_entry.get('password') is not None:
+            indicators.append(f"cred:{log_entry.get('username', '')}:{log_entry.get('password')}")
+        elif event_type == 'command_executed' and log_entry.get('command'):
+            indicators.append(f"cmd:{log_entry['command']}")
+        elif event_type == 'http_request' and log_entry.get('path'):
+            indicators.append(f"path:{log_entry['path']}")
+
+        return indicators
+
+    def add_event(self, log_entry):
+        """Record the indicators of a log entry against its source"""
+        source_ip = log_entry.get('source_ip')
+        indicators = self._extract_indicators(log_entry)
+        if not source_ip or not indicators:
+            return
+
+        timestamp = log_entry.get('timestamp')
+        with self.lock:
+            source = self.sources.get(source_ip)
+            if source is None:
+                source = {
+                    'indicators': set(),
+                    'services': set(),
+                    'first_seen': timestamp,
+                    'last_seen': timestamp
+                }
+                self.sources[source_ip] = source
+                if len(self.sources) > self.max_sources:
+                    evicted_ip, _ = self.sources.popitem(last=False)
+                    self.signatures.pop(evicted_ip, None)
+            else:
+                self.sources.move_to_end(source_ip)
+
+            source['last_seen'] = timestamp
+            source['services'].add(log_entry.get('service'))
+            for indicator in indicators:
+                if (indicator not in source['indicators']
+                        and len(source['indicators']) < self.max_indicators_per_source):
+                    source['indicators'].add(indicator)
+                    # Signature is recomputed on the next clustering pass
+                    self.signatures.pop(source_ip, None)
+
+    def recluster(self):
+        """Rebuild campaigns from the current source indicators"""
+        with self.lock:
+            snapshot = {
+                ip: (frozenset(source['indicators']), self.signatures.get(ip))
+                for ip, source in self.sources.items()
+                if len(source['indicators']) >= self.min_indicators
+            }
+
+        # Only sources whose indicators changed need a new signature
+        signatures = {}
+        for ip, (indicators, signature) in snapshot.items():
+            signatures[ip] = signature or self.hasher.signature(indicators)
+
+        parent = {ip: ip for ip in signatures}
+
+        def find(ip):
+            while parent[ip] != ip:
+                parent[ip] = parent[parent[ip]]
+                ip = parent[ip]
+            return ip
+
+        for band in range(self.bands):
+            start = band * self.rows
+            buckets = {}
+            for ip, signature in signatures.items():
+                key = signature[start:start + self.rows]
+                first = buckets.setdefault(key, ip)
+                if first != ip:
+                    root_a, root_b = find(first), find(ip)
+                    if root_a != root_b:
+                        parent[root_b] = root_a
+
+        groups = {}
+        for ip in signatures:
+            groups.setdefault(find(ip), []).append(ip)
+
+        with self.lock:
+            for ip, signature in signatures.items():
+                # Indicators added since the snapshot invalidate the signature
+                source = self.sources.get(ip)
+                if source is not None and source['indicators'] == snapshot[ip][0]:
+                    self.signatures[ip] = signature
+            campaigns = [
+                self._describe_campaign(members, snapshot)
+                for members in groups.values()
+                if len(members) >= self.min_members
+            ]
+
+        campaigns.sort(key=lambda campaign: campaign['size'], reverse=True)
+        self.campaigns = campaigns
+        self.logger.info(f"Clustered {len(signatures)} sources into {len(campaigns)} campaigns")
+        return campaigns
+
+    def _describe_campaign(self, members, snapshot):
+        """Summarize a group of sources as a campaign"""
+        indicator_counts = Counter()
+        for ip in members:
+            indicator_counts.update(snapshot[ip][0])
+
+        sources = [self.sources.get(ip, {}) for ip in members]
+        first_seen = min((s.get('first_seen') or '' for s in sources), default='')
+        founder = min(members, key=lambda ip: self.sources.get(ip, {}).get('first_seen') or '')
+        services = set()
+        for source in sources:
+            services.update(service for service in source.get('services', ()) if service)
+
+        return {
+            'id': 'campaign-' + hashlib.sha1(founder.encode()).hexdigest()[:12],
+            'size': len(members),
+            'member_ips': sorted(members),
+            'services': sorted(services),
+            'first_seen': first_seen,
+            'last_seen': max((s.get('last_seen') or '' for s in sources), default=''),
+            'shared_indicators': [
+                {
+                    'type': indicator.split(':', 1)[0],
+                    'indicator': indicator.split(':', 1)[1],
+                    'sources': count
+                }
+                for indicator, count in indicator_counts.most_common(20)
+                if count >= 2
+            ]
+        }
+
+    def get_campaigns(self, limit=50, max_members=100):
+        """Get the most recently computed campaigns"""
+        return [
+            {**campaign, 'member_ips': campaign['member_ips'][:max_members]}
+            for campaign in self.campaigns[:limit]
+        ]
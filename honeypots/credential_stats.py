@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from honeypots.sketches import HeavyHitters, HyperLogLog
+
+CREDENTIAL_FIELDS = ('username', 'password', 'pair')
+
+
+class CredentialStats:
+    """Bounded heavy-hitter statistics of attempted credentials.
+
+    Usernames, passwords and username/password pairs from login_attempt
+    events are counted per service and per UTC day. Memory per bucket is
+    fixed by the sketch dimensions, and buckets older than the retention
+    window are dropped.
+
+    Totals across services, days or both are kept up to date as events
+    arrive (keyed with None for "all"), so every query is a single lookup
+    rather than a merge of the matching buckets.
+    """
+
+    def __init__(self, config=None):
+        stats_config = (config or {}).get('credential_stats', {})
+        self.top_k = stats_config.get('top_k', 50)
+        self.width = stats_config.get('width', 2048)
+        self.depth = stats_config.get('depth', 4)
+        self.retention_days = stats_config.get('retention_days', 14)
+        self.buckets = {}
+        # (service or None, day or None) -> summaries across the buckets they cover
+        self.totals = {}
+        self.lock = threading.Lock()
+
+    def _new_bucket(self):
+        """Create empty summaries for every credential field"""
+        return {
+            field: HeavyHitters(self.top_k, self.width, self.depth)
+            for field in CREDENTIAL_FIELDS
+        }
+
+    def _get_bucket(self, service, day):
+        """Get or create the bucket for a service and day"""
+        key = (service, day)
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self._new_bucket()
+            self.buckets[key] = bucket
+            self._expire_buckets()
+        return bucket
+
+    def _targets(self, service, day):
+        """The bucket of a service and day plus the totals that include it"""
+        targets = [self._get_bucket(service, day)]
+        if (service, day) not in self.buckets:
+            return []  # Already outside the retention window
+        for key in ((None, day), (service, None), (None, None)):
+            total = self.totals.get(key)
+            if total is None:
+                total = self.totals[key] = self._new_bucket()
+            targets.append(total)
+        return targets
+
+    def _expire_buckets(self):
+        """Drop buckets that fall outside the retention window"""
+        days = sorted({day for _, day in self.buckets})
+        if len(days) > self.retention_days:
+            expired = set(days[:-self.retention_days])
+            for key in [key for key in self.buckets if key[1] in expired]:
+                del self.buckets[key]
+            for day in expired:
+                self.totals.pop((None, day), None)
+            self._rebuild_totals()
+
+    def _rebuild_totals(self):
+        """Recompute the all-days totals; counts can't be taken back out of a sketch"""
+        for key in [key for key in self.totals if key[1] is None]:
+            del self.totals[key]
+        for (service, _), bucket in self.buckets.items():
+            for key in ((service, None), (None, None)):
+                total = self.totals.get(key)
+                if total is None:
+                    total = self.totals[key] = self._new_bucket()
+                for field in CREDENTIAL_FIELDS:
+                    total[field].merge(bucket[field])
+
+    def add_event(self, log_entry):
+        """Count the credentials of a login_attempt event"""
+        # FTP logs USER separately; only entries carrying the password are counted
+        if log_entry.get('event_type') != 'login_attempt' or 'password' not in log_entry:
+            return
+
+        service = log_entry.get('service') or 'unknown'
+        day = (log_entry.get('timestamp') or '')[:10] or 'unknown'
+        username = str(log_entry.get('username') or '')
+        password = str(log_entry.get('password') or '')
+        count = log_entry.get('count', 1)
+
+        pair = f"{username}:{password}"
+        with self.lock:
+            for bucket in self._targets(service, day):
+                bucket['username'].add(username, count)
+                bucket['password'].add(password, count)
+                bucket['pair'].add(pair, count)
+
+    def top(self, field, service=None, day=None, limit=10):
+        """Top credentials for one field, optionally filtered by service and day"""
+        if field not in CREDENTIAL_FIELDS:
+            raise ValueError(f"Unknown credential field: {field}")
+
+        with self.lock:
+            key = (service, day)
+            bucket = self.buckets.get(key) if service is not None and day is not None else self.totals.get(key)
+            if bucket is None:
+                return []
+            return [{'value': value, 'count': count} for value, count in bucket[field].most_common(limit)]
+
+    def summary(self, service=None, day=None, limit=10):
+        """Top usernames, passwords and pairs"""
+        return {field: self.top(field, service, day, limit) for field in CREDENTIAL_FIELDS}
+
+    def buckets_available(self):
+        """List the (service, day) buckets currently held"""
+        with self.lock:
+            return [{'service': service, 'day': day} for service, day in sorted(self.buckets)]
+
+    def export(self):
+        """Serialize all buckets so another sensor can merge them"""
+        with self.lock:
+            return {
+                'buckets': [
+                    {
+                        'service': service,
+                        'day': day,
+                        'fields': {field: summary.to_dict() for field, summary in bucket.items()}
+                    }
+                    for (service, day), bucket in self.buckets.items()
+                ]
+            }
+
+    def merge(self, exported):
+        """Merge buckets exported by another sensor"""
+        with self.lock:
+            for entry in exported.get('buckets', []):
+                targets = self._targets(entry['service'], entry['day'])
+                for field in CREDENTIAL_FIELDS:
+                    if field in entry.get('fields', {}):
+                        summary = HeavyHitters.from_dict(entry['fields'][field])
+                        for bucket in targets:
+                            bucket[field].merge(summary)
+
+
+class CredentialSprayDetector:
+    """Detect one credential pair being tried from many source IPs.
+
+    Each tracked pair keeps a small ring of HyperLogLog slots covering the
+    sliding window; the distinct-source estimate is the union of the slots
+    still inside it. The number of tracked pairs is capped and the least
+    recently used pair is evicted first, so memory stays bounded.
+    """
+
+    def __init__(self, config=None):
+        spray_config = (config or {}).get('credential_spraying', {})
+        self.window_seconds = spray_config.get('window_seconds', 3600)
+        self.slots = spray_config.get('slots', 6)
+        self.slot_seconds = max(1, self.window_seconds // self.slots)
+        self.threshold = spray_config.get('threshold', 20)
+        self.precision = spray_config.get('precision', 8)
+        self.max_pairs = spray_config.get('max_pairs', 5000)
+        self.pairs = OrderedDict()
+        self.lock = threading.Lock()
+
+    def _slot(self, timestamp):
+        """Map an event timestamp to its window slot number"""
+        try:
+            moment = datetime.fromisoformat(timestamp).timestamp()
+        except (TypeError, ValueError):
+            moment = datetime.utcnow().timestamp()
+        return int(moment // self.slot_seconds)
+
+    def _estimate(self, slots, current_slot):
+        """Distinct sources across the slots still inside the window"""
+        union = HyperLogLog(self.precision)
+        for slot, sketch in slots.items():
+            if slot > current_slot - self.slots:
+                union.merge(sketch)
+        return union.count()
+
+    def add(self, username, password, source_ip, timestamp=None):
+        """Record an attempt and return the distinct-source estimate for its pair"""
+        pair = f"{username}:{password}"
+        current_slot = self._slot(timestamp)
+
+        with self.lock:
+            entry = self.pairs.get(pair)
+            if entry is None:
+                entry = {'slots': {}, 'first_seen': timestamp, 'last_seen': timestamp}
+                self.pairs[pair] = entry
+                if len(self.pairs) > self.max_pairs:
+                    self.pairs.popitem(last=False)
+            else:
+                self.pairs.move_to_end(pair)
+
+            slots = entry['slots']
+            for slot in [slot for slot in slots if slot <= current_slot - self.slots]:
+                del slots[slot]
+            sketch = slots.get(current_slot)
+            if sketch is None:
+                sketch = slots[current_slot] = HyperLogLog(self.precision)
+            sketch.add(source_ip)
+            entry['last_seen'] = timestamp
+
+            estimate = self._estimate(slots, current_slot)
+            entry['sources'] = estimate
+            return estimate
+
+    def is_spraying(self, estimate):
+        """Whether a distinct-source estimate crosses the spraying threshold"""
+        return estimate >= self.threshold
+
+    def get_spraying(self, limit=20):
+        """Credential pairs currently tried from at least threshold sources"""
+        with self.lock:
+            flagged = [
+                {
+                    'credential': pair,
+                    'estimated_sources': entry['sources'],
+                    'first_seen': entry['first_seen'],
+                    'last_seen': entry['last_seen']
+                }
+                for pair, entry in self.pairs.items()
+                if entry.get('sources', 0) >= self.threshold
+            ]
+        flagged.sort(key=lambda item: item['estimated_sources'], reverse=True)
+        return flagged[:limit]
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+
+import os
+import json
+import time
+import atexit
+import logging
+import threading
+from collections import Counter, deque
+from datetime import datetime
+
+from honeypots.workers import current_worker
+
+DEFAULT_COALESCE = {
+    'enabled': False,
+    'window': 60,
+    # Events that are always written one by one
+    'exempt_events': [
+        'command_executed', 'command_received', 'file_upload', 'file_upload_attempt',
+        'file_download_attempt', 'honeypot_started', 'honeypot_stopped', 'rate_limited', 'session_end'
+    ],
+    # Fields that differ between otherwise identical events
+    'ignore_fields': ['timestamp', 'source_port', 'session_id'],
+    # event_type -> the only fields (besides source, service and type) that make events distinct
+    'key_fields': {},
+    'max_pending': 100000
+}
+
+# Shedding tiers, from normal operation to keeping only what matters most
+TIERS = ('normal', 'sample', 'quiet', 'summary')
+SAMPLE, QUIET, SUMMARY = 1, 2, 3
+
+DEFAULT_SHEDDING = {
+    'enabled': True,
+    'max_queue': 50000,
+    # Queue depth (events) and write latency (ms) at which each tier starts
+    'tiers': {
+        'sample': {'queue': 1000, 'latency_ms': 100},
+        'quiet': {'queue': 5000, 'latency_ms': 500},
+        'summary': {'queue': 20000, 'latency_ms': 2000}
+    },
+    'sample_every': 10,
+    'low_value_events': [
+        'connection_attempt', 'connection_error', 'telnet_negotiation', 'malformed_request',
+        'tls_handshake', 'transport_error', 'http_request'
+    ],
+    'protected_events': [
+        'command_executed', 'file_upload', 'login_attempt', 'pubkey_attempt', 'attack_detected',
+        'honeypot_started', 'honeypot_stopped', 'rate_limited', 'session_end'
+    ],
+    'report_interval': 10,
+    'batch_size': 512
+}
+
+
+class EventCoalescer:
+    """Merges repeated identical events into one record per time window.
+
+    The first event of a kind (same source_ip, service, event_type and key
+    fields) is written as usual; identical events within the next window
+    seconds are only counted. When the window closes, one record carrying
+    the fields of the first repeat plus count, first_timestamp and
+    last_timestamp stands for all of them, so the events a log represents
+    are the sum of count (1 when absent).
+    """
+
+    def __init__(self, config=None):
+        settings = dict(DEFAULT_COALESCE)
+        settings.update((config or {}).get('events', {}).get('coalesce', {}))
+
+        self.enabled = settings['enabled']
+        self.window = settings['window']
+        self.exempt = set(settings['exempt_events'])
+        self.ignore_fields = set(settings['ignore_fields'])
+        self.key_fields = {event_type: tuple(fields) for event_type, fields in settings['key_fields'].items()}
+        self.max_pending = settings['max_pending']
+        # key -> [window end, count, first repeat, last timestamp]; all windows
+        # have the same length, so insertion order is also closing order
+        self.pending = {}
+
+    def _key(self, log_entry):
+        event_type = log_entry.get('event_type')
+        fields = self.key_fields.get(event_type)
+        if fields is None:
+            identity = {name: value for name, value in log_entry.items() if name not in self.ignore_fields}
+        else:
+            identity = {name: log_entry.get(name) for name in fields}
+            identity.update(source_ip=log_entry.get('source_ip'), service=log_entry.get('service'),
+                            event_type=event_type)
+        return json.dumps(identity, sort_keys=True, default=str)
+
+    def offer(self, log_entry, now):
+        """Records to write for an event; none while it is absorbed into an open window"""
+        if log_entry.get('event_type') in self.exempt:
+            return [log_entry]
+        key = self._key(log_entry)
+        window = self.pending.get(key)
+        if window is not None and now < window[0]:
+            window[1] += 1
+            if window[2] is None:
+                window[2] = log_entry
+            window[3] = log_entry.get('timestamp')
+            return []
+
+        records = []
+        if window is not None:
+            # Closed but not flushed yet
+            del self.pending[key]
+            if window[1]:
+                records.append(self._merge(*window[1:]))
+        if len(self.pending) < self.max_pending:
+            self.pending[key] = [now + self.window, 0, None, None]
+        records.append(log_entry)
+        return records
+
+    def expired(self, now=None):
+        """Merged records of the windows that have closed (all of them if now is None)"""
+        records = []
+        for key, (end, count, first, last_timestamp) in list(self.pending.items()):
+            if now is not None and now < end:
+                break
+            del self.pending[key]
+            if count:
+                records.append(self._merge(count, first, last_timestamp))
+        return records
+
+    def _merge(self, count, first, last_timestamp):
+        record = {name: value for name, value in first.items() if name not in self.ignore_fields}
+        return {
+            'timestamp': first.get('timestamp'),
+            **record,
+            'coalesced': True,
+            'count': count,
+            'first_timestamp': first.get('timestamp'),
+            'last_timestamp': last_timestamp
+        }
+
+
+class EventWriter:
+    """Appends JSON event lines to a service log without blocking callers.
+
+    write() only queues the event; a writer thread per log encodes queued
+    events and appends them in batches, each with a single write() call on
+    a per-process O_APPEND descriptor, so worker processes sharing one log
+    file never interleave lines. The thread also writes the merged records
+    of closed coalescing windows.
+
+    When the queue grows or writes slow down past the shedding watermarks,
+    events are shed in tiers: low-value events are sampled (sample), the
+    honeypots stop echoing events to the console (quiet), and finally only
+    protected events and summary records are kept (summary). Whatever is
+    shed is counted and reported in an events_dropped record every
+    report_interval seconds.
+    """
+
+    def __init__(self, path, config=None):
+        settings = dict(DEFAULT_SHEDDING)
+        settings.update((config or {}).get('events', {}).get('shedding', {}))
+
+        self.path = path
+        self.config = config
+        self.shedding = settings['enabled']
+        self.max_queue = settings['max_queue']
+        self.watermarks = [
+            (settings['tiers'][name]['queue'], settings['tiers'][name]['latency_ms'] / 1000)
+            for name in TIERS[1:]
+        ]
+        self.sample_every = settings['sample_every']
+        self.low_value = set(settings['low_value_events'])
+        self.protected = set(settings['protected_events'])
+        self.report_interval = settings['report_interval']
+        self.batch_size = settings['batch_size']
+        self.logger = logging.getLogger('Events')
+
+        self.fd = None
+        self.pid = None
+        self.coalescer = None
+        self.queue = deque()
+        self.wake = threading.Event()
+        self.thread = None
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+
+        self.tier = 0
+        self.peak_tier = 0
+        self.latency = 0.0
+        self.service = None
+        self.sampled = Counter()
+        self.dropped = Counter()
+        self.written = 0
+        self.next_report = time.monotonic() + self.report_interval
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        if self.fd is not None and self.pid == os.getpid():
+            os.close(self.fd)
+        self.fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self.pid = os.getpid()
+        # Queued events and windows opened by the parent stay with the parent
+        coalescer = EventCoalescer(self.config)
+        self.coalescer = coalescer if coalescer.enabled else None
+        self.queue = deque()
+        self.dropped = Counter()
+        self.thread = threading.Thread(target=self._run, name='EventWriter')
+        self.thread.daemon = True
+        self.thread.start()
+
+    @property
+    def console(self):
+        """Whether honeypots should still echo events to the console"""
+        return self.tier < QUIET
+
+    def write(self, log_entry):
+        """Queue one event; tags it with the worker index in multi-process mode"""
+        worker = current_worker()
+        if worker is not None:
+            log_entry['worker'] = worker[0]
+        self.service = log_entry.get('service', self.service)
+
+        with self.lock:
+            # Descriptors and threads don't survive fork; the child starts its own
+            if self.pid != os.getpid():
+                self._open()
+            if self.shedding and not self._admit(log_entry):
+                return
+            records = self.coalescer.offer(log_entry, time.monotonic()) if self.coalescer else (log_entry,)
+            if self.shedding and len(self.queue) + len(records) > self.max_queue:
+                for record in records:
+                    self.dropped[record.get('event_type')] += 1
+                return
+            self.queue.extend(records)
+        if not self.wake.is_set():
+            self.wake.set()
+
+    def _admit(self, log_entry):
+        """Apply the current shedding tier to an event (called with the lock held)"""
+        tier = self._update_tier()
+        if not tier:
+            return True
+        event_type = log_entry.get('event_type')
+        if event_type in self.protected:
+            return True
+        if tier >= SUMMARY:
+            self.dropped[event_type] += 1
+            return False
+        if event_type in self.low_value:
+            self.sampled[event_type] += 1
+            if self.sampled[event_type] % self.sample_every != 1 % self.sample_every:
+                self.dropped[event_type] += 1
+                return False
+        return True
+
+    def _update_tier(self):
+        """Tier from queue depth and write latency, leaving a tier only below half its marks"""
+        depth = len(self.queue)
+        latency = self.latency
+        tier = 0
+        for index, (queue_mark, latency_mark) in enumerate(self.watermarks, 1):
+            if depth >= queue_mark or latency >= latency_mark:
+                tier = index
+        if tier < self.tier:
+            queue_mark, latency_mark = self.watermarks[self.tier - 1]
+            if depth >= queue_mark / 2 or latency >= latency_mark / 2:
+                tier = self.tier
+        if tier != self.tier:
+            message = (f"{self.path}: event shedding tier {TIERS[self.tier]} -> {TIERS[tier]} "
+                       f"(queue {depth}, write latency {latency * 1000:.0f} ms)")
+            if tier > self.tier:
+                self.logger.warning(message)
+            else:
+                self.logger.info(message)
+            self.tier = tier
+        self.peak_tier = max(self.peak_tier, tier)
+        return tier
+
+    def _run(self):
+        """Writer thread: drain the queue, close coalescing windows, report drops"""
+        while True:
+            self.wake.wait(1.0)
+            self.wake.clear()
+            self._drain(time.monotonic())
+
+    def _drain(self, now=None):
+        with self.write_lock:
+            while self.queue:
+                batch = []
+                while self.queue and len(batch) < self.batch_size:
+                    batch.append(self.queue.popleft())
+                self._write(batch)
+            if not self.queue:
+                # Nothing waiting: let a stale latency reading decay
+                self.latency /= 2
+
+            records = []
+            with self.lock:
+                if self.coalescer is not None:
+                    records = self.coalescer.expired(now)
+                if now is None or now >= self.next_report:
+                    records.extend(self._drop_report())
+                    self.next_report = time.monotonic() + self.report_interval
+            if records:
+                self._write(records)
+
+    def _write(self, records):
+        data = memoryview(b''.join((json.dumps(record) + '\n').encode('utf-8') for record in records))
+        start = time.monotonic()
+        while data:
+            data = data[os.write(self.fd, data):]
+        elapsed = time.monotonic() - start
+        self.latency = elapsed if elapsed > self.latency else 0.8 * self.latency + 0.2 * elapsed
+        self.written += len(records)
+
+    def _drop_report(self):
+        """The events_dropped record for the interval, if anything was shed (lock held)"""
+        if not self.dropped:
+            self.peak_tier = self.tier
+            return []
+        record = {
+            'timestamp': datetime.utcnow().isoformat(),
+            'service': self.service,
+            'event_type': 'events_dropped',
+            'dropped_total': sum(self.dropped.values()),
+            'dropped': dict(self.dropped),
+            'tier': TIERS[self.peak_tier],
+            'queue_depth': len(self.queue),
+            'write_latency_ms': round(self.latency * 1000, 1)
+        }
+        worker = current_worker()
+        if worker is not None:
+            record['worker'] = worker[0]
+        self.dropped = Counter()
+        self.peak_tier = self.tier
+        return [record]
+
+    def flush(self):
+        """Write everything queued, every open coalescing window and the drop report"""
+        if self.pid != os.getpid():
+            return
+        self._drain()
+
+    def stats(self):
+        with self.lock:
+            return {
+                'queued': len(self.queue),
+                'tier': TIERS[self.tier],
+                'write_latency_ms': round(self.latency * 1000, 1),
+                'written': self.written,
+                'dropped_pending': sum(self.dropped.values())
+            }
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def get_event_writer(path, config=None):
+    """Get the process-wide writer for a log file"""
+    with _writers_lock:
+        writer = _writers.get(path)
+        if writer is None:
+            writer = _writers[path] = EventWriter(path, config)
+        return writer
+
+
+def flush_event_writers():
+    """Write out everything queued or pending in this process, e.g. at shutdown"""
+    with _writers_lock:
+        writers = list(_writers.values())
+    for writer in writers:
+        writer.flush()
+
+
+atexit.register(flush_event_writers)
@@ -2,21 +2,94 @@
 
 import socket
 import threading
-import json
+import asyncio
 import time
 import logging
 import os
+import sys
 from datetime import datetime
 
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from honeypots.signatures import get_signature_matcher
+from honeypots.worker_pool import ConnectionPool
+from honeypots.admission import AdmissionController
+from honeypots.events import get_event_writer
+from honeypots.sessions import SessionTracker, stamp_session, count_bytes
+from honeypots.workers import reuse_port, worker_range
+from honeypots.payloads import get_payload_store
+
+class PassivePortPool:
+    """Bounded pool of ports for passive-mode data connections"""
+    
+    def __init__(self, first_port, last_port):
+        self.free = list(range(first_port, last_port + 1))
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Take a free port, or None when the pool is exhausted"""
+        with self.lock:
+            return self.free.pop(0) if self.free else None
+    
+    def release(self, port):
+        """Return a port to the pool"""
+        with self.lock:
+            self.free.append(port)
+
+
+class _StreamAdapter:
+    """Lets the synchronous command handlers write to an asyncio stream"""
+    
+    def __init__(self, writer):
+        self.writer = writer
+    
+    def send(self, data):
+        self.writer.write(data)
+        return len(data)
+
+
 class FTPHoneypot:
+    # Commands served over passive data connections
+    DATA_COMMANDS = ('PASV', 'EPSV', 'LIST', 'NLST', 'RETR', 'STOR')
+    
     def __init__(self, config, logger):
         self.config = config
         self.logger = logger
         self.host = '0.0.0.0'
         self.port = config['honeypot']['ftp']['port']
+        self.events = get_event_writer('logs/ftp_honeypot.log', config)
         self.banner = config['honeypot']['ftp']['banner']
         self.anonymous_allowed = config['honeypot']['ftp']['anonymous_allowed']
         self.fake_files = config['honeypot']['ftp']['fake_files']
+        self.signatures = get_signature_matcher(config)
+        self.sessions = SessionTracker('ftp', self._log_event, command_event='command_received')
+        self.admission = AdmissionController('ftp', config, self._log_event)
+        self.payloads = get_payload_store(config)
+        self.pool = ConnectionPool(
+            'FTP',
+            self.admission.guard(self.sessions.track(self.handle_client)),
+            config['honeypot']['ftp'],
+            reject_message=b'421 There are too many connected users, please try later.\r\n'
+        )
+        
+        ftp_config = config['honeypot']['ftp']
+        self.server_mode = ftp_config.get('server_mode', 'threaded')
+        self.session_timeout = ftp_config.get('session_timeout', 300)
+        self.data_timeout = ftp_config.get('data_timeout', 30)
+        self.transfer_delay = ftp_config.get('transfer_delay', 1)
+        self.passive_address = ftp_config.get('passive_address', '')
+        self.max_upload_bytes = ftp_config.get('max_upload_bytes', 10 * 1024 * 1024)
+        # Worker processes each take a slice of the passive range
+        first_port, last_port = worker_range(*ftp_config.get('passive_ports', [60000, 60099]))
+        self.port_pool = PassivePortPool(first_port, last_port)
+        
+        # Fake file contents are generated once and served from memory
+        self.fake_contents = {name: self._build_fake_content(name) for name in self.fake_files}
+        self.fake_listing = ''.join(
+            f"-rw-r--r--   1 ftp      ftp      {len(content):>8} Nov 23 10:30 {name}\r\n"
+            for name, content in self.fake_contents.items()
+        ).encode('utf-8')
         
     def _log_event(self, event_type, client_ip, **kwargs):
         """Log honeypot events in JSON format"""
@@ -30,20 +103,33 @@ class FTPHoneypot:
             **kwargs
         }
         
+        # Events of a connection carry its session id
+        stamp_session(log_entry)
+        
         # Log to file
-        log_file = 'logs/ftp_honeypot.log'
-        os.makedirs(os.path.dirname(log_file), exist_ok=True)
-        with open(log_file, 'a') as f:
-            f.write(json.dumps(log_entry) + '\n')
+        self.events.write(log_entry)
         
-        # Log to console
-        self.logger.info(f"FTP Event: {event_type} from {client_ip}")
+        # Log to console, unless the event pipeline is shedding load
+        if self.events.console:
+            self.logger.info(f"FTP Event: {event_type} from {client_ip}")
+    
+    def _build_fake_content(self, filename):
+        """Generate plausible content for a fake file"""
+        if filename.endswith('.sql'):
+            return (b"-- MySQL dump 10.13  Distrib 5.7.40, for Linux (x86_64)\n"
+                    b"CREATE TABLE `users` (`id` int NOT NULL, `username` varchar(64), `password` varchar(64));\n"
+                    b"INSERT INTO `users` VALUES (1,'admin','5f4dcc3b5aa765d61d8327deb882cf99');\n")
+        elif filename.endswith('.csv'):
+            return b"id,username,email,role\n1,admin,admin@example.com,admin\n2,jsmith,jsmith@example.com,user\n"
+        elif filename.endswith('.conf'):
+            return b"[database]\nhost=127.0.0.1\nport=3306\nuser=backup\npassword=Backup2022!\n"
+        return b"Internal file server. Authorized use only.\n"
     
     def _send_response(self, client_socket, code, message):
         """Send FTP response to client"""
-        response = f"{code} {message}\r\n"
+        response = f"{code} {message}\r\n".encode('utf-8')
         try:
-            client_socket.send(response.encode('utf-8'))
+            count_bytes(sent=client_socket.send(response))
         except Exception:
             pass
     
@@ -82,36 +168,6 @@ class FTPHoneypot:
             self._send_response(client_socket, 530, "Login incorrect")
             return 'NOT_LOGGED_IN'
     
-    def _handle_list_command(self, client_socket, client_ip):
-        """Handle LIST command"""
-        self._log_event('command_executed', client_ip, command='LIST')
-        
-        # Simulate file listing
-        file_list = ""
-        for i, filename in enumerate(self.fake_files):
-            file_list += f"-rw-r--r--   1 ftp      ftp          {1000 + i*100} Nov 23 10:30 {filename}\r\n"
-        
-        self._send_response(client_socket, 150, "Here comes the directory listing")
-        # In a real FTP server, this would be sent over data connection
-        self._send_response(client_socket, 226, "Directory send OK")
-    
-    def _handle_retr_command(self, client_socket, client_ip, filename):
-        """Handle RETR command"""
-        self._log_event('file_download_attempt', client_ip, filename=filename)
-        
-        if filename in self.fake_files:
-            self._send_response(client_socket, 150, f"Opening BINARY mode data connection for {filename}")
-            # Simulate file transfer
-            time.sleep(1)
-            self._send_response(client_socket, 226, "Transfer complete")
-        else:
-            self._send_response(client_socket, 550, f"{filename}: No such file or directory")
-    
-    def _handle_stor_command(self, client_socket, client_ip, filename):
-        """Handle STOR command"""
-        self._log_event('file_upload_attempt', client_ip, filename=filename)
-        self._send_response(client_socket, 550, "Permission denied")
-    
     def _handle_pwd_command(self, client_socket, client_ip):
         """Handle PWD command"""
         self._log_event('command_executed', client_ip, command='PWD')
@@ -136,21 +192,61 @@ class FTPHoneypot:
         else:
             self._send_response(client_socket, 504, "Command not implemented for that parameter")
     
-    def _handle_pasv_command(self, client_socket, client_ip):
-        """Handle PASV command"""
-        self._log_event('command_executed', client_ip, command='PASV')
-        # Simulate passive mode response
-        self._send_response(client_socket, 227, "Entering Passive Mode (127,0,0,1,20,21)")
-    
     def _handle_port_command(self, client_socket, client_ip, port_args):
         """Handle PORT command"""
         self._log_event('command_executed', client_ip, command='PORT', args=port_args)
         self._send_response(client_socket, 200, "PORT command successful")
     
+    def _dispatch_command(self, client_socket, client_ip, session, command, args):
+        """Handle one control command; returns False when the session ends"""
+        state = session['state']
+        
+        if command == 'USER':
+            session['username'] = args
+            session['state'] = self._handle_user_command(client_socket, client_ip, args)
+        
+        elif command == 'PASS':
+            session['state'] = self._handle_pass_command(client_socket, client_ip, args, state, session['username'])
+        
+        elif command == 'QUIT':
+            self._send_response(client_socket, 221, "Goodbye")
+            return False
+        
+        elif command == 'SYST':
+            self._send_response(client_socket, 215, "UNIX Type: L8")
+        
+        elif command == 'FEAT':
+            self._send_response(client_socket, 211, "Features supported")
+        
+        elif state == 'LOGGED_IN':
+            if command == 'PWD':
+                self._handle_pwd_command(client_socket, client_ip)
+            
+            elif command == 'CWD':
+                self._handle_cwd_command(client_socket, client_ip, args)
+            
+            elif command == 'TYPE':
+                self._handle_type_command(client_socket, client_ip, args)
+            
+            elif command == 'PORT':
+                self._handle_port_command(client_socket, client_ip, args)
+            
+            elif command == 'NOOP':
+                self._send_response(client_socket, 200, "NOOP command successful")
+            
+            else:
+                self._send_response(client_socket, 502, f"Command {command} not implemented")
+        
+        else:
+            self._send_response(client_socket, 530, "Please login with USER and PASS")
+        
+        return True
+    
     def handle_client(self, client_socket, client_address):
         """Handle individual FTP client connections"""
         client_ip = client_address[0]
         client_port = client_address[1]
+        session = {'state': 'NOT_LOGGED_IN', 'username': ''}
         
         try:
             self._log_event('connection_attempt', client_ip, source_port=client_port)
@@ -158,74 +254,27 @@ class FTPHoneypot:
             # Send welcome banner
             self._send_response(client_socket, 220, self.banner)
             
-            state = 'NOT_LOGGED_IN'
-            username = ''
-            
-            client_socket.settimeout(300)  # 5 minute timeout
+            client_socket.settimeout(self.session_timeout)
             
             while True:
                 try:
                     data = client_socket.recv(1024)
                     if not data:
                         break
+                    count_bytes(received=len(data))
                     
                     command, args = self._parse_command(data)
                     
                     if not command:
                         continue
                     
-                    self._log_event('command_received', client_ip, command=command, args=args)
-                    
-                    if command == 'USER':
-                        username = args
-                        state = self._handle_user_command(client_socket, client_ip, username)
+                    self._log_event('command_received', client_ip, command=command, args=args,
+                                    signatures=self.signatures.match('request', args))
                     
-                    elif command == 'PASS':
-                        state = self._handle_pass_command(client_socket, client_ip, args, state, username)
-                    
-                    elif command == 'QUIT':
-                        self._send_response(client_socket, 221, "Goodbye")
+                    if session['state'] == 'LOGGED_IN' and command in self.DATA_COMMANDS:
+                        self._handle_data_command(client_socket, client_ip, session, command, args)
+                    elif not self._dispatch_command(client_socket, client_ip, session, command, args):
                         break
-                    
-                    elif command == 'SYST':
-                        self._send_response(client_socket, 215, "UNIX Type: L8")
-                    
-                    elif command == 'FEAT':
-                        self._send_response(client_socket, 211, "Features supported")
-                    
-                    elif state == 'LOGGED_IN':
-                        if command == 'LIST' or command == 'NLST':
-                            self._handle_list_command(client_socket, client_ip)
-                        
-                        elif command == 'RETR':
-                            self._handle_retr_command(client_socket, client_ip, args)
-                        
-                        elif command == 'STOR':
-                            self._handle_stor_command(client_socket, client_ip, args)
-                        
-                        elif command == 'PWD':
-                            self._handle_pwd_command(client_socket, client_ip)
-                        
-                        elif command == 'CWD':
-                            self._handle_cwd_command(client_socket, client_ip, args)
-                        
-                        elif command == 'TYPE':
-                            self._handle_type_command(client_socket, client_ip, args)
-                        
-                        elif command == 'PASV':
-                            self._handle_pasv_command(client_socket, client_ip)
-                        
-                        elif command == 'PORT':
-                            self._handle_port_command(client_socket, client_ip, args)
-                        
-                        elif command == 'NOOP':
-                            self._send_response(client_socket, 200, "NOOP command successful")
-                        
-                        else:
-                            self._send_response(client_socket, 502, f"Command {command} not implemented")
-                    
-                    else:
-                        self._send_response(client_socket, 530, "Please login with USER and PASS")
                 
                 except socket.timeout:
                     self._send_response(client_socket, 421, "Timeout")
@@ -237,20 +286,347 @@ class FTPHoneypot:
         except Exception as e:
             self._log_event('connection_error', client_ip, error=str(e))
         finally:
+            self._close_passive_socket(session)
             try:
                 client_socket.close()
             except:
                 pass
     
+    def _open_passive_socket(self, session):
+        """Listen on a pooled port for the client's next data connection (threaded mode)"""
+        self._close_passive_socket(session)
+        port = self.port_pool.acquire()
+        if port is None:
+            return None
+        
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            listener.bind((self.host, port))
+            listener.listen(1)
+        except OSError:
+            listener.close()
+            self.port_pool.release(port)
+            return None
+        
+        session['passive'] = {'port': port, 'socket': listener}
+        return port
+    
+    def _close_passive_socket(self, session):
+        """Stop listening and return the passive port to the pool (threaded mode)"""
+        passive = session.pop('passive', None)
+        if passive is None:
+            return
+        passive['socket'].close()
+        self.port_pool.release(passive['port'])
+    
+    def _accept_data_socket(self, session, client_ip):
+        """Wait for the client to connect to the passive port (threaded mode)"""
+        listener = session['passive']['socket']
+        deadline = time.monotonic() + self.data_timeout
+        try:
+            while True:
+                listener.settimeout(max(0.0, deadline - time.monotonic()))
+                data_socket, address = listener.accept()
+                # Only the control connection's peer may use the data channel
+                if address[0] == client_ip:
+                    data_socket.settimeout(self.data_timeout)
+                    return data_socket
+                data_socket.close()
+        except OSError:
+            return None
+        finally:
+            # One transfer per PASV: stop listening, the port returns to the pool
+            self._close_passive_socket(session)
+    
+    def _handle_data_command(self, client_socket, client_ip, session, command, args):
+        """Handle commands that use a data connection (threaded mode)"""
+        if command in ('PASV', 'EPSV'):
+            self._log_event('command_executed', client_ip, command=command)
+            port = self._open_passive_socket(session)
+            if port is None:
+                self._send_response(client_socket, 421, "Too many passive connections, try again later")
+            elif command == 'EPSV':
+                self._send_response(client_socket, 229, f"Entering Extended Passive Mode (|||{port}|)")
+            else:
+                host = (self.passive_address or client_socket.getsockname()[0]).replace('.', ',')
+                self._send_response(client_socket, 227, f"Entering Passive Mode ({host},{port >> 8},{port & 0xff})")
+            return
+        
+        payload, opening = self._data_command_payload(client_socket, client_ip, command, args)
+        if opening is None:
+            return
+        
+        if 'passive' not in session:
+            self._send_response(client_socket, 425, "Use PASV or EPSV first")
+            return
+        
+        self._send_response(client_socket, 150, opening)
+        data_socket = self._accept_data_socket(session, client_ip)
+        if data_socket is None:
+            self._send_response(client_socket, 425, "Can't open data connection")
+            return
+        
+        try:
+            if command == 'STOR':
+                self._receive_upload_socket(client_socket, data_socket, client_ip, args)
+                return
+            
+            # Simulated transfer time
+            time.sleep(self.transfer_delay)
+            data_socket.sendall(payload)
+            count_bytes(sent=len(payload))
+            self._send_response(client_socket, 226, "Transfer complete")
+        except OSError:
+            self._send_response(client_socket, 426, "Connection closed; transfer aborted")
+        finally:
+            data_socket.close()
+    
+    def _receive_upload_socket(self, client_socket, data_socket, client_ip, filename):
+        """Stream an uploaded file into the payload store (threaded mode)"""
+        writer = self.payloads.open('ftp', client_ip, 'upload', self.max_upload_bytes, filename=filename[:255])
+        try:
+            while True:
+                chunk = data_socket.recv(65536)
+                if not chunk or not writer.write(chunk):
+                    break
+        except BaseException:
+            writer.abort()
+            raise
+        self._finish_upload(client_socket, client_ip, filename, writer.close())
+    
+    def _data_command_payload(self, conn, client_ip, command, args):
+        """Log a LIST/NLST/RETR/STOR and return (bytes to send, 150 message).
+        
+        The message is None when the command has already been answered.
+        """
+        if command in ('LIST', 'NLST'):
+            self._log_event('command_executed', client_ip, command=command)
+            payload = self.fake_listing if command == 'LIST' else ''.join(
+                f"{name}\r\n" for name in self.fake_contents).encode('utf-8')
+            return payload, "Here comes the directory listing"
+        if command == 'RETR':
+            self._log_event('file_download_attempt', client_ip, filename=args)
+            payload = self.fake_contents.get(os.path.basename(args))
+            if payload is None:
+                self._send_response(conn, 550, f"{args}: No such file or directory")
+                return None, None
+            return payload, f"Opening BINARY mode data connection for {args} ({len(payload)} bytes)"
+        return None, f"Ok to send data for {args}"
+    
+    def _finish_upload(self, conn, client_ip, filename, payload):
+        """Log a completed upload and answer it"""
+        count_bytes(received=payload['size'])
+        truncated = payload['truncated']
+        self._log_event('file_upload', client_ip, filename=filename, size=payload['size'],
+                        sha256=payload['sha256'], truncated=truncated, duplicate=payload['duplicate'],
+                        stored=payload['stored'])
+        
+        if truncated:
+            self._send_response(conn, 552, "Exceeded storage allocation")
+        else:
+            self._send_response(conn, 226, "Transfer complete")
+    
+    async def _open_passive(self, session, client_ip):
+        """Listen on a pooled port for the client's next data connection"""
+        self._close_passive(session)
+        port = self.port_pool.acquire()
+        if port is None:
+            return None
+        
+        accepted = asyncio.get_running_loop().create_future()
+        
+        def on_connect(reader, writer):
+            # Only the control connection's peer may use the data channel
+            if accepted.done() or writer.get_extra_info('peername')[0] != client_ip:
+                writer.close()
+            else:
+                accepted.set_result((reader, writer))
+        
+        try:
+            server = await asyncio.start_server(on_connect, self.host, port, reuse_address=True)
+        except OSError:
+            self.port_pool.release(port)
+            return None
+        
+        session['passive'] = {'port': port, 'server': server, 'accepted': accepted}
+        return port
+    
+    def _close_passive(self, session):
+        """Stop listening and return the passive port to the pool"""
+        passive = session.pop('passive', None)
+        if passive is None:
+            return
+        passive['server'].close()
+        self.port_pool.release(passive['port'])
+        accepted = passive['accepted']
+        if accepted.done():
+            accepted.result()[1].close()
+        else:
+            accepted.cancel()
+    
+    async def _accept_data_connection(self, session):
+        """Wait for the client to connect to the passive port"""
+        passive = session.get('passive')
+        if passive is None:
+            return None
+        try:
+            reader, writer = await asyncio.wait_for(asyncio.shield(passive['accepted']), self.data_timeout)
+        except asyncio.TimeoutError:
+            self._close_passive(session)
+            return None
+        
+        # One transfer per PASV: stop listening, the port returns to the pool
+        passive['server'].close()
+        self.port_pool.release(passive['port'])
+        session.pop('passive', None)
+        return reader, writer
+    
+    async def _handle_data_command_async(self, conn, writer, client_ip, session, command, args):
+        """Handle commands that use a data connection"""
+        if command in ('PASV', 'EPSV'):
+            self._log_event('command_executed', client_ip, command=command)
+            port = await self._open_passive(session, client_ip)
+            if port is None:
+                self._send_response(conn, 421, "Too many passive connections, try again later")
+            elif command == 'EPSV':
+                self._send_response(conn, 229, f"Entering Extended Passive Mode (|||{port}|)")
+            else:
+                address = self.passive_address or writer.get_extra_info('sockname')[0]
+                host = address.replace('.', ',')
+                self._send_response(conn, 227, f"Entering Passive Mode ({host},{port >> 8},{port & 0xff})")
+            return
+        
+        payload, opening = self._data_command_payload(conn, client_ip, command, args)
+        if opening is None:
+            return
+        
+        if 'passive' not in session:
+            self._send_response(conn, 425, "Use PASV or EPSV first")
+            return
+        
+        self._send_response(conn, 150, opening)
+        await writer.drain()
+        data_connection = await self._accept_data_connection(session)
+        if data_connection is None:
+            self._send_response(conn, 425, "Can't open data connection")
+            return
+        
+        data_reader, data_writer = data_connection
+        try:
+            if command == 'STOR':
+                await self._receive_upload(conn, data_reader, client_ip, args)
+                return
+            
+            # Simulated transfer time without blocking other sessions
+            await asyncio.sleep(self.transfer_delay)
+            data_writer.write(payload)
+            count_bytes(sent=len(payload))
+            await asyncio.wait_for(data_writer.drain(), self.data_timeout)
+            self._send_response(conn, 226, "Transfer complete")
+        except (asyncio.TimeoutError, ConnectionError):
+            self._send_response(conn, 426, "Connection closed; transfer aborted")
+        finally:
+            data_writer.close()
+    
+    async def _receive_upload(self, conn, data_reader, client_ip, filename):
+        """Stream an uploaded file into the payload store, up to the configured size cap"""
+        writer = self.payloads.open('ftp', client_ip, 'upload', self.max_upload_bytes, filename=filename[:255])
+        try:
+            while True:
+                chunk = await asyncio.wait_for(data_reader.read(65536), self.data_timeout)
+                if not chunk or not writer.write(chunk):
+                    break
+        except BaseException:
+            writer.abort()
+            raise
+        self._finish_upload(conn, client_ip, filename, writer.close())
+    
+    async def handle_client_async(self, reader, writer):
+        """Handle an FTP client connection on the event loop"""
+        client_ip, client_port = writer.get_extra_info('peername')[:2]
+        conn = _StreamAdapter(writer)
+        session = {'state': 'NOT_LOGGED_IN', 'username': ''}
+        
+        try:
+            self._log_event('connection_attempt', client_ip, source_port=client_port)
+            self._send_response(conn, 220, self.banner)
+            
+            while True:
+                await writer.drain()
+                try:
+                    data = await asyncio.wait_for(reader.readline(), self.session_timeout)
+                except asyncio.TimeoutError:
+                    self._send_response(conn, 421, "Timeout")
+                    break
+                if not data:
+                    break
+                count_bytes(received=len(data))
+                
+                command, args = self._parse_command(data)
+                if not command:
+                    continue
+                
+                self._log_event('command_received', client_ip, command=command, args=args,
+                                signatures=self.signatures.match('request', args))
+                
+                if session['state'] == 'LOGGED_IN' and command in self.DATA_COMMANDS:
+                    await self._handle_data_command_async(conn, writer, client_ip, session, command, args)
+                elif not self._dispatch_command(conn, client_ip, session, command, args):
+                    break
+            
+            await writer.drain()
+        except (ConnectionError, ValueError):
+            pass  # ValueError: line longer than the stream limit
+        except Exception as e:
+            self._log_event('session_error', client_ip, error=str(e))
+        finally:
+            self._close_passive(session)
+            writer.close()
+    
+    async def _serve_async(self):
+        """Run the asyncio FTP server until cancelled"""
+        server = await asyncio.start_server(
+            self.admission.guard_async(self.sessions.track_async(self.handle_client_async)),
+            self.host,
+            self.port,
+            backlog=1024,
+            reuse_address=True,
+            reuse_port=reuse_port()
+        )
+        
+        self.logger.info(f"FTP Honeypot (asyncio) started on {self.host}:{self.port}")
+        self._log_event('honeypot_started', '0.0.0.0', server_mode='asyncio')
+        
+        async with server:
+            await server.serve_forever()
+    
+    def _start_asyncio(self):
+        """Start the FTP honeypot as a single-threaded asyncio server"""
+        try:
+            asyncio.run(self._serve_async())
+        except KeyboardInterrupt:
+            pass
+        except Exception as e:
+            self.logger.error(f"Failed to start FTP honeypot: {e}")
+        finally:
+            self._log_event('honeypot_stopped', '0.0.0.0')
+    
     def start(self):
         """Start the FTP honeypot server"""
+        if self.server_mode == 'asyncio':
+            return self._start_asyncio()
+        
         server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if reuse_port():
+            server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
         
         try:
             server_socket.bind((self.host, self.port))
             server_socket.listen(50)
             
+            self.pool.start()
             self.logger.info(f"FTP Honeypot started on {self.host}:{self.port}")
             self._log_event('honeypot_started', '0.0.0.0')
             
@@ -258,12 +634,12 @@ class FTPHoneypot:
                 try:
                     client_socket, client_address = server_socket.accept()
                     
-                    client_thread = threading.Thread(
-                        target=self.handle_client,
-                        args=(client_socket, client_address)
-                    )
-                    client_thread.daemon = True
-                    client_thread.start()
+                    if not self.admission.admit(client_address[0]):
+                        self.admission.refuse(client_socket, client_address[0])
+                        continue
+                    
+                    if not self.pool.submit(client_socket, client_address):
+                        self.admission.release(client_address[0])
                     
                 except KeyboardInterrupt:
                     break
@@ -1,30 +1,249 @@
 #!/usr/bin/env python3
 
+import re
+import ssl
 import socket
-import threading
+import asyncio
 import json
-import time
+import hashlib
 import logging
 import os
-import re
+import sys
+from bisect import bisect_right
 from datetime import datetime
-from urllib.parse import urlparse, parse_qs, unquote
+from urllib.parse import unquote, unquote_plus
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from honeypots.signatures import get_signature_matcher
+from honeypots.worker_pool import ConnectionPool
+from honeypots.admission import AdmissionController
+from honeypots.events import get_event_writer
+from honeypots.sessions import SessionTracker, stamp_session, count_bytes
+from honeypots.workers import reuse_port
+from honeypots.tarpit import get_tarpit
+from honeypots.payloads import get_payload_store
+from honeypots.http_responses import ResponseCache, StaticAssets, FileBody, build_response
+from honeypots.tls import get_tls_server, peek_client_hello, peek_client_hello_async
+
+# int() also takes signs, '0x' prefixes, underscores and whitespace
+CHUNK_SIZE = re.compile(rb'[0-9A-Fa-f]{1,16}')
+CONTENT_LENGTH = re.compile(r'[0-9]{1,19}')
+
+class HTTPParseError(Exception):
+    """Request that cannot be framed; answered with status and closed"""
+    
+    def __init__(self, status, reason):
+        super().__init__(f"{status} {reason}")
+        self.status = status
+        self.reason = reason
+
+
+class HTTPRequestParser:
+    """Incremental, bytes-level HTTP/1.x request parser for one connection.
+    
+    feed() appends received bytes and returns every request they complete,
+    so pipelined requests come out in order. Bodies are framed by
+    Content-Length or chunked transfer encoding; headers and bodies beyond
+    the configured limits raise HTTPParseError.
+    """
+    
+    HEAD, BODY, CHUNK_SIZE, CHUNK_DATA, TRAILERS = range(5)
+    MAX_CHUNK_LINE = 1024
+    
+    def __init__(self, max_header_bytes=16384, max_body_bytes=1048576):
+        self.max_header_bytes = max_header_bytes
+        self.max_body_bytes = max_body_bytes
+        self.buffer = bytearray()
+        self.state = self.HEAD
+        self.request = None
+        self.body = bytearray()
+        self.remaining = 0
+        self.count = 0
+    
+    def pending(self):
+        """Whether part of a request has been received"""
+        return self.state != self.HEAD or bool(self.buffer)
+    
+    def feed(self, data):
+        """Add received bytes; returns the requests completed by them"""
+        self.buffer += data
+        completed = []
+        while True:
+            request = self._advance()
+            if request is None:
+                return completed
+            completed.append(request)
+    
+    def _advance(self):
+        """Run the state machine until a request completes or input runs out"""
+        buffer = self.buffer
+        while True:
+            if self.state == self.HEAD:
+                # Empty lines between pipelined requests are ignored
+                while buffer[:2] == b'\r\n':
+                    del buffer[:2]
+                end = buffer.find(b'\r\n\r\n')
+                if end == -1 or end > self.max_header_bytes:
+                    if len(buffer) > self.max_header_bytes:
+                        raise HTTPParseError(431, "Request Header Fields Too Large")
+                    return None
+                head = bytes(buffer[:end])
+                del buffer[:end + 4]
+                self._start(head)
+                if self.state == self.HEAD:
+                    return self._complete()
+            
+            elif self.state == self.BODY:
+                if len(buffer) < self.remaining:
+                    return None
+                self.body += buffer[:self.remaining]
+                del buffer[:self.remaining]
+                self.state = self.HEAD
+                return self._complete()
+            
+            elif self.state in (self.CHUNK_SIZE, self.TRAILERS):
+                end = buffer.find(b'\r\n')
+                if end == -1:
+                    if len(buffer) > self.MAX_CHUNK_LINE:
+                        raise HTTPParseError(400, "Bad Request")
+                    return None
+                line = bytes(buffer[:end])
+                del buffer[:end + 2]
+                if self.state == self.TRAILERS:
+                    if not line:
+                        self.state = self.HEAD
+                        return self._complete()
+                    continue
+                # Only whitespace before chunk extensions is tolerated
+                digits = line.split(b';', 1)[0].rstrip(b' \t')
+                if not CHUNK_SIZE.fullmatch(digits):
+                    raise HTTPParseError(400, "Bad Request")
+                size = int(digits, 16)
+                if size == 0:
+                    self.state = self.TRAILERS
+                elif len(self.body) + size > self.max_body_bytes:
+                    raise HTTPParseError(413, "Payload Too Large")
+                else:
+                    self.remaining = size
+                    self.state = self.CHUNK_DATA
+            
+            else:
+                if len(buffer) < self.remaining + 2:
+                    return None
+                if buffer[self.remaining:self.remaining + 2] != b'\r\n':
+                    raise HTTPParseError(400, "Bad Request")
+                self.body += buffer[:self.remaining]
+                del buffer[:self.remaining + 2]
+                self.state = self.CHUNK_SIZE
+    
+    def _start(self, head):
+        """Parse the request line and headers and choose the body framing"""
+        lines = head.split(b'\r\n')
+        parts = lines[0].decode('utf-8', errors='ignore').split(' ')
+        if len(parts) < 3:
+            raise HTTPParseError(400, "Bad Request")
+        
+        headers = {}
+        for line in lines[1:]:
+            name, sep, value = line.partition(b':')
+            if sep:
+                headers[name.strip().lower().decode('latin-1')] = value.strip().decode('utf-8', errors='ignore')
+        
+        self.request = {
+            'method': parts[0],
+            'path': parts[1],
+            'version': parts[2],
+            'headers': headers,
+            'head': head
+        }
+        self.body = bytearray()
+        
+        if 'chunked' in headers.get('transfer-encoding', '').lower():
+            self.state = self.CHUNK_SIZE
+        elif 'content-length' in headers:
+            if not CONTENT_LENGTH.fullmatch(headers['content-length']):
+                raise HTTPParseError(400, "Bad Request")
+            length = int(headers['content-length'])
+            if length > self.max_body_bytes:
+                raise HTTPParseError(413, "Payload Too Large")
+            self.remaining = length
+            self.state = self.BODY if length else self.HEAD
+        else:
+            self.state = self.HEAD
+    
+    def _complete(self):
+        """Finish the current request"""
+        request = self.request
+        self.request = None
+        self.count += 1
+        
+        body = bytes(self.body)
+        connection = request['headers'].get('connection', '').lower()
+        if request['version'] == 'HTTP/1.1':
+            keep_alive = 'close' not in connection
+        else:
+            keep_alive = 'keep-alive' in connection
+        
+        request.update(
+            body=body,
+            keep_alive=keep_alive,
+            sequence=self.count
+        )
+        return request
+
 
 class HTTPHoneypot:
+    service = 'http'
+    reject_message = b'HTTP/1.1 503 Service Unavailable\r\nRetry-After: 30\r\nContent-Length: 0\r\nConnection: close\r\n\r\n'
+    
     def __init__(self, config, logger):
+        http_config = self._service_config(config)
         self.config = config
         self.logger = logger
         self.host = '0.0.0.0'
-        self.port = config['honeypot']['http']['port']
-        self.server_name = config['honeypot']['http']['server_name']
+        self.port = http_config['port']
+        self.events = get_event_writer(f'logs/{self.service}_honeypot.log', config)
+        self.server_name = http_config['server_name']
         self.fake_pages = {page['path']: page['template'] 
-                          for page in config['honeypot']['http']['fake_pages']}
+                          for page in http_config['fake_pages']}
+        self.signatures = get_signature_matcher(config)
+        self.tarpit = get_tarpit(config)
+        self.sessions = SessionTracker(self.service, self._log_event, command_event='http_request')
+        self.admission = AdmissionController(self.service, config, self._log_event, tarpit=self.tarpit)
+        self.payloads = get_payload_store(config)
+        self.pool = ConnectionPool(
+            self.service.upper(),
+            self.admission.guard(self.sessions.track(self.handle_client)),
+            http_config,
+            reject_message=self.reject_message
+        )
+        self.inspection_byte_limit = http_config.get('inspection_byte_limit', 16384)
+        self.server_mode = http_config.get('server_mode', 'threaded')
+        self.request_timeout = http_config.get('request_timeout', 10)
+        self.keepalive_timeout = http_config.get('keepalive_timeout', 5)
+        self.max_keepalive_requests = http_config.get('max_keepalive_requests', 100)
+        self.max_header_bytes = http_config.get('max_header_bytes', 16384)
+        self.max_body_bytes = http_config.get('max_body_bytes', 1048576)
+        self.responses = self._build_response_cache(http_config)
+        self.assets = StaticAssets(
+            self.server_name,
+            http_config.get('static_dir', 'config/http_static'),
+            http_config.get('static_check_interval', 10)
+        )
+        # Set by HTTPSHoneypot
+        self.tls = None
+    
+    def _service_config(self, config):
+        """Settings of this listener"""
+        return config['honeypot']['http']
         
     def _log_event(self, event_type, client_ip, **kwargs):
         """Log honeypot events in JSON format"""
         log_entry = {
             'timestamp': datetime.utcnow().isoformat(),
-            'service': 'http',
+            'service': self.service,
             'event_type': event_type,
             'source_ip': client_ip,
             'source_port': kwargs.get('source_port'),
@@ -32,56 +251,15 @@ class HTTPHoneypot:
             **kwargs
         }
         
+        # Events of a connection carry its session id
+        stamp_session(log_entry)
+        
         # Log to file
-        log_file = 'logs/http_honeypot.log'
-        os.makedirs(os.path.dirname(log_file), exist_ok=True)
-        with open(log_file, 'a') as f:
-            f.write(json.dumps(log_entry) + '\n')
+        self.events.write(log_entry)
         
-        # Log to console
-        self.logger.info(f"HTTP Event: {event_type} from {client_ip}")
-    
-    def _parse_http_request(self, request_data):
-        """Parse HTTP request"""
-        try:
-            lines = request_data.decode('utf-8', errors='ignore').split('\r\n')
-            if not lines:
-                return None
-            
-            # Parse request line
-            request_line = lines[0].split(' ')
-            if len(request_line) < 3:
-                return None
-            
-            method = request_line[0]
-            path = request_line[1]
-            version = request_line[2]
-            
-            # Parse headers
-            headers = {}
-            body = ''
-            body_start = False
-            
-            for line in lines[1:]:
-                if not body_start:
-                    if line == '':
-                        body_start = True
-                        continue
-                    if ':' in line:
-                        key, value = line.split(':', 1)
-                        headers[key.strip().lower()] = value.strip()
-                else:
-                    body += line + '\n'
-            
-            return {
-                'method': method,
-                'path': path,
-                'version': version,
-                'headers': headers,
-                'body': body.strip()
-            }
-        except Exception:
-            return None
+        # Log to console, unless the event pipeline is shedding load
+        if self.events.console:
+            self.logger.info(f"{self.service.upper()} Event: {event_type} from {client_ip}")
     
     def _generate_response(self, request, client_ip):
         """Generate HTTP response based on request"""
@@ -93,6 +271,9 @@ class HTTPHoneypot:
         headers = request['headers']
         body = request['body']
         
+        # Request bodies go to the payload store and are logged by hash
+        payload = self.payloads.capture(body, self.service, client_ip, 'http_body', method=method) if body else None
+        
         # Log the request
         self._log_event(
             'http_request',
@@ -101,106 +282,112 @@ class HTTPHoneypot:
             path=path,
             user_agent=headers.get('user-agent', ''),
             referer=headers.get('referer', ''),
-            body=body[:1000] if body else ''  # Limit body size in logs
+            body_bytes=len(body),  # The body itself is only kept in the payload store
+            body_sha256=payload['sha256'] if payload else (hashlib.sha256(body).hexdigest() if body else None)
         )
         
         # Check for suspicious patterns
         self._analyze_request(request, client_ip)
         
-        # Handle different paths
+        # Handle different paths; fixed pages come pre-encoded from the cache
+        keep_alive = request['keep_alive']
+        asset = self.assets.lookup(path)
         if path in self.fake_pages:
-            return self._generate_fake_page_response(path)
+            return self.responses.get(path, keep_alive)
+        elif asset is not None:
+            return self._generate_static_response(request, asset)
         elif path == '/':
-            return self._generate_index_response()
+            return self.responses.get('index', keep_alive)
         elif path.startswith('/admin') or path.startswith('/wp-admin'):
-            return self._generate_admin_response()
+            return self.responses.get('admin', keep_alive)
         elif path.startswith('/api/'):
-            return self._generate_api_response(path)
+            return self._generate_api_response(path, keep_alive)
         elif path.endswith('.php'):
-            return self._generate_php_response(path)
-        elif any(ext in path for ext in ['.jpg', '.png', '.gif', '.css', '.js']):
-            return self._generate_static_response(path)
+            return self._generate_php_response(path, keep_alive)
         else:
-            return self._generate_404_response()
+            return self.responses.get('404', keep_alive)
+    
+    def _split_request_sections(self, head, body):
+        """Split request head and body bytes into decoded (location, text) sections"""
+        # latin-1 maps every byte to one character, so nothing is dropped
+        body = body[:max(0, self.inspection_byte_limit - len(head) - 4)].decode('latin-1')
+        head = head[:self.inspection_byte_limit].decode('latin-1')
+        request_line, _, header_block = head.partition('\r\n')
+        
+        parts = request_line.split(' ')
+        target = parts[1] if len(parts) > 1 else ''
+        path, _, query = target.partition('?')
+        
+        sections = [('path', unquote(path)), ('query', unquote_plus(query))]
+        for line in header_block.split('\r\n'):
+            name, sep, value = line.partition(':')
+            if sep:
+                sections.append((f'header:{name.strip().lower()}', unquote_plus(value.strip())))
+        if body:
+            sections.append(('body', unquote_plus(body)))
+        
+        return sections
     
     def _analyze_request(self, request, client_ip):
-        """Analyze request for suspicious patterns"""
-        path = request['path']
-        user_agent = request['headers'].get('user-agent', '').lower()
-        
-        # Check for directory traversal
-        if '../' in path or '..\\' in path:
-            self._log_event('directory_traversal_attempt', client_ip, path=path)
-        
-        # Check for SQL injection patterns
-        sql_patterns = ['union select', 'or 1=1', 'drop table', 'insert into', 'delete from']
-        if any(pattern in path.lower() for pattern in sql_patterns):
-            self._log_event('sql_injection_attempt', client_ip, path=path)
-        
-        # Check for XSS patterns
-        xss_patterns = ['<script', 'javascript:', 'onerror=', 'onload=']
-        if any(pattern in path.lower() for pattern in xss_patterns):
-            self._log_event('xss_attempt', client_ip, path=path)
-        
-        # Check for scanning tools
-        scanner_agents = ['nikto', 'nmap', 'masscan', 'sqlmap', 'dirb', 'gobuster']
-        if any(scanner in user_agent for scanner in scanner_agents):
-            self._log_event('automated_scan', client_ip, user_agent=user_agent)
-        
-        # Check for common attack paths
-        attack_paths = ['/etc/passwd', '/proc/', '/sys/', '/.env', '/config.php']
-        if any(attack_path in path for attack_path in attack_paths):
-            self._log_event('file_access_attempt', client_ip, path=path)
-    
-    def _generate_fake_page_response(self, path):
-        """Generate response for fake pages"""
-        if path == '/admin':
-            content = '''<!DOCTYPE html>
-<html>
-<head><title>Admin Login</title></head>
-<body>
-<h2>Administrator Login</h2>
-<form method="post">
-<p>Username: <input type="text" name="username"></p>
-<p>Password: <input type="password" name="password"></p>
-<p><input type="submit" value="Login"></p>
-</form>
-</body>
-</html>'''
-        elif path == '/wp-admin':
-            content = '''<!DOCTYPE html>
-<html>
-<head><title>WordPress Admin</title></head>
-<body>
-<h1>WordPress</h1>
-<form method="post">
-<p>Username: <input type="text" name="log"></p>
-<p>Password: <input type="password" name="pwd"></p>
-<p><input type="submit" value="Log In"></p>
-</form>
-</body>
-</html>'''
-        elif path == '/phpmyadmin':
-            content = '''<!DOCTYPE html>
-<html>
-<head><title>phpMyAdmin</title></head>
-<body>
-<h1>Welcome to phpMyAdmin</h1>
-<form method="post">
-<p>Username: <input type="text" name="pma_username"></p>
-<p>Password: <input type="password" name="pma_password"></p>
-<p><input type="submit" value="Go"></p>
-</form>
-</body>
-</html>'''
-        else:
-            content = '<html><body><h1>Page Found</h1></body></html>'
+        """Inspect path, query, headers and body for attack signatures"""
+        sections = self._split_request_sections(request['head'], request['body'])
+        
+        # Join sections once so every signature is evaluated in a single scan
+        offsets = []
+        position = 0
+        for _, value in sections:
+            offsets.append(position)
+            position += len(value) + 1
+        inspected = '\n'.join(value for _, value in sections)
+        
+        detections = []
+        seen = set()
+        for category, offset, matched in self.signatures.iter_matches('request', inspected):
+            location = sections[bisect_right(offsets, offset) - 1][0]
+            if (category, location) not in seen:
+                seen.add((category, location))
+                detections.append({
+                    'category': category,
+                    'event_type': self.signatures.event_type(category),
+                    'location': location,
+                    'match': matched[:200]
+                })
         
-        return self._build_http_response(200, "OK", content)
+        # Scanning tools
+        user_agent = request['headers'].get('user-agent', '')
+        for category in self.signatures.match('user_agent', user_agent):
+            detections.append({
+                'category': category,
+                'event_type': self.signatures.event_type(category),
+                'location': 'header:user-agent',
+                'match': user_agent[:200]
+            })
+        
+        if detections:
+            self.tarpit.flag(client_ip, {d['category'] for d in detections})
+            self._log_event(
+                'attack_detected',
+                client_ip,
+                method=request['method'],
+                path=request['path'],
+                user_agent=user_agent,
+                categories=sorted({d['category'] for d in detections}),
+                event_types=sorted({d['event_type'] for d in detections}),
+                detections=detections,
+                inspected_bytes=min(len(request['head']) + 4 + len(request['body']), self.inspection_byte_limit)
+            )
     
-    def _generate_index_response(self):
-        """Generate index page response"""
-        content = '''<!DOCTYPE html>
+    def _build_response_cache(self, http_config):
+        """Pre-encode the fixed pages and the fake page templates"""
+        responses = ResponseCache(
+            self.server_name,
+            http_config.get('template_dir', 'config/http_templates'),
+            http_config.get('template_check_interval', 2)
+        )
+        for path, template in self.fake_pages.items():
+            responses.add_template(path, template, fallback='<html><body><h1>Page Found</h1></body></html>')
+        
+        responses.add('index', 200, "OK", '''<!DOCTYPE html>
 <html>
 <head>
     <title>Welcome to Apache2 Ubuntu Default Page</title>
@@ -210,22 +397,28 @@ class HTTPHoneypot:
     <p>It works!</p>
     <p>This is the default welcome page used to test the correct operation of the Apache2 server after installation on Ubuntu systems.</p>
 </body>
-</html>'''
-        return self._build_http_response(200, "OK", content)
-    
-    def _generate_admin_response(self):
-        """Generate admin area response"""
-        content = '''<!DOCTYPE html>
+</html>''')
+        responses.add('admin', 401, "Unauthorized", '''<!DOCTYPE html>
 <html>
 <head><title>Restricted Area</title></head>
 <body>
 <h1>401 Unauthorized</h1>
 <p>This server could not verify that you are authorized to access the document requested.</p>
 </body>
-</html>'''
-        return self._build_http_response(401, "Unauthorized", content)
+</html>''')
+        responses.add('404', 404, "Not Found", '''<!DOCTYPE html>
+<html>
+<head><title>404 Not Found</title></head>
+<body>
+<h1>Not Found</h1>
+<p>The requested URL was not found on this server.</p>
+<hr>
+<address>''' + self.server_name + ''' Server</address>
+</body>
+</html>''')
+        return responses
     
-    def _generate_api_response(self, path):
+    def _generate_api_response(self, path, keep_alive=False):
         """Generate API response"""
         api_data = {
             "error": "API endpoint not found",
@@ -233,9 +426,10 @@ class HTTPHoneypot:
             "path": path
         }
         content = json.dumps(api_data)
-        return self._build_http_response(404, "Not Found", content, content_type="application/json")
+        return self._build_http_response(404, "Not Found", content, content_type="application/json",
+                                         keep_alive=keep_alive)
     
-    def _generate_php_response(self, path):
+    def _generate_php_response(self, path, keep_alive=False):
         """Generate PHP file response"""
         content = '''<!DOCTYPE html>
 <html>
@@ -245,25 +439,12 @@ class HTTPHoneypot:
 <p>Parse error: syntax error, unexpected end of file in ''' + path + ''' on line 1</p>
 </body>
 </html>'''
-        return self._build_http_response(500, "Internal Server Error", content)
-    
-    def _generate_static_response(self, path):
-        """Generate static file response"""
-        return self._generate_404_response()
+        return self._build_http_response(500, "Internal Server Error", content, keep_alive=keep_alive)
     
-    def _generate_404_response(self):
-        """Generate 404 response"""
-        content = '''<!DOCTYPE html>
-<html>
-<head><title>404 Not Found</title></head>
-<body>
-<h1>Not Found</h1>
-<p>The requested URL was not found on this server.</p>
-<hr>
-<address>''' + self.server_name + ''' Server</address>
-</body>
-</html>'''
-        return self._build_http_response(404, "Not Found", content)
+    def _generate_static_response(self, request, asset):
+        """Static asset response; the file body is sent separately with sendfile()"""
+        return self.assets.respond(asset, request['headers'], request['keep_alive'],
+                                   head_only=request['method'] == 'HEAD')
     
     def _generate_error_response(self, code, message):
         """Generate error response"""
@@ -276,18 +457,73 @@ class HTTPHoneypot:
 </html>'''
         return self._build_http_response(code, message, content)
     
-    def _build_http_response(self, status_code, status_message, content, content_type="text/html"):
-        """Build HTTP response"""
-        response = f"HTTP/1.1 {status_code} {status_message}\r\n"
-        response += f"Server: {self.server_name}\r\n"
-        response += f"Content-Type: {content_type}\r\n"
-        response += f"Content-Length: {len(content.encode('utf-8'))}\r\n"
-        response += f"Date: {datetime.utcnow().strftime('%a, %d %b %Y %H:%M:%S GMT')}\r\n"
-        response += "Connection: close\r\n"
-        response += "\r\n"
-        response += content
+    def _build_http_response(self, status_code, status_message, content, content_type="text/html",
+                             keep_alive=False):
+        """Build a response whose body depends on the request"""
+        return build_response(self.server_name, status_code, status_message, content.encode('utf-8'),
+                              content_type=content_type, keep_alive=keep_alive)
+    
+    def _new_parser(self):
+        """Request parser for one connection"""
+        return HTTPRequestParser(self.max_header_bytes, self.max_body_bytes)
+    
+    def _respond(self, requests, client_ip):
+        """Build the responses to a batch of pipelined requests.
         
-        return response.encode('utf-8')
+        Returns the parts to send, in request order, and whether the
+        connection stays open afterwards. Parts are bytes, with adjacent
+        responses joined, and FileBody objects for static asset bodies.
+        """
+        parts = []
+        pending = []
+        keep_open = True
+        for request in requests:
+            keep_alive = request['keep_alive'] and request['sequence'] < self.max_keepalive_requests
+            request['keep_alive'] = keep_alive
+            response = self._generate_response(request, client_ip)
+            if isinstance(response, tuple):
+                head, body = response
+                pending.append(head)
+                parts.extend((b''.join(pending), body))
+                pending = []
+            else:
+                pending.append(response)
+            if not keep_alive:
+                keep_open = False
+                break
+        if pending:
+            parts.append(b''.join(pending))
+        return parts, keep_open
+    
+    def _send(self, client_socket, parts):
+        """Send response parts; file bodies go out with sendfile()"""
+        for part in parts:
+            if isinstance(part, FileBody):
+                with open(part.path, 'rb') as f:
+                    client_socket.sendfile(f, 0, part.size)
+                count_bytes(sent=part.size)
+            else:
+                client_socket.sendall(part)
+                count_bytes(sent=len(part))
+    
+    async def _send_async(self, writer, parts):
+        """Send response parts on the event loop; file bodies go out with sendfile()"""
+        loop = asyncio.get_running_loop()
+        for part in parts:
+            if isinstance(part, FileBody):
+                with open(part.path, 'rb') as f:
+                    await asyncio.wait_for(loop.sendfile(writer.transport, f, 0, part.size),
+                                           self.request_timeout)
+                count_bytes(sent=part.size)
+            else:
+                writer.write(part)
+                count_bytes(sent=len(part))
+        await asyncio.wait_for(writer.drain(), self.request_timeout)
+    
+    def _parse_error_response(self, error, client_ip):
+        """Log an unframeable request and build its error response"""
+        self._log_event('malformed_request', client_ip, status=error.status, error=error.reason)
+        return self._generate_error_response(error.status, error.reason)
     
     def handle_client(self, client_socket, client_address):
         """Handle individual HTTP client connections"""
@@ -297,37 +533,50 @@ class HTTPHoneypot:
         try:
             self._log_event('connection_attempt', client_ip, source_port=client_port)
             
-            # Receive request
-            request_data = b''
-            client_socket.settimeout(10)
+            parser = self._new_parser()
+            client_socket.settimeout(self.request_timeout)
+            
+            if self.tls is not None:
+                tls_socket = self._tls_handshake(client_socket, client_ip)
+                if tls_socket is None:
+                    return
+                client_socket = tls_socket
             
             while True:
                 try:
-                    chunk = client_socket.recv(4096)
-                    if not chunk:
-                        break
-                    request_data += chunk
-                    
-                    # Check if we have complete request
-                    if b'\r\n\r\n' in request_data:
-                        break
-                        
-                except socket.timeout:
+                    chunk = client_socket.recv(65536)
+                except OSError:
                     break
-                except Exception:
+                if not chunk:
                     break
-            
-            if request_data:
-                # Parse and handle request
-                request = self._parse_http_request(request_data)
-                response = self._generate_response(request, client_ip)
+                count_bytes(received=len(chunk))
+                if not parser.pending():
+                    client_socket.settimeout(self.request_timeout)
                 
-                # Send response
                 try:
-                    client_socket.sendall(response)
-                except Exception:
-                    pass
+                    requests = parser.feed(chunk)
+                except HTTPParseError as e:
+                    client_socket.sendall(self._parse_error_response(e, client_ip))
+                    break
+                if not requests:
+                    continue
+                
+                parts, keep_open = self._respond(requests, client_ip)
+                
+                # Identified bots get an endless, dripped response instead (a TLS
+                # session can't be handed over; they are tarpitted on reconnect)
+                if self.tls is None and self.tarpit.wants(self.service, client_ip) and self.tarpit.hold(
+                        client_socket, client_ip, self.service):
+                    return
+                
+                # Pipelined responses go out in one send, apart from file bodies
+                self._send(client_socket, parts)
+                if not keep_open:
+                    break
+                client_socket.settimeout(self.keepalive_timeout)
             
+        except OSError:
+            pass
         except Exception as e:
             self._log_event('connection_error', client_ip, error=str(e))
         finally:
@@ -336,41 +585,253 @@ class HTTPHoneypot:
             except:
                 pass
     
+    async def handle_client_async(self, reader, writer):
+        """Handle an HTTP client connection on the event loop"""
+        client_ip, client_port = writer.get_extra_info('peername')[:2]
+        self._log_event('connection_attempt', client_ip, source_port=client_port)
+        await self._serve_requests_async(reader, writer, client_ip)
+    
+    async def _serve_requests_async(self, reader, writer, client_ip):
+        """Read, answer and log requests until the connection ends"""
+        loop = asyncio.get_running_loop()
+        
+        try:
+            # Each request must arrive within request_timeout, and an idle
+            # keep-alive connection is closed after keepalive_timeout
+            parser = self._new_parser()
+            deadline = loop.time() + self.request_timeout
+            
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    chunk = await asyncio.wait_for(reader.read(65536), remaining)
+                except (asyncio.TimeoutError, ConnectionError):
+                    break
+                if not chunk:
+                    break
+                count_bytes(received=len(chunk))
+                if not parser.pending():
+                    deadline = loop.time() + self.request_timeout
+                
+                try:
+                    requests = parser.feed(chunk)
+                except HTTPParseError as e:
+                    writer.write(self._parse_error_response(e, client_ip))
+                    await asyncio.wait_for(writer.drain(), self.request_timeout)
+                    break
+                if not requests:
+                    continue
+                
+                parts, keep_open = self._respond(requests, client_ip)
+                
+                if self.tls is None and self.tarpit.wants(self.service, client_ip) and self.tarpit.hold(
+                        writer.get_extra_info('socket'), client_ip, self.service):
+                    return
+                
+                await self._send_async(writer, parts)
+                if not keep_open:
+                    break
+                deadline = loop.time() + self.keepalive_timeout
+            
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        except Exception as e:
+            self._log_event('connection_error', client_ip, error=str(e))
+        finally:
+            writer.close()
+    
+    def _tls_handshake(self, client_socket, client_ip):
+        """Fingerprint the ClientHello and complete the handshake.
+        
+        Returns the TLS socket, or None if the handshake failed.
+        """
+        try:
+            hello = peek_client_hello(client_socket, self.request_timeout)
+        except OSError:
+            return None
+        fingerprint = self.tls.client_hellos.fingerprint(hello) or {}
+        
+        try:
+            tls_socket = self.tls.context.wrap_socket(client_socket, server_side=True)
+        except (ssl.SSLError, OSError) as e:
+            self._log_event('tls_handshake', client_ip, success=False, error=str(e), **fingerprint)
+            return None
+        
+        self._log_event('tls_handshake', client_ip, success=True, **self.tls.describe(tls_socket), **fingerprint)
+        return tls_socket
+    
+    async def _tls_handshake_async(self, client_socket, client_ip):
+        """_tls_handshake on the event loop; returns a reader and writer, or None"""
+        loop = asyncio.get_running_loop()
+        try:
+            hello = await peek_client_hello_async(client_socket, self.request_timeout)
+        except OSError:
+            client_socket.close()
+            return None
+        fingerprint = self.tls.client_hellos.fingerprint(hello) or {}
+        
+        reader = asyncio.StreamReader()
+        protocol = asyncio.StreamReaderProtocol(reader)
+        try:
+            transport, _ = await loop.connect_accepted_socket(
+                lambda: protocol, client_socket,
+                ssl=self.tls.context, ssl_handshake_timeout=self.request_timeout
+            )
+        except (ssl.SSLError, OSError, asyncio.TimeoutError) as e:
+            client_socket.close()
+            self._log_event('tls_handshake', client_ip, success=False, error=str(e) or type(e).__name__,
+                            **fingerprint)
+            return None
+        
+        self._log_event('tls_handshake', client_ip, success=True,
+                        **self.tls.describe(transport.get_extra_info('ssl_object')), **fingerprint)
+        return reader, asyncio.StreamWriter(transport, protocol, reader, loop)
+    
+    async def _handle_tls_client_async(self, client_socket, client_address):
+        """Admit, fingerprint and handshake an accepted connection, then serve it"""
+        client_ip, client_port = client_address[:2]
+        if not self.admission.admit(client_ip):
+            self.admission.refuse(client_socket, client_ip)
+            return
+        try:
+            with self.sessions.session(client_address):
+                self._log_event('connection_attempt', client_ip, source_port=client_port)
+                streams = await self._tls_handshake_async(client_socket, client_ip)
+                if streams is not None:
+                    await self._serve_requests_async(*streams, client_ip)
+        finally:
+            self.admission.release(client_ip)
+    
+    async def _serve_tls_async(self):
+        """Accept loop of the asyncio HTTPS server.
+        
+        asyncio's own TLS servers complete the handshake before handing
+        over the connection, so connections are accepted here and their
+        ClientHello is peeked at before the handshake starts.
+        """
+        loop = asyncio.get_running_loop()
+        server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if reuse_port():
+            server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        server_socket.bind((self.host, self.port))
+        server_socket.listen(1024)
+        server_socket.setblocking(False)
+        
+        self.logger.info(f"{self.service.upper()} Honeypot (asyncio) started on {self.host}:{self.port}")
+        self._log_event('honeypot_started', '0.0.0.0', server_mode='asyncio')
+        
+        # The loop only keeps weak references to tasks
+        tasks = set()
+        try:
+            while True:
+                client_socket, client_address = await loop.sock_accept(server_socket)
+                client_socket.setblocking(False)
+                task = loop.create_task(self._handle_tls_client_async(client_socket, client_address))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        finally:
+            server_socket.close()
+    
+    async def _serve_async(self):
+        """Run the asyncio HTTP server until cancelled"""
+        if self.tls is not None:
+            return await self._serve_tls_async()
+        
+        server = await asyncio.start_server(
+            self.admission.guard_async(self.sessions.track_async(self.handle_client_async)),
+            self.host,
+            self.port,
+            backlog=1024,
+            reuse_address=True,
+            reuse_port=reuse_port()
+        )
+        
+        self.logger.info(f"{self.service.upper()} Honeypot (asyncio) started on {self.host}:{self.port}")
+        self._log_event('honeypot_started', '0.0.0.0', server_mode='asyncio')
+        
+        async with server:
+            await server.serve_forever()
+    
+    def _start_asyncio(self):
+        """Start the HTTP honeypot as a single-threaded asyncio server"""
+        try:
+            asyncio.run(self._serve_async())
+        except KeyboardInterrupt:
+            pass
+        except Exception as e:
+            self.logger.error(f"Failed to start {self.service.upper()} honeypot: {e}")
+        finally:
+            self._log_event('honeypot_stopped', '0.0.0.0')
+    
     def start(self):
         """Start the HTTP honeypot server"""
+        if self.server_mode == 'asyncio':
+            return self._start_asyncio()
+        
         server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if reuse_port():
+            server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
         
         try:
             server_socket.bind((self.host, self.port))
             server_socket.listen(100)
             
-            self.logger.info(f"HTTP Honeypot started on {self.host}:{self.port}")
+            self.pool.start()
+            self.logger.info(f"{self.service.upper()} Honeypot started on {self.host}:{self.port}")
             self._log_event('honeypot_started', '0.0.0.0')
             
             while True:
                 try:
                     client_socket, client_address = server_socket.accept()
                     
-                    client_thread = threading.Thread(
-                        target=self.handle_client,
-                        args=(client_socket, client_address)
-                    )
-                    client_thread.daemon = True
-                    client_thread.start()
+                    if not self.admission.admit(client_address[0]):
+                        self.admission.refuse(client_socket, client_address[0])
+                        continue
+                    
+                    if not self.pool.submit(client_socket, client_address):
+                        self.admission.release(client_address[0])
                     
                 except KeyboardInterrupt:
                     break
                 except Exception as e:
-                    self.logger.error(f"HTTP server error: {e}")
+                    self.logger.error(f"{self.service.upper()} server error: {e}")
                     
         except Exception as e:
-            self.logger.error(f"Failed to start HTTP honeypot: {e}")
+            self.logger.error(f"Failed to start {self.service.upper()} honeypot: {e}")
         finally:
             server_socket.close()
             self._log_event('honeypot_stopped', '0.0.0.0')
 
 
+class HTTPSHoneypot(HTTPHoneypot):
+    """The HTTP honeypot behind TLS.
+    
+    Settings missing from honeypot.https (pages, templates, timeouts,
+    server mode) are taken from honeypot.http. Every connection's
+    ClientHello is fingerprinted (JA3) before the handshake.
+    """
+    
+    service = 'https'
+    # A plaintext 503 means nothing to a TLS client
+    reject_message = b''
+    
+    def __init__(self, config, logger):
+        super().__init__(config, logger)
+        self.tls = get_tls_server(self._service_config(config))
+    
+    def _service_config(self, config):
+        return https_config(config)
+
+
+def https_config(config):
+    """The https section completed with the settings it leaves to the http section"""
+    return {**config['honeypot']['http'], **config['honeypot'].get('https', {})}
+
+
 if __name__ == '__main__':
     import yaml
     
@@ -387,4 +848,4 @@ if __name__ == '__main__':
     
     # Start HTTP honeypot
     honeypot = HTTPHoneypot(config, logger)
-    honeypot.start()
\ No newline at end of file
+    honeypot.start()
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+
+import os
+import time
+import logging
+import mimetypes
+import threading
+from email.utils import formatdate
+
+_date_cache = (0, b'')
+
+
+def http_date():
+    """Current IMF-fixdate, formatted at most once per second"""
+    global _date_cache
+    now = int(time.time())
+    second, value = _date_cache
+    if second != now:
+        value = formatdate(now, usegmt=True).encode('ascii')
+        _date_cache = (now, value)
+    return value
+
+
+def _head_parts(server_name, status_code, status_message, content_type, length, extra_headers=()):
+    """Encoded header block around the Date value, ending with 'Connection: '
+
+    content_type and length may be None for responses without a body (304).
+    """
+    headers = [f"Content-Type: {content_type}"] if content_type else []
+    if length is not None:
+        headers.append(f"Content-Length: {length}")
+    headers.extend(extra_headers)
+    before = f"HTTP/1.1 {status_code} {status_message}\r\nServer: {server_name}\r\nDate: "
+    after = ''.join(f"\r\n{header}" for header in headers) + "\r\nConnection: "
+    return before.encode('latin-1'), after.encode('latin-1')
+
+
+def build_response(server_name, status_code, status_message, body, content_type='text/html',
+                   keep_alive=False, extra_headers=()):
+    """Encode a one-off response; body is bytes"""
+    before, after = _head_parts(server_name, status_code, status_message, content_type,
+                                len(body), extra_headers)
+    connection = b'keep-alive\r\n\r\n' if keep_alive else b'close\r\n\r\n'
+    return before + http_date() + after + connection + body
+
+
+class FileBody:
+    """Response body sent straight from a file with sendfile()"""
+
+    __slots__ = ('path', 'size')
+
+    def __init__(self, path, size):
+        self.path = path
+        self.size = size
+
+
+class _CachedResponse:
+    """Pre-encoded response split around its Date value.
+
+    For file-backed responses body is empty and length is the file size.
+    """
+
+    __slots__ = ('before_date', 'after_close', 'after_keep_alive', 'body', 'rendered')
+
+    def __init__(self, server_name, status_code, status_message, body, content_type,
+                 length=None, extra_headers=()):
+        if length is None and content_type is not None:
+            length = len(body)
+        before, after = _head_parts(server_name, status_code, status_message, content_type,
+                                    length, extra_headers)
+        self.before_date = before
+        self.after_close = after + b'close\r\n\r\n'
+        self.after_keep_alive = after + b'keep-alive\r\n\r\n'
+        self.body = body
+        # (date, close variant, keep-alive variant)
+        self.rendered = (b'', b'', b'')
+
+    def render(self, date):
+        """Both connection variants for the current second"""
+        rendered = (
+            date,
+            self.before_date + date + self.after_close + self.body,
+            self.before_date + date + self.after_keep_alive + self.body
+        )
+        self.rendered = rendered
+        return rendered
+
+    def current(self, keep_alive=False):
+        """Response bytes carrying the current Date"""
+        date = http_date()
+        rendered = self.rendered
+        if rendered[0] != date:
+            rendered = self.render(date)
+        return rendered[2] if keep_alive else rendered[1]
+
+
+class ResponseCache:
+    """Decoy responses encoded once and served from memory.
+
+    Fixed pages are registered with add(); fake pages come from template
+    files and are re-read when their modification time changes, checked
+    every check_interval seconds by a background thread. Serving a
+    response is a dict lookup; only the Date header is refreshed, once
+    per second.
+    """
+
+    def __init__(self, server_name, template_dir, check_interval=2):
+        self.server_name = server_name
+        self.template_dir = template_dir
+        self.check_interval = check_interval
+        self.entries = {}
+        # key -> [path, mtime, status code, status message, content type, fallback]
+        self.templates = {}
+        self.watcher_pid = None
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger('HTTP_Responses')
+
+    def add(self, key, status_code, status_message, content, content_type='text/html'):
+        """Register a fixed response; content is str or bytes"""
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        self.entries[key] = _CachedResponse(self.server_name, status_code, status_message,
+                                            content, content_type)
+
+    def add_template(self, key, template, fallback, status_code=200, status_message='OK',
+                     content_type='text/html'):
+        """Register a response whose body is a template file, or fallback if it is missing"""
+        path = os.path.join(self.template_dir, template)
+        self.templates[key] = [path, None, status_code, status_message, content_type, fallback]
+        self._load_template(key)
+
+    def _load_template(self, key):
+        path, _, status_code, status_message, content_type, fallback = self.templates[key]
+        try:
+            mtime = os.stat(path).st_mtime_ns
+            with open(path, 'rb') as f:
+                content = f.read()
+        except OSError:
+            self.logger.warning(f"Template {path} not found, serving a generic page for {key}")
+            mtime, content = None, fallback
+        self.templates[key][1] = mtime
+        self.add(key, status_code, status_message, content, content_type)
+
+    def _check_templates(self):
+        """Reload templates whose files changed since they were loaded"""
+        for key, (path, mtime, *_) in list(self.templates.items()):
+            try:
+                current = os.stat(path).st_mtime_ns
+            except OSError:
+                current = None
+            if current != mtime:
+                self._load_template(key)
+                self.logger.info(f"Reloaded template {path}")
+
+    def _start_watcher(self):
+        """Start the thread checking templates for changes (one per process)"""
+        with self.lock:
+            if self.watcher_pid == os.getpid():
+                return
+            self.watcher_pid = os.getpid()
+        watcher = threading.Thread(target=self._watch, name='HTTP_Templates')
+        watcher.daemon = True
+        watcher.start()
+
+    def _watch(self):
+        while True:
+            time.sleep(self.check_interval)
+            try:
+                self._check_templates()
+            except Exception as e:
+                self.logger.error(f"Template check failed: {e}")
+
+    def get(self, key, keep_alive=False):
+        """Response bytes for a registered key, or None"""
+        if self.templates and self.watcher_pid != os.getpid():
+            self._start_watcher()
+
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        return entry.current(keep_alive)
+
+
+# Precompressed variants sit next to the asset, in order of preference
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+class _Variant:
+    __slots__ = ('encoding', 'etag', 'body', 'ok', 'not_modified')
+
+
+class _Asset:
+    __slots__ = ('stamp', 'last_modified', 'variants')
+
+
+def _accepted_encodings(header):
+    """Content codings a client accepts (ignoring those with q=0)"""
+    accepted = set()
+    for token in header.lower().split(','):
+        name, _, params = token.partition(';')
+        if params.replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        accepted.add(name.strip())
+    return accepted
+
+
+class StaticAssets:
+    """Static decoy files (a mirrored site's CSS, JS, images) served by sendfile().
+
+    The directory is scanned at startup and rescanned every check_interval
+    seconds by a background thread, which swaps in the new index whole so
+    lookups stay a dict read. Each file gets its status line and headers (Content-Type,
+    Content-Length, ETag, Last-Modified) encoded once, plus a 304 response
+    for conditional requests; foo.js.br / foo.js.gz next to foo.js are
+    served to clients that accept them. The body never passes through
+    Python: handlers send the head and then sendfile() the file.
+    """
+
+    def __init__(self, server_name, directory, check_interval=10):
+        self.server_name = server_name
+        self.directory = directory
+        self.check_interval = check_interval
+        self.assets = {}
+        self.watcher_pid = None
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger('HTTP_Responses')
+        self._scan()
+        if self.assets:
+            self.logger.info(f"Serving {len(self.assets)} static assets from {directory}")
+
+    def _scan(self):
+        """Index the directory, reusing entries whose files did not change"""
+        if not os.path.isdir(self.directory):
+            self.assets = {}
+            return
+        assets = {}
+        for root, _, files in os.walk(self.directory):
+            names = set(files)
+            for name in files:
+                if any(name.endswith(suffix) and name[:-len(suffix)] in names for _, suffix in ENCODINGS):
+                    continue  # Precompressed variant of another file
+                file_path = os.path.join(root, name)
+                url = '/' + os.path.relpath(file_path, self.directory).replace(os.sep, '/')
+                try:
+                    assets[url] = asset = self._index(file_path, self.assets.get(url))
+                except OSError:
+                    continue
+                if name == 'index.html':
+                    assets[url[:-len('index.html')]] = asset
+        self.assets = assets
+
+    def _index(self, file_path, current):
+        """Encode the responses for one file; current is kept if nothing changed"""
+        stat = os.stat(file_path)
+        variants = [(None, file_path, stat)]
+        for encoding, suffix in ENCODINGS:
+            try:
+                variants.append((encoding, file_path + suffix, os.stat(file_path + suffix)))
+            except OSError:
+                pass
+        stamp = tuple((path, info.st_size, info.st_mtime_ns) for _, path, info in variants)
+        if current is not None and current.stamp == stamp:
+            return current
+
+        asset = _Asset()
+        asset.stamp = stamp
+        asset.last_modified = formatdate(stat.st_mtime, usegmt=True)
+        content_type = mimetypes.guess_type(file_path)[0] or 'application/octet-stream'
+        # Apache-style ETag: size and mtime (microseconds) in hex
+        etag = f'{stat.st_size:x}-{stat.st_mtime_ns // 1000:x}'
+        vary = ('Vary: Accept-Encoding',) if len(variants) > 1 else ()
+
+        asset.variants = []
+        # Encoded variants first, in order of preference; identity last
+        for encoding, path, info in variants[1:] + variants[:1]:
+            variant = _Variant()
+            variant.encoding = encoding
+            variant.etag = f'"{etag}-{encoding}"' if encoding else f'"{etag}"'
+            validators = (f"ETag: {variant.etag}", f"Last-Modified: {asset.last_modified}") + vary
+            encoded = (f"Content-Encoding: {encoding}",) if encoding else ()
+            variant.body = FileBody(path, info.st_size)
+            variant.ok = _CachedResponse(self.server_name, 200, 'OK', b'', content_type,
+                                         length=info.st_size, extra_headers=validators + encoded)
+            variant.not_modified = _CachedResponse(self.server_name, 304, 'Not Modified', b'', None,
+                                                   extra_headers=validators)
+            asset.variants.append(variant)
+        return asset
+
+    def _start_watcher(self):
+        """Start the thread rescanning the directory (one per process)"""
+        with self.lock:
+            if self.watcher_pid == os.getpid():
+                return
+            self.watcher_pid = os.getpid()
+        watcher = threading.Thread(target=self._watch, name='HTTP_Static')
+        watcher.daemon = True
+        watcher.start()
+
+    def _watch(self):
+        while True:
+            time.sleep(self.check_interval)
+            try:
+                self._scan()
+            except Exception as e:
+                self.logger.error(f"Static asset scan failed: {e}")
+
+    def lookup(self, path):
+        """Asset for a request path (query string ignored), or None"""
+        if self.watcher_pid != os.getpid():
+            self._start_watcher()
+        return self.assets.get(path.split('?', 1)[0])
+
+    def respond(self, asset, headers, keep_alive=False, head_only=False):
+        """Head bytes alone (304, HEAD) or (head bytes, FileBody) for sendfile"""
+        variant = asset.variants[-1]
+        accepted = _accepted_encodings(headers.get('accept-encoding', ''))
+        for candidate in asset.variants[:-1]:
+            if candidate.encoding in accepted:
+                variant = candidate
+                break
+
+        if_none_match = headers.get('if-none-match')
+        if if_none_match is not None:
+            fresh = if_none_match.strip() == '*' or variant.etag in if_none_match
+        else:
+            fresh = headers.get('if-modified-since') == asset.last_modified
+        if fresh:
+            return variant.not_modified.current(keep_alive)
+
+        head = variant.ok.current(keep_alive)
+        if head_only:
+            return head
+        return head, variant.body
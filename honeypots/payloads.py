@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+
+import os
+import re
+import json
+import time
+import uuid
+import base64
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from honeypots.sketches import HyperLogLog
+from honeypots.workers import worker_tag
+
+# URLs handed to downloaders in shell commands
+URL_PATTERN = re.compile(r'(?:https?|ftp|tftp)://[^\s\'"|;&<>`)]+', re.IGNORECASE)
+DOWNLOADERS = re.compile(r'\b(?:wget|curl|tftp|ftpget|fetch)\b')
+
+
+def extract_urls(command):
+    """URLs passed to wget/curl-style downloaders in a shell command"""
+    if not DOWNLOADERS.search(command):
+        return []
+    urls = []
+    for url in URL_PATTERN.findall(command):
+        if url not in urls:
+            urls.append(url)
+    return urls
+
+
+class PayloadWriter:
+    """Streams one captured payload to a temporary file while hashing it"""
+
+    def __init__(self, store, service, client_ip, kind, limit, metadata):
+        self.store = store
+        self.service = service
+        self.client_ip = client_ip
+        self.kind = kind
+        self.limit = limit
+        self.metadata = metadata
+        self.digest = hashlib.sha256()
+        self.size = 0
+        self.truncated = False
+        self.temp_path = os.path.join(store.directory, 'tmp', uuid.uuid4().hex)
+        # With the store disabled the payload is only hashed
+        self.file = open(self.temp_path, 'wb') if store.enabled else None
+
+    def write(self, data):
+        """Add bytes; returns False once the size cap has been reached"""
+        if self.truncated:
+            return False
+        if self.size + len(data) > self.limit:
+            data = data[:self.limit - self.size]
+            self.truncated = True
+        if self.file:
+            self.file.write(data)
+        self.digest.update(data)
+        self.size += len(data)
+        return not self.truncated
+
+    def close(self):
+        """Finish the capture and return its index record"""
+        if self.file is None:
+            return {'sha256': self.digest.hexdigest(), 'size': self.size,
+                    'truncated': self.truncated, 'stored': False, 'duplicate': False}
+        self.file.close()
+        return self.store._commit(self)
+
+    def abort(self):
+        """Discard a capture that did not complete"""
+        if self.file:
+            self.file.close()
+            os.unlink(self.temp_path)
+
+
+class PayloadStore:
+    """Content-addressed store for captured payloads.
+
+    Uploads, request bodies and downloader URLs are stored once under their
+    SHA-256 in objects/<first two hex digits>/<hash>. A compact index keeps
+    size, first/last seen, capture count, a few sample sources and a
+    HyperLogLog estimate of distinct sources per hash, so a dropper pushed
+    by thousands of bots costs one object and one index entry.
+
+    At most max_index_entries hashes stay in memory. The least recently
+    seen ones are appended to evicted.jsonl on the next flush; if one comes
+    back, the object already on disk marks it as a duplicate and readers
+    add its counts to the evicted record. The index is written by a
+    background thread every flush_interval seconds, never by the threads
+    handling connections.
+    """
+
+    def __init__(self, config=None):
+        payload_config = (config or {}).get('payloads', {})
+        self.enabled = payload_config.get('enabled', True)
+        self.directory = payload_config.get('directory', 'payloads')
+        self.max_payload_bytes = payload_config.get('max_payload_bytes', 10485760)
+        self.max_total_bytes = payload_config.get('max_total_bytes', 1073741824)
+        self.sample_sources = payload_config.get('sample_sources', 10)
+        self.flush_interval = payload_config.get('flush_interval', 30)
+        self.max_index_entries = payload_config.get('max_index_entries', 100000)
+        # Worker processes keep their own index files; readers merge them
+        tag = worker_tag()
+        self.index_path = os.path.join(self.directory, f'index.{tag}.json' if tag else 'index.json')
+        self.evicted_path = os.path.join(self.directory, f'evicted.{tag}.jsonl' if tag else 'evicted.jsonl')
+        self.logger = logging.getLogger('PayloadStore')
+        self.lock = threading.Lock()
+        self.index = OrderedDict()
+        self.evicted = []
+        self.total_bytes = 0
+        self.dirty = False
+        self.flusher_pid = None
+        self.pid = os.getpid()
+
+        if self.enabled:
+            os.makedirs(os.path.join(self.directory, 'tmp'), exist_ok=True)
+            os.makedirs(os.path.join(self.directory, 'objects'), exist_ok=True)
+            self._load_index()
+
+    def _object_path(self, sha256):
+        return os.path.join(self.directory, 'objects', sha256[:2], sha256)
+
+    def _load_index(self):
+        try:
+            index = _read_index(self.index_path)
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Could not read payload index: {e}")
+            index = {}
+        # Least recently seen first, as the LRU order expects
+        self.index = OrderedDict(sorted(index.items(), key=lambda item: item[1]['last_seen']))
+        self._evict()
+        # Evicted entries are no longer in the index but their objects count
+        objects = os.path.join(self.directory, 'objects')
+        for prefix in os.scandir(objects):
+            if prefix.is_dir():
+                self.total_bytes += sum(entry.stat().st_size for entry in os.scandir(prefix.path))
+
+    def _evict(self):
+        """Move the least recently seen entries beyond the cap to the evicted list (lock held)"""
+        while len(self.index) > self.max_index_entries:
+            self.evicted.append(self.index.popitem(last=False))
+            self.dirty = True
+
+    def open(self, service, client_ip, kind, limit=None, **metadata):
+        """Start streaming a payload; close() the writer to commit it"""
+        limit = min(limit or self.max_payload_bytes, self.max_payload_bytes)
+        return PayloadWriter(self, service, client_ip, kind, limit, metadata)
+
+    def capture(self, data, service, client_ip, kind, **metadata):
+        """Store an in-memory payload and return its index record"""
+        if not self.enabled or not data:
+            return None
+        if isinstance(data, str):
+            data = data.encode('utf-8', errors='ignore')
+        writer = self.open(service, client_ip, kind, **metadata)
+        writer.write(data)
+        return writer.close()
+
+    def _commit(self, writer):
+        """Deduplicate a finished capture and update the index"""
+        sha256 = writer.digest.hexdigest()
+        now = datetime.utcnow().isoformat()
+
+        with self.lock:
+            entry = self.index.get(sha256)
+            duplicate = entry is not None
+            if duplicate:
+                self.index.move_to_end(sha256)
+            elif os.path.exists(self._object_path(sha256)):
+                # Evicted from the index, or stored by another worker
+                duplicate = True
+            if entry is None:
+                stored = not duplicate and self.total_bytes + writer.size <= self.max_total_bytes
+                entry = self.index[sha256] = {
+                    'size': writer.size,
+                    'kind': writer.kind,
+                    'services': [],
+                    'first_seen': now,
+                    'count': 0,
+                    'truncated': writer.truncated,
+                    'stored': stored,
+                    'sample_sources': [],
+                    'sources': HyperLogLog(6),
+                    **writer.metadata
+                }
+                if stored:
+                    self.total_bytes += writer.size
+                self._evict()
+            else:
+                stored = False
+
+            entry['last_seen'] = now
+            entry['count'] += 1
+            entry['sources'].add(writer.client_ip)
+            if writer.service not in entry['services']:
+                entry['services'].append(writer.service)
+            if (writer.client_ip not in entry['sample_sources']
+                    and len(entry['sample_sources']) < self.sample_sources):
+                entry['sample_sources'].append(writer.client_ip)
+            self.dirty = True
+            record = _describe(sha256, entry)
+
+        if stored:
+            path = self._object_path(sha256)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(writer.temp_path, path)
+        else:
+            os.unlink(writer.temp_path)
+
+        record['duplicate'] = duplicate
+        if self.flusher_pid != os.getpid():
+            self._start_flusher()
+        return record
+
+    def record_url(self, url, service, client_ip):
+        """Index a URL an attacker tried to download from"""
+        return self.capture(url, service, client_ip, 'url', url=url[:2048])
+
+    def record_urls(self, command, service, client_ip):
+        """Index every downloader URL in a shell command and return them"""
+        urls = extract_urls(command)
+        for url in urls:
+            self.record_url(url, service, client_ip)
+        return urls
+
+    def _start_flusher(self):
+        """Start the thread writing the index (one per process)"""
+        with self.lock:
+            if self.flusher_pid == os.getpid():
+                return
+            self.flusher_pid = os.getpid()
+        flusher = threading.Thread(target=self._flusher, name='PayloadStore_Flusher')
+        flusher.daemon = True
+        flusher.start()
+
+    def _flusher(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except OSError as e:
+                self.logger.error(f"Could not write payload index: {e}")
+
+    def flush(self):
+        """Persist the index atomically and append evicted entries"""
+        with self.lock:
+            if not self.dirty:
+                return
+            snapshot = {sha256: _saved(entry) for sha256, entry in self.index.items()}
+            evicted, self.evicted = self.evicted, []
+            self.dirty = False
+
+        if evicted:
+            with open(self.evicted_path, 'a') as f:
+                for sha256, entry in evicted:
+                    f.write(json.dumps({'sha256': sha256, **_saved(entry)}) + '\n')
+        temp_path = self.index_path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(snapshot, f)
+        os.replace(temp_path, self.index_path)
+
+
+def _saved(entry):
+    """JSON form of an index entry, with its HyperLogLog encoded"""
+    saved = {key: value for key, value in entry.items() if key != 'sources'}
+    saved['hll'] = base64.b64encode(bytes(entry['sources'].registers)).decode('ascii')
+    saved['hll_precision'] = entry['sources'].precision
+    return saved
+
+
+def _restore(entry):
+    """Inverse of _saved()"""
+    sources = HyperLogLog(entry.pop('hll_precision', 6))
+    sources.registers = bytearray(base64.b64decode(entry.pop('hll', '')) or bytes(sources.size))
+    entry['sources'] = sources
+    return entry
+
+
+def _read_index(path):
+    """Load one index file, restoring each entry's HyperLogLog"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        saved = json.load(f)
+    for entry in saved.values():
+        _restore(entry)
+    return saved
+
+
+def _read_evicted(path):
+    """Yield (sha256, entry) for each record of an evicted.jsonl file"""
+    with open(path, 'r') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # A line cut short by a crash
+            yield entry.pop('sha256'), _restore(entry)
+
+
+def _describe(sha256, entry):
+    """Public view of an index entry"""
+    return {
+        'sha256': sha256,
+        **{key: value for key, value in entry.items() if key != 'sources'},
+        'distinct_sources': entry['sources'].count()
+    }
+
+
+def load_payload_index(directory):
+    """Merge the index files of every process that writes to a store"""
+    merged = {}
+    if not os.path.isdir(directory):
+        return merged
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        try:
+            if name.startswith('index') and name.endswith('.json'):
+                entries = list(_read_index(path).items())
+            elif name.startswith('evicted') and name.endswith('.jsonl'):
+                entries = list(_read_evicted(path))
+            else:
+                continue
+        except (OSError, ValueError):
+            continue
+        for sha256, entry in entries:
+            current = merged.get(sha256)
+            if current is None:
+                merged[sha256] = entry
+                continue
+            current['count'] += entry['count']
+            current['first_seen'] = min(current['first_seen'], entry['first_seen'])
+            current['last_seen'] = max(current['last_seen'], entry['last_seen'])
+            current['stored'] = current['stored'] or entry['stored']
+            current['services'] = sorted(set(current['services']) | set(entry['services']))
+            current['sample_sources'] = list(dict.fromkeys(current['sample_sources'] + entry['sample_sources']))
+            current['sources'].merge(entry['sources'])
+    return merged
+
+
+def list_payloads(directory, kind=None, limit=50):
+    """Most recently seen payloads across all writers"""
+    records = [
+        _describe(sha256, entry) for sha256, entry in load_payload_index(directory).items()
+        if kind is None or entry['kind'] == kind
+    ]
+    records.sort(key=lambda record: record['last_seen'], reverse=True)
+    return records[:limit]
+
+
+def find_payload(directory, sha256):
+    """Index record of one payload, or None"""
+    entry = load_payload_index(directory).get(sha256)
+    return _describe(sha256, entry) if entry else None
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_payload_store(config):
+    """Get the process-wide payload store"""
+    directory = (config or {}).get('payloads', {}).get('directory', 'payloads')
+    with _stores_lock:
+        store = _stores.get(directory)
+        # A forked worker keeps its own index file, so it gets its own store
+        if store is None or store.pid != os.getpid():
+            store = _stores[directory] = PayloadStore(config)
+        return store
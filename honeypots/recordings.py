@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+
+import os
+import re
+import gzip
+import json
+import queue
+import struct
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+
+from honeypots.sessions import current_session, new_session_id, session_started
+
+MAGIC = b'HPREC1\n'
+
+# Record types
+INPUT, OUTPUT, RESIZE = 0, 1, 2
+
+# type, milliseconds since session start, payload length
+RECORD_HEADER = struct.Struct('<BII')
+LENGTH = struct.Struct('<I')
+
+# service-ULID, or service-YYYYmmddTHHMMSS-hex from before session ids were shared with events
+SESSION_ID = re.compile(r'^([a-z]+)-(?:[0-9A-HJKMNP-TV-Z]{26}|(\d{8}T\d{6})-[0-9a-f]{8})$')
+
+
+class Recording:
+    """Handle for one session recording; every call only enqueues"""
+
+    def __init__(self, recorder, session_id, started):
+        self.recorder = recorder
+        self.session_id = session_id
+        self.started = started
+        self.closed = False
+
+    def _record(self, kind, data):
+        if data and not self.closed:
+            offset = int((time.monotonic() - self.started) * 1000)
+            self.recorder._enqueue(('record', self.session_id, kind, offset, bytes(data)))
+
+    def input(self, data):
+        self._record(INPUT, data)
+
+    def output(self, data):
+        self._record(OUTPUT, data)
+
+    def resize(self, width, height):
+        self._record(RESIZE, struct.pack('<HH', width, height))
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.recorder._enqueue(('close', self.session_id))
+
+
+class _NullRecording:
+    """Stand-in used when recording is disabled"""
+
+    session_id = None
+
+    def input(self, data):
+        pass
+
+    def output(self, data):
+        pass
+
+    def resize(self, width, height):
+        pass
+
+    def close(self):
+        pass
+
+
+class SessionRecorder:
+    """Writes session recordings from a single background thread.
+
+    Each session is a file of length-prefixed binary records (input,
+    output, terminal resize) with millisecond offsets, optionally gzip
+    compressed. Handlers only put records on a bounded queue; when the
+    writer falls behind, records are dropped and counted rather than
+    blocking a session.
+    """
+
+    def __init__(self, config=None):
+        recording_config = (config or {}).get('recordings', {})
+        self.enabled = recording_config.get('enabled', True)
+        self.directory = recording_config.get('directory', 'recordings')
+        self.compress = recording_config.get('compress', True)
+        self.max_session_bytes = recording_config.get('max_session_bytes', 4194304)
+        self.queue = queue.Queue(maxsize=recording_config.get('queue_size', 10000))
+        self.logger = logging.getLogger('SessionRecorder')
+        self.dropped = 0
+        self.files = {}
+        self.pid = None
+        self.lock = threading.Lock()
+
+    def open_session(self, service, client_ip, **metadata):
+        """Start recording a session, under the id of the connection's session if it has one"""
+        if not self.enabled:
+            return _NullRecording()
+        self._ensure_writer()
+
+        now = datetime.utcnow()
+        session = current_session()
+        session_id = session.id if session is not None else new_session_id(service)
+        header = {
+            'session_id': session_id,
+            'service': service,
+            'source_ip': client_ip,
+            'timestamp': now.isoformat(),
+            **metadata
+        }
+        self._enqueue(('open', session_id, header))
+        return Recording(self, session_id, time.monotonic())
+
+    def _ensure_writer(self):
+        with self.lock:
+            # The writer thread doesn't survive fork; a forked worker starts its own
+            if self.pid != os.getpid():
+                self.pid = os.getpid()
+                # Queued records and open files belong to the parent's sessions
+                self.queue = queue.Queue(maxsize=self.queue.maxsize)
+                self.files = {}
+                self.dropped = 0
+                thread = threading.Thread(target=self._writer, name='SessionRecorder')
+                thread.daemon = True
+                thread.start()
+
+    def _enqueue(self, item):
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    def _path(self, header):
+        extension = '.rec.gz' if self.compress else '.rec'
+        day = _started(header['session_id']).strftime('%Y-%m-%d')
+        return os.path.join(self.directory, header['service'], day, header['session_id'] + extension)
+
+    def _writer(self):
+        """Background loop that owns all recording files"""
+        while True:
+            item = self.queue.get()
+            try:
+                if item[0] == 'open':
+                    self._open(item[1], item[2])
+                elif item[0] == 'record':
+                    self._write(*item[1:])
+                elif item[0] == 'close':
+                    entry = self.files.pop(item[1], None)
+                    if entry:
+                        entry['file'].close()
+            except OSError as e:
+                self.logger.error(f"Recording write failed: {e}")
+
+    def _open(self, session_id, header):
+        path = self._path(header)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        f = gzip.open(path, 'wb', compresslevel=6) if self.compress else open(path, 'wb')
+        encoded = json.dumps(header).encode('utf-8')
+        f.write(MAGIC + LENGTH.pack(len(encoded)) + encoded)
+        self.files[session_id] = {'file': f, 'bytes': 0}
+
+    def _write(self, session_id, kind, offset, data):
+        entry = self.files.get(session_id)
+        if entry is None or entry['bytes'] >= self.max_session_bytes:
+            return
+        entry['bytes'] += len(data)
+        entry['file'].write(RECORD_HEADER.pack(kind, offset, len(data)) + data)
+
+
+def _started(session_id):
+    """Start time of a session from its id (naive UTC), or None for other names"""
+    match = SESSION_ID.match(session_id or '')
+    if not match:
+        return None
+    if match.group(2):
+        return datetime.strptime(match.group(2), '%Y%m%dT%H%M%S')
+    return session_started(session_id).replace(tzinfo=None)
+
+
+def _open_recording(path):
+    return gzip.open(path, 'rb') if path.endswith('.gz') else open(path, 'rb')
+
+
+def read_recording(path):
+    """Read a recording, returning (header, list of (type, seconds, data))"""
+    with _open_recording(path) as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"Not a session recording: {path}")
+        header = json.loads(f.read(LENGTH.unpack(f.read(LENGTH.size))[0]))
+
+        records = []
+        try:
+            while True:
+                raw = f.read(RECORD_HEADER.size)
+                if len(raw) < RECORD_HEADER.size:
+                    break
+                kind, offset, length = RECORD_HEADER.unpack(raw)
+                data = f.read(length)
+                if len(data) < length:
+                    break
+                records.append((kind, offset / 1000.0, data))
+        except EOFError:
+            pass  # Session still being written
+    return header, records
+
+
+def to_asciicast(path):
+    """Convert a recording to asciicast v2 (header line plus event lines)"""
+    header, records = read_recording(path)
+    width, height = header.get('width') or 80, header.get('height') or 24
+    for kind, _, data in records:
+        if kind == RESIZE:
+            width, height = struct.unpack('<HH', data)
+            break
+
+    lines = [json.dumps({
+        'version': 2,
+        'width': width,
+        'height': height,
+        'timestamp': int(datetime.fromisoformat(header['timestamp']).replace(tzinfo=timezone.utc).timestamp()),
+        'title': f"{header['service']} session from {header['source_ip']}",
+        'env': {'TERM': header.get('terminal_type') or 'xterm'}
+    })]
+    for kind, seconds, data in records:
+        if kind == RESIZE:
+            continue
+        event = 'i' if kind == INPUT else 'o'
+        lines.append(json.dumps([round(seconds, 3), event, data.decode('utf-8', errors='replace')]))
+    return '\n'.join(lines) + '\n'
+
+
+def list_recordings(directory, service=None, limit=100):
+    """Most recent recordings with their session id, service and size"""
+    found = []
+    if not os.path.isdir(directory):
+        return found
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.endswith('.rec') or name.endswith('.rec.gz'):
+                session_id = name.split('.rec')[0]
+                if service and not session_id.startswith(service + '-'):
+                    continue
+                path = os.path.join(root, name)
+                found.append({'session_id': session_id, 'path': path, 'bytes': os.path.getsize(path)})
+    found.sort(key=lambda item: (_started(item['session_id']) or datetime.min, item['session_id']), reverse=True)
+    return found[:limit]
+
+
+def find_recording(directory, session_id):
+    """Path of a recording by session id, or None"""
+    started = _started(session_id)
+    if started is None:
+        return None
+    service, day = SESSION_ID.match(session_id).group(1), started.strftime('%Y-%m-%d')
+    for extension in ('.rec.gz', '.rec'):
+        path = os.path.join(directory, service, day, session_id + extension)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+_recorders = {}
+_recorders_lock = threading.Lock()
+
+
+def get_recorder(config):
+    """Get the process-wide session recorder"""
+    directory = (config or {}).get('recordings', {}).get('directory', 'recordings')
+    with _recorders_lock:
+        recorder = _recorders.get(directory)
+        if recorder is None:
+            recorder = _recorders[directory] = SessionRecorder(config)
+        return recorder
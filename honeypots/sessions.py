@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+
+import os
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+# Crockford base32, whose character order matches numeric order
+ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+RANDOM_BITS = 80
+
+# Events counted as authentication attempts in session summaries
+AUTH_EVENTS = ('login_attempt', 'pubkey_attempt')
+
+_last = (None, 0, 0)  # pid, milliseconds, random part
+_last_lock = threading.Lock()
+
+_current = contextvars.ContextVar('honeypot_session', default=None)
+
+
+def new_session_id(service):
+    """Unique, time-ordered id such as "ssh-01JAB3C5RZ6N8Q2W4Y7T9VXKMP".
+
+    The 26 characters after the service are a ULID: 48 bits of
+    milliseconds since the epoch and 80 random bits, both in base32, so
+    ids sort by creation time. Within one millisecond the random part is
+    incremented, so ids from one process never go backwards.
+    """
+    global _last
+    with _last_lock:
+        pid, last_ms, last_random = _last
+        now_ms = time.time_ns() // 1000000
+        if pid == os.getpid() and now_ms <= last_ms:
+            # Same millisecond, or the clock stepped back
+            now_ms = last_ms
+            random_part = (last_random + 1) & ((1 << RANDOM_BITS) - 1)
+        else:
+            random_part = int.from_bytes(os.urandom(RANDOM_BITS // 8), 'big')
+        _last = (os.getpid(), now_ms, random_part)
+
+    value = (now_ms << RANDOM_BITS) | random_part
+    chars = []
+    for _ in range(26):
+        chars.append(ALPHABET[value & 31])
+        value >>= 5
+    return f"{service}-{''.join(reversed(chars))}"
+
+
+def session_started(session_id):
+    """UTC start time encoded in a session id, or None if it is not one"""
+    _, _, encoded = (session_id or '').partition('-')
+    if len(encoded) != 26 or any(char not in ALPHABET for char in encoded):
+        return None
+    milliseconds = 0
+    for char in encoded[:10]:
+        milliseconds = milliseconds * 32 + ALPHABET.index(char)
+    return datetime.fromtimestamp(milliseconds / 1000, tz=timezone.utc)
+
+
+def current_session():
+    """Session of the connection being handled, or None"""
+    return _current.get()
+
+
+def stamp_session(log_entry):
+    """Add the current session id to an event and count it in the session"""
+    session = _current.get()
+    if session is not None:
+        log_entry['session_id'] = session.id
+        session.record(log_entry)
+
+
+def count_bytes(received=0, sent=0):
+    """Add application bytes to the current session"""
+    session = _current.get()
+    if session is not None:
+        session.bytes_received += received
+        session.bytes_sent += sent
+
+
+class Session:
+    """One connection's id and running totals for its session_end summary"""
+
+    __slots__ = ('id', 'started', 'started_at', 'command_event', 'events',
+                 'commands', 'auth_attempts', 'bytes_received', 'bytes_sent')
+
+    def __init__(self, service, command_event):
+        self.id = new_session_id(service)
+        self.started = time.monotonic()
+        self.started_at = datetime.utcnow().isoformat()
+        self.command_event = command_event
+        self.events = 0
+        self.commands = 0
+        self.auth_attempts = 0
+        self.bytes_received = 0
+        self.bytes_sent = 0
+
+    def record(self, log_entry):
+        event_type = log_entry.get('event_type')
+        self.events += 1
+        if event_type == self.command_event:
+            self.commands += 1
+        # FTP logs USER and PASS separately; one attempt ends with the password
+        elif event_type in AUTH_EVENTS and log_entry.get('step') != 'user':
+            self.auth_attempts += 1
+
+    def summary(self):
+        return {
+            'started': self.started_at,
+            'duration': round(time.monotonic() - self.started, 3),
+            'events': self.events,
+            'commands': self.commands,
+            'auth_attempts': self.auth_attempts,
+            'bytes_received': self.bytes_received,
+            'bytes_sent': self.bytes_sent
+        }
+
+
+class SessionTracker:
+    """Gives every connection of a service a session id and a summary.
+
+    While a connection is handled, its Session is the current one (a
+    context variable, so it follows both handler threads and asyncio
+    tasks): stamp_session() adds its id to every event the connection
+    logs, so a session is one lookup away rather than a sort of the logs
+    by source and time. When the handler returns, a session_end event
+    carries the duration, bytes, commands and authentication attempts.
+    command_event is the event type counted as a command for the service.
+    """
+
+    def __init__(self, service, log_event, command_event='command_executed'):
+        self.service = service
+        self.log_event = log_event
+        self.command_event = command_event
+
+    @contextmanager
+    def session(self, client_address):
+        """Make a new session current for the duration of the block"""
+        session = Session(self.service, self.command_event)
+        token = _current.set(session)
+        try:
+            yield session
+        finally:
+            try:
+                self.log_event('session_end', client_address[0], source_port=client_address[1],
+                               **session.summary())
+            finally:
+                _current.reset(token)
+
+    def track(self, handler):
+        """Wrap a threaded connection handler so it runs in its own session"""
+        def tracked(client_socket, client_address):
+            with self.session(client_address):
+                handler(client_socket, client_address)
+        return tracked
+
+    def track_async(self, handler):
+        """Wrap an asyncio connection handler so it runs in its own session"""
+        async def tracked(reader, writer):
+            with self.session(writer.get_extra_info('peername')):
+                await handler(reader, writer)
+        return tracked
@@ -0,0 +1,766 @@
+#!/usr/bin/env python3
+
+import os
+import logging
+import posixpath
+import threading
+from collections import namedtuple
+from types import MappingProxyType
+
+import yaml
+
+DEFAULT_FILESYSTEM_FILE = 'config/filesystem.yaml'
+
+# Timestamp shown by ls -l for everything in the image
+IMAGE_MTIME = 'Nov 23 10:30'
+
+Node = namedtuple('Node', 'kind mode owner group content')
+
+# Used when the image file is missing so the shell still has a sane layout
+DEFAULT_ENTRIES = [
+    {'path': '/root', 'type': 'dir', 'mode': '0700'},
+    {'path': '/home', 'type': 'dir'},
+    {'path': '/tmp', 'type': 'dir', 'mode': '1777'},
+    {'path': '/etc/hostname', 'content': 'honeypot\n'},
+    {'path': '/etc/passwd', 'content': 'root:x:0:0:root:/root:/bin/bash\n'
+                                       'daemon:x:1:1:daemon:/usr/sbin:/usr/sbin/nologin\n'}
+]
+
+
+def _parse_mode(mode, default):
+    """Mode from the image: octal string ('0644') or int"""
+    if mode is None:
+        return default
+    return int(mode, 8) if isinstance(mode, str) else int(mode)
+
+
+class FakeFilesystem:
+    """Immutable filesystem image shared by every shell session.
+
+    Nodes and directory listings are built once and exposed through
+    read-only mappings; sessions never modify it, they layer a
+    FilesystemOverlay on top.
+    """
+
+    def __init__(self, entries, hostname='honeypot'):
+        self.hostname = hostname
+        nodes = {'/': Node('dir', 0o755, 'root', 'root', b'')}
+        children = {'/': set()}
+
+        for entry in entries:
+            path = posixpath.normpath('/' + entry['path'].lstrip('/'))
+            kind = entry.get('type', 'file')
+            owner = entry.get('owner', 'root')
+
+            # Missing parent directories are created implicitly
+            parent = posixpath.dirname(path)
+            missing = []
+            while parent not in nodes:
+                missing.append(parent)
+                parent = posixpath.dirname(parent)
+            for directory in reversed(missing):
+                nodes[directory] = Node('dir', 0o755, 'root', 'root', b'')
+                children[directory] = set()
+                children[posixpath.dirname(directory)].add(posixpath.basename(directory))
+
+            if kind == 'dir':
+                nodes[path] = Node('dir', _parse_mode(entry.get('mode'), 0o755), owner,
+                                   entry.get('group', owner), b'')
+                children.setdefault(path, set())
+            else:
+                content = entry.get('content', '')
+                nodes[path] = Node('file', _parse_mode(entry.get('mode'), 0o644), owner,
+                                   entry.get('group', owner), content.encode('utf-8'))
+            children[posixpath.dirname(path)].add(posixpath.basename(path))
+
+        self.nodes = MappingProxyType(nodes)
+        self.children = MappingProxyType({path: tuple(sorted(names)) for path, names in children.items()})
+
+    @classmethod
+    def from_file(cls, image_file):
+        """Load a filesystem image from YAML"""
+        with open(image_file, 'r') as f:
+            image = yaml.safe_load(f) or {}
+        return cls(image.get('entries', []), image.get('hostname', 'honeypot'))
+
+
+class FilesystemOverlay:
+    """Per-session copy-on-write view of a FakeFilesystem.
+
+    Only changed nodes (None marks a deletion) and the listings of
+    directories whose contents changed are stored, so a session costs
+    memory proportional to what the attacker modified. A deleted
+    directory is a whiteout: the base nodes below it are hidden too.
+    """
+
+    def __init__(self, base, max_bytes=1048576):
+        self.base = base
+        self.max_bytes = max_bytes
+        self.bytes_used = 0
+        self.changes = {}
+        self.listings = {}
+        self.whiteouts = set()
+
+    def _whited_out(self, path):
+        """True if path or one of its ancestors is a deleted base directory"""
+        while path not in self.whiteouts:
+            if path == '/':
+                return False
+            path = posixpath.dirname(path)
+        return True
+
+    def get(self, path):
+        if path in self.changes:
+            return self.changes[path]
+        if self.whiteouts and self._whited_out(path):
+            return None
+        return self.base.nodes.get(path)
+
+    def listdir(self, path):
+        listing = self.listings.get(path)
+        if listing is not None:
+            return sorted(listing)
+        if self.whiteouts and self._whited_out(path):
+            return ()
+        return self.base.children.get(path, ())
+
+    def _listing(self, directory):
+        """Copy a directory listing on first modification"""
+        listing = self.listings.get(directory)
+        if listing is None:
+            listing = self.listings[directory] = set(self.listdir(directory))
+        return listing
+
+    def put(self, path, node):
+        """Create or replace a node; False when the session quota is exhausted"""
+        previous = self.get(path)
+        growth = len(node.content) - (len(previous.content) if previous else 0)
+        if growth > 0 and self.bytes_used + growth > self.max_bytes:
+            return False
+        self.bytes_used += growth
+        self.changes[path] = node
+        if previous is None:
+            self._listing(posixpath.dirname(path)).add(posixpath.basename(path))
+        if node.kind == 'dir' and path not in self.listings and (
+                path not in self.base.children or self._whited_out(path)):
+            self.listings[path] = set()
+        return True
+
+    def remove(self, path):
+        previous = self.get(path)
+        if previous is not None:
+            self.bytes_used = max(0, self.bytes_used - len(previous.content))
+        self.changes[path] = None
+        self._listing(posixpath.dirname(path)).discard(posixpath.basename(path))
+        if previous is not None and previous.kind == 'dir':
+            # Drop the session's own changes below it and hide the base ones
+            prefix = path.rstrip('/') + '/'
+            for changed in [changed for changed in self.changes if changed.startswith(prefix)]:
+                node = self.changes.pop(changed)
+                if node is not None:
+                    self.bytes_used = max(0, self.bytes_used - len(node.content))
+            for listed in [listed for listed in self.listings if listed.startswith(prefix)]:
+                del self.listings[listed]
+            self.listings.pop(path, None)
+            self.whiteouts.add(path)
+
+
+_filesystems = {}
+_filesystems_lock = threading.Lock()
+
+# Control operators; a lone '&' (background) is treated like ';'
+CONTROL_OPERATORS = ('&&', '||', ';', '|', '&')
+REDIRECTIONS = ('>>', '>&', '&>', '>', '<')
+
+
+def tokenize(line):
+    """Split a command line into words and operators, bash-style.
+
+    Words are strings, with quotes and backslashes resolved. Control
+    operators are ('op', operator) and redirections are ('redirect', fd,
+    operator), where fd is the number written right before the operator
+    (2 in '2>/dev/null' or '2>&1') or None. Raises ValueError on an
+    unterminated quote.
+    """
+    tokens = []
+    word = []
+    in_word = False
+    digits_only = True  # Unquoted digits may prefix a redirection
+    index = 0
+    length = len(line)
+
+    def end_word():
+        nonlocal word, in_word, digits_only
+        if in_word:
+            tokens.append(''.join(word))
+        word, in_word, digits_only = [], False, True
+
+    while index < length:
+        char = line[index]
+        if char in ' \t':
+            end_word()
+            index += 1
+        elif char == '#' and not in_word:
+            break
+        elif char == '\\':
+            word.append(line[index + 1:index + 2])
+            in_word, digits_only = True, False
+            index += 2
+        elif char == "'":
+            end = line.find("'", index + 1)
+            if end < 0:
+                raise ValueError("unterminated quote")
+            word.append(line[index + 1:end])
+            in_word, digits_only = True, False
+            index = end + 1
+        elif char == '"':
+            index += 1
+            while index < length and line[index] != '"':
+                if line[index] == '\\' and index + 1 < length and line[index + 1] in '"\\$`':
+                    index += 1
+                word.append(line[index])
+                index += 1
+            if index >= length:
+                raise ValueError("unterminated quote")
+            in_word, digits_only = True, False
+            index += 1
+        elif char in ';&|<>':
+            fd = None
+            if char in '<>' and in_word and digits_only:
+                fd = int(''.join(word))
+                word, in_word = [], False
+            end_word()
+            for operator in REDIRECTIONS:
+                if line.startswith(operator, index):
+                    tokens.append(('redirect', fd, operator))
+                    break
+            else:
+                operator = next(op for op in CONTROL_OPERATORS if line.startswith(op, index))
+                tokens.append(('op', operator))
+            index += len(operator)
+        else:
+            word.append(char)
+            in_word = True
+            digits_only = digits_only and char.isdigit()
+            index += 1
+    end_word()
+    return tokens
+
+
+def get_filesystem(config):
+    """Get the process-wide filesystem image for a configuration"""
+    shell_config = (config or {}).get('shell', {})
+    image_file = shell_config.get('filesystem', DEFAULT_FILESYSTEM_FILE)
+
+    with _filesystems_lock:
+        filesystem = _filesystems.get(image_file)
+        if filesystem is None:
+            logger = logging.getLogger('Shell')
+            if os.path.exists(image_file):
+                filesystem = FakeFilesystem.from_file(image_file)
+                logger.info(f"Loaded {len(filesystem.nodes)} filesystem nodes from {image_file}")
+            else:
+                logger.warning(f"Filesystem image not found at {image_file}, using built-in defaults")
+                filesystem = FakeFilesystem(DEFAULT_ENTRIES)
+            _filesystems[image_file] = filesystem
+        return filesystem
+
+
+def _mode_string(node):
+    """Render a mode like ls -l (drwxr-xr-x, drwxrwxrwt)"""
+    chars = ['d' if node.kind == 'dir' else '-']
+    for shift in (6, 3, 0):
+        bits = (node.mode >> shift) & 7
+        chars += ['r' if bits & 4 else '-', 'w' if bits & 2 else '-', 'x' if bits & 1 else '-']
+    if node.mode & 0o1000:
+        chars[9] = 't' if chars[9] == 'x' else 'T'
+    return ''.join(chars)
+
+
+class ShellSession:
+    """Emulated bash session shared by the SSH and Telnet honeypots.
+
+    execute() takes one input line, which may chain pipelines with ';',
+    '&&' and '||', pipe commands with '|' and redirect their input and
+    output ('<', '>', '>>', '2>/dev/null', '2>&1', '&>'), and returns
+    (output, still_open). Commands are looked up in a dispatch table.
+    """
+
+    COMMANDS = {
+        'cd': '_cmd_cd', 'pwd': '_cmd_pwd', 'ls': '_cmd_ls', 'cat': '_cmd_cat',
+        'echo': '_cmd_echo', 'chmod': '_cmd_chmod', 'touch': '_cmd_touch',
+        'mkdir': '_cmd_mkdir', 'rm': '_cmd_rm', 'grep': '_cmd_grep',
+        'whoami': '_cmd_whoami', 'id': '_cmd_id', 'hostname': '_cmd_hostname',
+        'uname': '_cmd_uname', 'ps': '_cmd_ps', 'netstat': '_cmd_netstat',
+        'ifconfig': '_cmd_ifconfig', 'ip': '_cmd_ifconfig', 'history': '_cmd_history',
+        'env': '_cmd_env', 'printenv': '_cmd_env', 'export': '_cmd_export',
+        'sudo': '_cmd_sudo', 'uptime': '_cmd_uptime', 'true': '_cmd_true',
+        'false': '_cmd_false', 'exit': '_cmd_exit', 'logout': '_cmd_exit', 'quit': '_cmd_exit'
+    }
+    MAX_HISTORY = 500
+
+    def __init__(self, filesystem, username='root', max_overlay_bytes=1048576):
+        self.fs = FilesystemOverlay(filesystem, max_overlay_bytes)
+        self.hostname = filesystem.hostname
+        self.username = username or 'user'
+        self.uid = 0 if self.username == 'root' else 1000
+        self.home = '/root' if self.uid == 0 else f'/home/{self.username}'
+        self.cwd = self.home
+        self.env = {
+            'HOME': self.home,
+            'USER': self.username,
+            'SHELL': '/bin/bash',
+            'PATH': '/usr/local/bin:/usr/bin:/bin'
+        }
+        self.history = []
+        self.status = 0
+        self.closed = False
+        self._setup_user()
+
+    def _setup_user(self):
+        """Give a non-root user a home directory and passwd entry"""
+        if self.fs.get(self.home) is None:
+            self.fs.put(self.home, Node('dir', 0o755, self.username, self.username, b''))
+        passwd = self.fs.get('/etc/passwd')
+        if passwd is not None and f'\n{self.username}:'.encode() not in b'\n' + passwd.content:
+            entry = f'{self.username}:x:{self.uid}:{self.uid}::{self.home}:/bin/bash\n'.encode()
+            self.fs.put('/etc/passwd', passwd._replace(content=passwd.content + entry))
+
+    def prompt(self):
+        """bash-style prompt for the current directory"""
+        cwd = self.cwd
+        if cwd == self.home or cwd.startswith(self.home + '/'):
+            cwd = '~' + cwd[len(self.home):]
+        return f"{self.username}@{self.hostname}:{cwd}{'#' if self.uid == 0 else '$'} "
+
+    def execute(self, line):
+        """Run one input line, returning (output with CRLF line endings, still_open)"""
+        line = line.strip()
+        if not line:
+            return '', True
+        self.history.append(line)
+        if len(self.history) > self.MAX_HISTORY:
+            del self.history[0]
+
+        try:
+            tokens = tokenize(line)
+        except ValueError:
+            tokens = line.split()
+
+        # [(pipeline, operator after it)], a pipeline being a list of commands
+        chain = []
+        pipeline = []
+        command = []
+        for token in tokens + [('op', ';')]:
+            if isinstance(token, tuple) and token[0] == 'op':
+                pipeline.append(command)
+                command = []
+                if token[1] != '|':
+                    chain.append((pipeline, token[1]))
+                    pipeline = []
+            else:
+                command.append(token)
+
+        output = []
+        status = 0
+        condition = None
+        for pipeline, operator in chain:
+            # && and || apply to the status of the whole preceding pipeline
+            if condition is None or (condition == '&&') == (status == 0):
+                status = self._run_pipeline(pipeline, output)
+            condition = operator if operator in ('&&', '||') else None
+            if self.closed:
+                break
+
+        self.status = status
+        text = ''.join(output)
+        return text.replace('\r\n', '\n').replace('\n', '\r\n'), not self.closed
+
+    def _run_pipeline(self, pipeline, output):
+        """Run piped commands, adding their output; returns the last one's status"""
+        stdin = None
+        status = 0
+        for command in pipeline:
+            if not command:
+                continue
+            errors, stdout, status = self._run(command, stdin)
+            output.append(errors)
+            stdin = stdout
+            if self.closed:
+                break
+        if stdin:
+            output.append(stdin)
+        return status
+
+    def _run(self, argv, stdin):
+        """Run a simple command, returning (error output, stdout, exit status)"""
+        words = []
+        redirects = []
+        tokens = iter(argv)
+        for token in tokens:
+            if isinstance(token, tuple):
+                redirects.append((token[1], token[2], next(tokens, None)))
+            else:
+                words.append(token)
+
+        # Where stdout (1) and stderr (2) end up: the terminal or (path, append)
+        targets = {1: 1, 2: 2}
+        for fd, operator, target in redirects:
+            if target is None or isinstance(target, tuple):
+                return "-bash: syntax error near unexpected token `newline'\n", '', 2
+            if operator == '<':
+                node = self.fs.get(self._resolve(target))
+                if node is None or node.kind != 'file':
+                    return f"-bash: {target}: No such file or directory\n", '', 1
+                stdin = node.content.decode('utf-8', errors='replace')
+            elif operator == '>&' and target in ('1', '2'):
+                targets[1 if fd is None else fd] = targets[int(target)]
+            elif operator in ('&>', '>&'):
+                targets[1] = targets[2] = (target, False)
+            else:
+                targets[1 if fd is None else fd] = (target, operator == '>>')
+
+        # Commands report errors in self.errors; sudo runs one nested in another
+        outer_errors = getattr(self, 'errors', None)
+        errors = self.errors = []
+        try:
+            if not words:
+                stdout, status = '', 0
+            elif words[0] not in self.COMMANDS:
+                errors.append(f"{words[0]}: command not found\n")
+                stdout, status = '', 127
+            else:
+                stdout, status = getattr(self, self.COMMANDS[words[0]])(words[1:], stdin)
+
+            streams = {1: [], 2: []}
+            files = {}
+            for data, fd in ((''.join(errors), 2), (stdout, 1)):
+                target = targets.get(fd, fd)
+                if target in streams:
+                    streams[target].append(data)
+                elif target[0] != '/dev/null':
+                    files.setdefault(target, []).append(data)
+
+            # Failed redirections are reported by the shell itself
+            self.errors = shell_errors = []
+            for (target, append), chunks in files.items():
+                if not self._write_file(target, ''.join(chunks).encode('utf-8'), append) and status == 0:
+                    status = 1
+            return ''.join(streams[2] + shell_errors), ''.join(streams[1]), status
+        finally:
+            self.errors = outer_errors
+
+    # Filesystem helpers
+
+    def _resolve(self, path):
+        if path == '~' or path.startswith('~/'):
+            path = self.home + path[1:]
+        path = posixpath.normpath(posixpath.join(self.cwd, path))
+        return '/' + path.lstrip('/')
+
+    def _can(self, node, bit):
+        """Permission check for the session user (bit: 4 read, 2 write, 1 exec)"""
+        if self.uid == 0:
+            return True
+        shift = 6 if node.owner == self.username else 0
+        return bool((node.mode >> shift) & bit)
+
+    def _write_file(self, target, data, append=False):
+        path = self._resolve(target)
+        node = self.fs.get(path)
+        parent = self.fs.get(posixpath.dirname(path))
+        if parent is None or parent.kind != 'dir':
+            self.errors.append(f"-bash: {target}: No such file or directory\n")
+            return False
+        if node is not None and node.kind == 'dir':
+            self.errors.append(f"-bash: {target}: Is a directory\n")
+            return False
+        if not self._can(node or parent, 2):
+            self.errors.append(f"-bash: {target}: Permission denied\n")
+            return False
+        if node is None:
+            node = Node('file', 0o644, self.username, self.username, b'')
+        if not self.fs.put(path, node._replace(content=node.content + data if append else data)):
+            self.errors.append(f"-bash: {target}: No space left on device\n")
+            return False
+        return True
+
+    def _split_flags(self, args):
+        flags = ''.join(arg[1:] for arg in args if arg.startswith('-') and len(arg) > 1)
+        return flags, [arg for arg in args if not arg.startswith('-') or len(arg) == 1]
+
+    # Commands: each returns (stdout, exit status) and reports errors in self.errors
+
+    def _cmd_cd(self, args, stdin):
+        target = args[0] if args else self.home
+        path = self._resolve(target)
+        node = self.fs.get(path)
+        if node is None:
+            self.errors.append(f"-bash: cd: {target}: No such file or directory\n")
+            return '', 1
+        if node.kind != 'dir':
+            self.errors.append(f"-bash: cd: {target}: Not a directory\n")
+            return '', 1
+        if not self._can(node, 1):
+            self.errors.append(f"-bash: cd: {target}: Permission denied\n")
+            return '', 1
+        self.cwd = path
+        self.env['PWD'] = path
+        return '', 0
+
+    def _cmd_pwd(self, args, stdin):
+        return self.cwd + '\n', 0
+
+    def _ls_line(self, name, node):
+        size = len(node.content) if node.kind == 'file' else 4096
+        return f"{_mode_string(node)} 1 {node.owner:<5} {node.group:<5} {size:>6} {IMAGE_MTIME} {name}\n"
+
+    def _cmd_ls(self, args, stdin):
+        flags, paths = self._split_flags(args)
+        long_format = 'l' in flags
+        show_hidden = 'a' in flags
+        output = []
+        status = 0
+
+        for target in paths or ['.']:
+            path = self._resolve(target)
+            node = self.fs.get(path)
+            if node is None:
+                self.errors.append(f"ls: cannot access '{target}': No such file or directory\n")
+                status = 2
+                continue
+            if node.kind == 'file':
+                output.append(self._ls_line(target, node) if long_format else target + '\n')
+                continue
+            if not self._can(node, 4):
+                self.errors.append(f"ls: cannot open directory '{target}': Permission denied\n")
+                status = 2
+                continue
+
+            names = [name for name in self.fs.listdir(path) if show_hidden or not name.startswith('.')]
+            if len(paths) > 1:
+                output.append(f"{target}:\n")
+            if long_format:
+                output.append(f"total {len(names) * 4}\n")
+                for name in names:
+                    output.append(self._ls_line(name, self.fs.get(posixpath.join(path, name))))
+            elif names:
+                output.append('  '.join(names) + '\n')
+        return ''.join(output), status
+
+    def _cmd_cat(self, args, stdin):
+        if not args:
+            return stdin or '', 0
+        output = []
+        status = 0
+        for target in args:
+            node = self.fs.get(self._resolve(target))
+            if node is None:
+                self.errors.append(f"cat: {target}: No such file or directory\n")
+                status = 1
+            elif node.kind == 'dir':
+                self.errors.append(f"cat: {target}: Is a directory\n")
+                status = 1
+            elif not self._can(node, 4):
+                self.errors.append(f"cat: {target}: Permission denied\n")
+                status = 1
+            else:
+                output.append(node.content.decode('utf-8', errors='replace'))
+        return ''.join(output), status
+
+    def _cmd_echo(self, args, stdin):
+        if args and args[0] == '-n':
+            return ' '.join(args[1:]), 0
+        return ' '.join(args) + '\n', 0
+
+    def _cmd_grep(self, args, stdin):
+        flags, args = self._split_flags(args)
+        if not args:
+            self.errors.append("Usage: grep [OPTION]... PATTERNS [FILE]...\n")
+            return '', 2
+        pattern, targets = args[0], args[1:]
+        if 'i' in flags:
+            pattern = pattern.lower()
+        text = self._cmd_cat(targets, stdin)[0] if targets else stdin or ''
+        matches = [line + '\n' for line in text.splitlines()
+                   if pattern in (line.lower() if 'i' in flags else line)]
+        return ''.join(matches), 0 if matches else 1
+
+    def _cmd_chmod(self, args, stdin):
+        flags, args = self._split_flags(args)
+        if len(args) < 2:
+            self.errors.append("chmod: missing operand\n")
+            return '', 1
+        mode, targets = args[0], args[1:]
+        status = 0
+        for target in targets:
+            path = self._resolve(target)
+            node = self.fs.get(path)
+            if node is None:
+                self.errors.append(f"chmod: cannot access '{target}': No such file or directory\n")
+                status = 1
+                continue
+            if self.uid != 0 and node.owner != self.username:
+                self.errors.append(f"chmod: changing permissions of '{target}': Operation not permitted\n")
+                status = 1
+                continue
+            new_mode = self._apply_mode(node.mode, mode)
+            if new_mode is None:
+                self.errors.append(f"chmod: invalid mode: '{mode}'\n")
+                return '', 1
+            self.fs.put(path, node._replace(mode=new_mode))
+        return '', status
+
+    def _apply_mode(self, current, mode):
+        """Apply an octal or symbolic (u+x, go-w, a=r) mode"""
+        if mode.isdigit():
+            try:
+                return int(mode, 8) & 0o7777
+            except ValueError:
+                return None
+        for clause in mode.split(','):
+            who = ''
+            while clause and clause[0] in 'ugoa':
+                who, clause = who + clause[0], clause[1:]
+            if not clause or clause[0] not in '+-=' or any(c not in 'rwx' for c in clause[1:]):
+                return None
+            operator, perms = clause[0], clause[1:]
+            bits = (4 if 'r' in perms else 0) | (2 if 'w' in perms else 0) | (1 if 'x' in perms else 0)
+            shifts = [shift for letter, shift in (('u', 6), ('g', 3), ('o', 0))
+                      if not who or 'a' in who or letter in who]
+            for shift in shifts:
+                if operator == '+':
+                    current |= bits << shift
+                elif operator == '-':
+                    current &= ~(bits << shift)
+                else:
+                    current = (current & ~(7 << shift)) | (bits << shift)
+        return current
+
+    def _cmd_touch(self, args, stdin):
+        status = 0
+        for target in args:
+            if self.fs.get(self._resolve(target)) is None and not self._write_file(target, b''):
+                status = 1
+        return '', status
+
+    def _cmd_mkdir(self, args, stdin):
+        flags, args = self._split_flags(args)
+        status = 0
+        for target in args:
+            path = self._resolve(target)
+            if self.fs.get(path) is not None:
+                if 'p' not in flags:
+                    self.errors.append(f"mkdir: cannot create directory '{target}': File exists\n")
+                    status = 1
+                continue
+            parent = self.fs.get(posixpath.dirname(path))
+            if parent is None and 'p' in flags:
+                self._cmd_mkdir(['-p', posixpath.dirname(path)], stdin)
+                parent = self.fs.get(posixpath.dirname(path))
+            if parent is None:
+                self.errors.append(f"mkdir: cannot create directory '{target}': No such file or directory\n")
+                status = 1
+            elif not self._can(parent, 2):
+                self.errors.append(f"mkdir: cannot create directory '{target}': Permission denied\n")
+                status = 1
+            else:
+                self.fs.put(path, Node('dir', 0o755, self.username, self.username, b''))
+        return '', status
+
+    def _cmd_rm(self, args, stdin):
+        flags, args = self._split_flags(args)
+        status = 0
+        for target in args:
+            path = self._resolve(target)
+            node = self.fs.get(path)
+            if node is None:
+                if 'f' not in flags:
+                    self.errors.append(f"rm: cannot remove '{target}': No such file or directory\n")
+                    status = 1
+                continue
+            if node.kind == 'dir' and 'r' not in flags.lower():
+                self.errors.append(f"rm: cannot remove '{target}': Is a directory\n")
+                status = 1
+                continue
+            parent = self.fs.get(posixpath.dirname(path))
+            # Never let anyone wipe system directories, even as root
+            if path == '/' or posixpath.dirname(path) == '/' or not self._can(parent, 2):
+                self.errors.append(f"rm: cannot remove '{target}': Permission denied\n")
+                status = 1
+                continue
+            self.fs.remove(path)
+        return '', status
+
+    def _cmd_whoami(self, args, stdin):
+        return self.username + '\n', 0
+
+    def _cmd_id(self, args, stdin):
+        return f"uid={self.uid}({self.username}) gid={self.uid}({self.username}) groups={self.uid}({self.username})\n", 0
+
+    def _cmd_hostname(self, args, stdin):
+        return self.hostname + '\n', 0
+
+    def _cmd_uname(self, args, stdin):
+        if '-a' in args:
+            return (f"Linux {self.hostname} 5.4.0-135-generic #152-Ubuntu SMP Wed Nov 23 20:19:22 UTC 2022 "
+                    "x86_64 x86_64 x86_64 GNU/Linux\n"), 0
+        if '-r' in args:
+            return "5.4.0-135-generic\n", 0
+        if '-m' in args:
+            return "x86_64\n", 0
+        if '-n' in args:
+            return self.hostname + '\n', 0
+        return "Linux\n", 0
+
+    def _cmd_ps(self, args, stdin):
+        return "  PID TTY          TIME CMD\n 1234 pts/0    00:00:00 bash\n 5678 pts/0    00:00:00 ps\n", 0
+
+    def _cmd_netstat(self, args, stdin):
+        return ("Active Internet connections (w/o servers)\n"
+                "Proto Recv-Q Send-Q Local Address           Foreign Address         State\n"), 0
+
+    def _cmd_ifconfig(self, args, stdin):
+        return ("eth0: flags=4163<UP,BROADCAST,RUNNING,MULTICAST>  mtu 1500\n"
+                "        inet 192.168.1.100  netmask 255.255.255.0  broadcast 192.168.1.255\n"), 0
+
+    def _cmd_history(self, args, stdin):
+        return ''.join(f"{index:5}  {line}\n" for index, line in enumerate(self.history, 1)), 0
+
+    def _cmd_env(self, args, stdin):
+        return ''.join(f"{key}={value}\n" for key, value in self.env.items()), 0
+
+    def _cmd_export(self, args, stdin):
+        for arg in args:
+            key, _, value = arg.partition('=')
+            if key:
+                self.env[key] = value
+        return '', 0
+
+    def _cmd_sudo(self, args, stdin):
+        if self.uid != 0:
+            self.errors.append(f"{self.username} is not in the sudoers file.  This incident will be reported.\n")
+            return '', 1
+        if not args:
+            self.errors.append("usage: sudo -h | -K | -k | -V\n")
+            return '', 1
+        if args[0] not in self.COMMANDS:
+            self.errors.append(f"sudo: {args[0]}: command not found\n")
+            return '', 1
+        errors, stdout, status = self._run(args, stdin)
+        if errors:
+            self.errors.append(errors)
+        return stdout, status
+
+    def _cmd_uptime(self, args, stdin):
+        return " 10:30:01 up 42 days,  3:17,  1 user,  load average: 0.08, 0.03, 0.01\n", 0
+
+    def _cmd_true(self, args, stdin):
+        return '', 0
+
+    def _cmd_false(self, args, stdin):
+        return '', 1
+
+    def _cmd_exit(self, args, stdin):
+        self.closed = True
+        return "logout\n", 0
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+
+import os
+import re
+import logging
+import threading
+
+import yaml
+
+# Used when the rules file is missing so detection never silently turns off
+DEFAULT_CATEGORIES = {
+    'directory_traversal': {
+        'event_type': 'directory_traversal_attempt',
+        'scopes': ['request'],
+        'patterns': ['../', '..\\']
+    },
+    'sql_injection': {
+        'event_type': 'sql_injection_attempt',
+        'scopes': ['request'],
+        'patterns': ['union select', 'or 1=1', 'drop table', 'insert into', 'delete from']
+    },
+    'xss': {
+        'event_type': 'xss_attempt',
+        'scopes': ['request'],
+        'patterns': ['<script', 'javascript:', 'onerror=', 'onload=']
+    },
+    'file_access': {
+        'event_type': 'file_access_attempt',
+        'scopes': ['request'],
+        'patterns': ['/etc/passwd', '/proc/', '/sys/', '/.env', '/config.php']
+    },
+    'scanner': {
+        'event_type': 'automated_scan',
+        'scopes': ['user_agent'],
+        'patterns': ['nikto', 'nmap', 'masscan', 'sqlmap', 'dirb', 'gobuster']
+    },
+    'suspicious_command': {
+        'event_type': 'suspicious_command',
+        'scopes': ['command'],
+        'patterns': ['wget', 'curl', 'nmap', 'ncat'],
+        'regexes': [r'\bnc\b']
+    },
+    'destructive_command': {
+        'event_type': 'destructive_command',
+        'scopes': ['command'],
+        'patterns': ['rm -rf', 'dd if=', 'mkfs']
+    }
+}
+
+DEFAULT_RULES_FILE = 'config/signatures.yaml'
+
+
+class SignatureMatcher:
+    """Multi-pattern attack signature matcher.
+
+    All categories that apply to a field scope are compiled into a single
+    regex of zero-width lookaheads, one named group per category, so each
+    field is scanned once regardless of how many signatures exist.
+    """
+
+    def __init__(self, categories):
+        self.categories = categories
+        self._scopes = {}
+        self._group_categories = {}
+
+        scope_alternatives = {}
+        for index, (name, rule) in enumerate(categories.items()):
+            alternatives = [re.escape(pattern) for pattern in rule.get('patterns', [])]
+            alternatives.extend(rule.get('regexes', []))
+            if not alternatives:
+                continue
+
+            group = f'c{index}'
+            self._group_categories[group] = name
+            for scope in rule.get('scopes', ['request']):
+                scope_alternatives.setdefault(scope, []).append(
+                    f"(?P<{group}>{'|'.join(alternatives)})"
+                )
+
+        for scope, alternatives in scope_alternatives.items():
+            # Lookahead keeps matches zero-width so overlapping signatures of
+            # different categories (e.g. "../etc/passwd") are all reported
+            pattern = re.compile(f"(?=(?:{'|'.join(alternatives)}))", re.IGNORECASE)
+            self._scopes[scope] = (pattern, len(alternatives))
+
+    @classmethod
+    def from_file(cls, rules_file):
+        """Load signature categories from a YAML rules file"""
+        with open(rules_file, 'r') as f:
+            rules = yaml.safe_load(f) or {}
+        return cls(rules.get('categories', {}))
+
+    def match(self, scope, text):
+        """Return the categories matching text, in order of first occurrence"""
+        compiled = self._scopes.get(scope)
+        if not compiled or not text:
+            return []
+
+        pattern, total = compiled
+        found = []
+        for m in pattern.finditer(text):
+            category = self._group_categories[m.lastgroup]
+            if category not in found:
+                found.append(category)
+                if len(found) == total:
+                    break
+        return found
+
+    def iter_matches(self, scope, text):
+        """Yield (category, offset, matched text) for every signature hit"""
+        compiled = self._scopes.get(scope)
+        if not compiled or not text:
+            return
+
+        for m in compiled[0].finditer(text):
+            yield self._group_categories[m.lastgroup], m.start(), m.group(m.lastgroup)
+
+    def event_type(self, category):
+        """Get the event type logged for a category"""
+        return self.categories.get(category, {}).get('event_type', category)
+
+    def describe(self):
+        """Summarize loaded signatures"""
+        return {
+            name: {
+                'event_type': self.event_type(name),
+                'scopes': rule.get('scopes', ['request']),
+                'pattern_count': len(rule.get('patterns', [])) + len(rule.get('regexes', []))
+            }
+            for name, rule in self.categories.items()
+        }
+
+
+_matchers = {}
+_matchers_lock = threading.Lock()
+
+
+def get_signature_matcher(config):
+    """Get the process-wide signature matcher for a configuration"""
+    rules_file = (config or {}).get('signatures', {}).get('rules_file', DEFAULT_RULES_FILE)
+
+    with _matchers_lock:
+        matcher = _matchers.get(rules_file)
+        if matcher is None:
+            logger = logging.getLogger('Signatures')
+            if os.path.exists(rules_file):
+                matcher = SignatureMatcher.from_file(rules_file)
+                logger.info(f"Loaded {len(matcher.categories)} signature categories from {rules_file}")
+            else:
+                logger.warning(f"Signature rules not found at {rules_file}, using built-in defaults")
+                matcher = SignatureMatcher(DEFAULT_CATEGORIES)
+            _matchers[rules_file] = matcher
+        return matcher
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+
+import base64
+import hashlib
+import math
+from array import array
+
+
+def _hash_pair(item):
+    """Hash an item to two independent 64-bit integers"""
+    digest = hashlib.blake2b(item.encode('utf-8', errors='ignore'), digest_size=16).digest()
+    return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little')
+
+
+class CountMinSketch:
+    """Count-Min sketch with fixed width x depth counters"""
+
+    def __init__(self, width=2048, depth=4):
+        self.width = width
+        self.depth = depth
+        self.counters = array('Q', bytes(8 * width * depth))
+        self.total = 0
+
+    def _indexes(self, item):
+        """Counter index for each row (Kirsch-Mitzenmacher double hashing)"""
+        h1, h2 = _hash_pair(item)
+        width = self.width
+        return [row * width + (h1 + row * h2) % width for row in range(self.depth)]
+
+    def add(self, item, count=1):
+        """Add an item and return its updated estimate"""
+        counters = self.counters
+        estimate = None
+        for index in self._indexes(item):
+            counters[index] += count
+            if estimate is None or counters[index] < estimate:
+                estimate = counters[index]
+        self.total += count
+        return estimate
+
+    def estimate(self, item):
+        """Estimate how many times an item was added (never underestimates)"""
+        counters = self.counters
+        return min(counters[index] for index in self._indexes(item))
+
+    def merge(self, other):
+        """Add the counts of a sketch with the same dimensions"""
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("Cannot merge Count-Min sketches of different dimensions")
+        counters = self.counters
+        for index, value in enumerate(other.counters):
+            if value:
+                counters[index] += value
+        self.total += other.total
+
+    def to_dict(self):
+        """Serialize the sketch for transfer between sensors"""
+        return {
+            'width': self.width,
+            'depth': self.depth,
+            'total': self.total,
+            'counters': base64.b64encode(self.counters.tobytes()).decode('ascii')
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a sketch serialized with to_dict"""
+        sketch = cls(data['width'], data['depth'])
+        counters = array('Q')
+        counters.frombytes(base64.b64decode(data['counters']))
+        if len(counters) != sketch.width * sketch.depth:
+            raise ValueError("Count-Min sketch counters do not match its dimensions")
+        sketch.counters = counters
+        sketch.total = data.get('total', 0)
+        return sketch
+
+
+class HeavyHitters:
+    """Count-Min sketch plus a bounded candidate set of the top-k items"""
+
+    def __init__(self, k=50, width=2048, depth=4):
+        self.k = k
+        self.sketch = CountMinSketch(width, depth)
+        self.top = {}
+        self._min_item = None
+
+    def add(self, item, count=1):
+        """Count an item, keeping it as a candidate if it is among the top k"""
+        estimate = self.sketch.add(item, count)
+        top = self.top
+
+        if item in top or len(top) < self.k:
+            top[item] = estimate
+            if self._min_item is None or self._min_item == item or estimate < top[self._min_item]:
+                self._min_item = min(top, key=top.get)
+        elif estimate > top[self._min_item]:
+            del top[self._min_item]
+            top[item] = estimate
+            self._min_item = min(top, key=top.get)
+
+    def estimate(self, item):
+        """Estimate the count of any item"""
+        return self.sketch.estimate(item)
+
+    def most_common(self, limit=None):
+        """Top items with their estimated counts, highest first"""
+        ranked = sorted(self.top.items(), key=lambda entry: entry[1], reverse=True)
+        return ranked[:limit] if limit else ranked
+
+    def merge(self, other):
+        """Merge another heavy-hitter summary into this one"""
+        self.sketch.merge(other.sketch)
+        candidates = set(self.top) | set(other.top)
+        ranked = sorted(
+            ((item, self.sketch.estimate(item)) for item in candidates),
+            key=lambda entry: entry[1],
+            reverse=True
+        )
+        self.top = dict(ranked[:self.k])
+        self._min_item = min(self.top, key=self.top.get) if self.top else None
+
+    def to_dict(self):
+        """Serialize the summary for transfer between sensors"""
+        return {'k': self.k, 'sketch': self.sketch.to_dict(), 'top': self.top}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a summary serialized with to_dict"""
+        sketch = CountMinSketch.from_dict(data['sketch'])
+        summary = cls(data.get('k', 50), sketch.width, sketch.depth)
+        summary.sketch = sketch
+        summary.top = dict(data.get('top', {}))
+        summary._min_item = min(summary.top, key=summary.top.get) if summary.top else None
+        return summary
+
+
+class HyperLogLog:
+    """HyperLogLog distinct-count estimator with 2^precision one-byte registers"""
+
+    def __init__(self, precision=8):
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = bytearray(self.size)
+
+    def add(self, item):
+        """Add an item to the set"""
+        value = _hash_pair(item)[0]
+        index = value >> (64 - self.precision)
+        remaining = value & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - remaining.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        """Union another estimator of the same precision into this one"""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLogs of different precision")
+        registers = self.registers
+        for index, rank in enumerate(other.registers):
+            if rank > registers[index]:
+                registers[index] = rank
+
+    def count(self):
+        """Estimate the number of distinct items added"""
+        size = self.size
+        alpha = 0.7213 / (1 + 1.079 / size)
+        estimate = alpha * size * size / sum(2.0 ** -rank for rank in self.registers)
+
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * size and zeros:
+            # Linear counting is more accurate for small cardinalities
+            estimate = size * math.log(size / zeros)
+        return int(round(estimate))
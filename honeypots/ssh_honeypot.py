@@ -1,16 +1,335 @@
 #!/usr/bin/env python3
 
+import re
 import socket
-import threading
 import paramiko
-import json
 import time
 import logging
 import sys
 import os
+import threading
+import contextvars
 from datetime import datetime
 from cryptography.hazmat.primitives import serialization
-from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.hazmat.primitives.asymmetric import rsa, ec, ed25519
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from honeypots.signatures import get_signature_matcher
+from honeypots.worker_pool import ConnectionPool
+from honeypots.admission import AdmissionController
+from honeypots.events import get_event_writer
+from honeypots.sessions import SessionTracker, stamp_session, count_bytes
+from honeypots.workers import reuse_port
+from honeypots.tarpit import get_tarpit
+from honeypots.shell import ShellSession, get_filesystem
+from honeypots.recordings import get_recorder
+from honeypots.payloads import get_payload_store
+
+# OpenSSH file names, key generators and paramiko loaders per host key type
+HOST_KEY_TYPES = {
+    'rsa': (
+        'ssh_host_rsa_key',
+        lambda bits: rsa.generate_private_key(public_exponent=65537, key_size=bits),
+        paramiko.RSAKey
+    ),
+    'ecdsa': (
+        'ssh_host_ecdsa_key',
+        lambda bits: ec.generate_private_key(ec.SECP256R1()),
+        paramiko.ECDSAKey
+    ),
+    'ed25519': (
+        'ssh_host_ed25519_key',
+        lambda bits: ed25519.Ed25519PrivateKey.generate(),
+        paramiko.Ed25519Key
+    )
+}
+
+_host_keys = {}
+_host_keys_lock = threading.Lock()
+
+
+def _create_host_key(path, key_type, rsa_bits):
+    """Generate a host key file in OpenSSH format, readable only by us"""
+    private_key = HOST_KEY_TYPES[key_type][1](rsa_bits)
+    data = private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.OpenSSH,
+        encryption_algorithm=serialization.NoEncryption()
+    )
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+
+
+def get_host_keys(ssh_config):
+    """Load the configured host keys, generating missing ones once.
+
+    Keys are cached for the process lifetime so restarting the SSH
+    honeypot is instant and fingerprints never change between restarts.
+    """
+    key_dir = ssh_config.get('host_key_dir', 'config/ssh_keys')
+    key_types = tuple(ssh_config.get('host_key_types', ['ed25519', 'ecdsa', 'rsa']))
+    rsa_bits = ssh_config.get('rsa_key_bits', 2048)
+    cache_key = (os.path.abspath(key_dir), key_types)
+
+    with _host_keys_lock:
+        keys = _host_keys.get(cache_key)
+        if keys is None:
+            logger = logging.getLogger('SSH_HostKeys')
+            os.makedirs(key_dir, mode=0o700, exist_ok=True)
+            keys = []
+            for key_type in key_types:
+                filename, _, key_class = HOST_KEY_TYPES[key_type]
+                path = os.path.join(key_dir, filename)
+                if not os.path.exists(path):
+                    _create_host_key(path, key_type, rsa_bits)
+                    logger.info(f"Generated {key_type} host key {path}")
+                key = key_class.from_private_key_file(path)
+                logger.info(f"Loaded {key.get_name()} host key {key.fingerprint}")
+                keys.append(key)
+            _host_keys[cache_key] = keys
+        return keys
+
+
+class HandshakeProfile:
+    """SSH algorithm and timeout profile that adapts to handshake load.
+
+    Normally the configured algorithm preferences and timeouts are used.
+    In adaptive mode, when the CPU spent in key exchanges over a window
+    exceeds cpu_threshold (fraction of one core), new connections only
+    get the cheapest algorithms and shorter timeouts until the load falls
+    back below half the threshold.
+    """
+
+    def __init__(self, ssh_config, log_event=None):
+        handshake_config = ssh_config.get('handshake', {})
+        self.kex = handshake_config.get('kex', [
+            'curve25519-sha256@libssh.org', 'ecdh-sha2-nistp256',
+            'diffie-hellman-group14-sha256', 'diffie-hellman-group-exchange-sha256'
+        ])
+        self.key_types = handshake_config.get('key_types', [
+            'ssh-ed25519', 'ecdsa-sha2-nistp256', 'rsa-sha2-512', 'rsa-sha2-256', 'ssh-rsa'
+        ])
+        self.cheap_kex = handshake_config.get('cheap_kex', ['curve25519-sha256@libssh.org', 'ecdh-sha2-nistp256'])
+        self.cheap_key_types = handshake_config.get('cheap_key_types', ['ssh-ed25519', 'ecdsa-sha2-nistp256'])
+        self.adaptive = handshake_config.get('adaptive', True)
+        self.cpu_threshold = handshake_config.get('cpu_threshold', 0.5)
+        self.window_seconds = handshake_config.get('window_seconds', 10)
+        self.timeout = ssh_config.get('timeout', 30)
+        self.reduced_timeout = handshake_config.get('reduced_timeout', 10)
+        self.log_event = log_event
+
+        self.degraded = False
+        self.metrics = {}
+        self.window_start = time.monotonic()
+        self.window_cpu = 0.0
+        self.last_cpu_fraction = 0.0
+        self.lock = threading.Lock()
+
+    def apply(self, transport):
+        """Set algorithm preferences and timeouts on a new server transport"""
+        kex, key_types = (self.cheap_kex, self.cheap_key_types) if self.degraded else (self.kex, self.key_types)
+        options = transport.get_security_options()
+        # Names this paramiko build does not support are skipped
+        options.kex = [name for name in kex if name in transport._kex_info]
+        options.key_types = [name for name in key_types if name in transport._key_info]
+
+        timeout = self.auth_timeout()
+        transport.banner_timeout = min(transport.banner_timeout, timeout)
+        transport.handshake_timeout = min(transport.handshake_timeout, timeout)
+        transport.auth_timeout = timeout
+
+    def auth_timeout(self):
+        """Seconds a client has to authenticate"""
+        return self.reduced_timeout if self.degraded else self.timeout
+
+    def record(self, kex, key_type, latency, cpu_seconds, completed=True):
+        """Account one handshake and re-evaluate the profile"""
+        algorithm = f"{kex or 'unknown'}/{key_type or 'unknown'}"
+        now = time.monotonic()
+        change = None
+
+        with self.lock:
+            metric = self.metrics.get(algorithm)
+            if metric is None:
+                metric = self.metrics[algorithm] = {
+                    'handshakes': 0, 'failed': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'cpu_ms': 0.0
+                }
+            if completed:
+                metric['handshakes'] += 1
+                metric['total_ms'] += latency * 1000
+                metric['max_ms'] = max(metric['max_ms'], latency * 1000)
+            else:
+                metric['failed'] += 1
+            metric['cpu_ms'] += cpu_seconds * 1000
+
+            self.window_cpu += cpu_seconds
+            elapsed = now - self.window_start
+            if elapsed >= self.window_seconds:
+                self.last_cpu_fraction = self.window_cpu / elapsed
+                self.window_cpu = 0.0
+                self.window_start = now
+                if self.adaptive:
+                    if not self.degraded and self.last_cpu_fraction > self.cpu_threshold:
+                        self.degraded = change = True
+                    elif self.degraded and self.last_cpu_fraction < self.cpu_threshold / 2:
+                        self.degraded = False
+                        change = True
+
+        if change and self.log_event:
+            self.log_event(
+                'handshake_profile_changed',
+                '0.0.0.0',
+                profile='cheap' if self.degraded else 'normal',
+                cpu_fraction=round(self.last_cpu_fraction, 3)
+            )
+
+    def stats(self):
+        """Per-algorithm handshake latency and CPU metrics"""
+        with self.lock:
+            return {
+                'profile': 'cheap' if self.degraded else 'normal',
+                'cpu_fraction': round(self.last_cpu_fraction, 3),
+                'algorithms': {
+                    algorithm: {
+                        'handshakes': metric['handshakes'],
+                        'failed': metric['failed'],
+                        'avg_ms': round(metric['total_ms'] / metric['handshakes'], 2) if metric['handshakes'] else 0.0,
+                        'max_ms': round(metric['max_ms'], 2),
+                        'cpu_ms': round(metric['cpu_ms'], 2)
+                    }
+                    for algorithm, metric in self.metrics.items()
+                }
+            }
+
+
+class _MeteredTransport(paramiko.Transport):
+    """Server transport that reports the latency and CPU of its key exchange"""
+
+    def __init__(self, sock, profile):
+        super().__init__(sock)
+        self.profile = profile
+        # Auth callbacks log from the transport thread, within the connection's session
+        self.context = contextvars.copy_context()
+        self.started_at = time.monotonic()
+        self.handshake_recorded = False
+
+    def _kex_name(self):
+        engine = getattr(self, 'kex_engine', None)
+        for name, kex_class in self._kex_info.items():
+            if engine is not None and type(engine) is kex_class:
+                return name
+        return None
+
+    def _activate_inbound(self):
+        super()._activate_inbound()
+        # Runs in the transport thread once NEWKEYS arrives: the handshake is done
+        if not self.handshake_recorded:
+            self.handshake_recorded = True
+            self.profile.record(self._kex_name(), self.host_key_type,
+                                time.monotonic() - self.started_at, time.thread_time())
+
+    def run(self):
+        self.context.run(self._run_metered)
+    
+    def _run_metered(self):
+        try:
+            super().run()
+        finally:
+            # Abandoned key exchanges cost CPU too
+            if not self.handshake_recorded:
+                self.handshake_recorded = True
+                self.profile.record(self._kex_name(), self.host_key_type,
+                                    time.monotonic() - self.started_at, time.thread_time(),
+                                    completed=False)
+
+
+class SSHShellSession:
+    """Line discipline for an interactive SSH shell channel.
+
+    Bots often paste whole scripts in one packet, so feed() splits
+    arbitrary chunks into command lines and returns the echo and command
+    output produced by a chunk for a single channel write.
+    """
+
+    MAX_LINE = 4096
+    CONTROL = re.compile(rb'[\r\n\x03\x04\x08\x7f]')
+
+    def __init__(self, honeypot, client_ip, username='root'):
+        self.honeypot = honeypot
+        self.client_ip = client_ip
+        self.line = bytearray()
+        self.output = bytearray()
+        self.skip_lf = False
+        self.closed = False
+        self.shell = ShellSession(honeypot.filesystem, username, honeypot.max_overlay_bytes)
+
+    def send(self, data):
+        """Collect output from the command handlers"""
+        self.output += data
+        return len(data)
+
+    def flush(self):
+        data = bytes(self.output)
+        self.output.clear()
+        return data
+
+    def begin(self):
+        """Login banner and first prompt"""
+        self.send(b'Welcome to Ubuntu 20.04.5 LTS (GNU/Linux 5.4.0-135-generic x86_64)\r\n\r\n')
+        self.send(b'Last login: ' + datetime.now().strftime('%a %b %d %H:%M:%S %Y').encode() + b' from ' + self.client_ip.encode() + b'\r\n')
+        self.send(self.shell.prompt().encode())
+        return self.flush()
+
+    def feed(self, data):
+        """Process received bytes and return the batched response"""
+        index = 0
+        for match in self.CONTROL.finditer(data):
+            self._add_text(data[index:match.start()])
+            index = match.end()
+            if self.closed:
+                break
+            self._handle_control(data[match.start()])
+        else:
+            self._add_text(data[index:])
+        return self.flush()
+
+    def _add_text(self, text):
+        """Append printable input to the current line and echo it"""
+        if not text:
+            return
+        self.skip_lf = False
+        text = text[:self.MAX_LINE - len(self.line)]
+        self.line += text
+        self.send(text)
+
+    def _handle_control(self, byte):
+        """Act on a line ending or control character"""
+        if self.skip_lf:
+            self.skip_lf = False
+            if byte == 10:  # CR LF ends a single line
+                return
+        if byte in (13, 10):
+            self.skip_lf = byte == 13
+            command = self.line.decode('utf-8', errors='ignore').strip()
+            self.line.clear()
+            self.send(b'\r\n')
+            if command and not self.honeypot._run_command(self, command, self.client_ip):
+                self.closed = True
+                return
+            self.send(self.shell.prompt().encode())
+        elif byte == 3:  # Ctrl+C
+            self.line.clear()
+            self.send(b'^C\r\n' + self.shell.prompt().encode())
+        elif byte == 4:  # Ctrl+D
+            self.send(b'logout\r\n')
+            self.closed = True
+        elif self.line:  # Backspace
+            self.line.pop()
+            self.send(b'\b \b')
+
 
 class SSHHoneypot:
     def __init__(self, config, logger):
@@ -18,32 +337,28 @@ class SSHHoneypot:
         self.logger = logger
         self.host = '0.0.0.0'
         self.port = config['honeypot']['ssh']['port']
+        self.events = get_event_writer('logs/ssh_honeypot.log', config)
         self.banner = config['honeypot']['ssh']['banner']
         self.fake_users = {user['username']: user['password'] 
                           for user in config['honeypot']['ssh']['fake_users']}
         self.max_connections = config['honeypot']['ssh']['max_connections']
         self.timeout = config['honeypot']['ssh']['timeout']
-        self.active_connections = 0
+        self.signatures = get_signature_matcher(config)
+        self.filesystem = get_filesystem(config)
+        self.recorder = get_recorder(config)
+        self.payloads = get_payload_store(config)
+        self.max_overlay_bytes = config.get('shell', {}).get('max_overlay_bytes', 1048576)
         
-        # Generate host key
-        self.host_key = self._generate_host_key()
+        # OpenSSH drops connections beyond MaxStartups without a banner
+        pool_config = {'max_workers': self.max_connections, **config['honeypot']['ssh']}
+        self.tarpit = get_tarpit(config)
+        self.sessions = SessionTracker('ssh', self._log_event)
+        self.admission = AdmissionController('ssh', config, self._log_event, tarpit=self.tarpit)
+        self.pool = ConnectionPool('SSH', self.admission.guard(self.sessions.track(self.handle_client)), pool_config)
         
-    def _generate_host_key(self):
-        """Generate RSA host key for SSH server"""
-        private_key = rsa.generate_private_key(
-            public_exponent=65537,
-            key_size=2048
-        )
-        
-        pem = private_key.private_bytes(
-            encoding=serialization.Encoding.PEM,
-            format=serialization.PrivateFormat.PKCS8,
-            encryption_algorithm=serialization.NoEncryption()
-        )
-        
-        return paramiko.RSAKey.from_private_key_file(
-            file_obj=type('StringIO', (), {'read': lambda: pem.decode()})()
-        )
+        # Persistent host keys, shared by every instance in this process
+        self.host_keys = get_host_keys(config['honeypot']['ssh'])
+        self.handshake = HandshakeProfile(config['honeypot']['ssh'], self._log_event)
     
     def _log_event(self, event_type, client_ip, **kwargs):
         """Log honeypot events in JSON format"""
@@ -57,14 +372,15 @@ class SSHHoneypot:
             **kwargs
         }
         
+        # Events of a connection carry its session id
+        stamp_session(log_entry)
+        
         # Log to file
-        log_file = 'logs/ssh_honeypot.log'
-        os.makedirs(os.path.dirname(log_file), exist_ok=True)
-        with open(log_file, 'a') as f:
-            f.write(json.dumps(log_entry) + '\n')
+        self.events.write(log_entry)
         
-        # Log to console
-        self.logger.info(f"SSH Event: {event_type} from {client_ip}")
+        # Log to console, unless the event pipeline is shedding load
+        if self.events.console:
+            self.logger.info(f"SSH Event: {event_type} from {client_ip}")
     
     def handle_client(self, client_socket, client_address):
         """Handle individual SSH client connections"""
@@ -72,12 +388,14 @@ class SSHHoneypot:
         client_port = client_address[1]
         
         try:
-            self.active_connections += 1
             self._log_event('connection_attempt', client_ip, source_port=client_port)
             
             # Create SSH transport
-            transport = paramiko.Transport(client_socket)
-            transport.add_server_key(self.host_key)
+            transport = _MeteredTransport(client_socket, self.handshake)
+            transport.local_version = self.banner
+            self.handshake.apply(transport)
+            for host_key in self.host_keys:
+                transport.add_server_key(host_key)
             
             # Create SSH server interface
             server = SSHServerInterface(self, client_ip)
@@ -86,9 +404,12 @@ class SSHHoneypot:
                 transport.start_server(server=server)
                 
                 # Wait for authentication
-                channel = transport.accept(self.timeout)
-                if channel is not None:
-                    self._handle_shell_session(channel, client_ip)
+                channel = transport.accept(self.handshake.auth_timeout())
+                if channel is not None and server.request_ready.wait(self.timeout):
+                    if server.exec_command is not None:
+                        self._handle_exec_request(channel, server.exec_command, client_ip, server.username)
+                    else:
+                        self._handle_shell_session(channel, client_ip, server.terminal, server.username)
                     
             except Exception as e:
                 self._log_event('transport_error', client_ip, error=str(e))
@@ -96,46 +417,35 @@ class SSHHoneypot:
         except Exception as e:
             self._log_event('connection_error', client_ip, error=str(e))
         finally:
-            self.active_connections -= 1
             try:
                 client_socket.close()
             except:
                 pass
     
-    def _handle_shell_session(self, channel, client_ip):
+    def _handle_shell_session(self, channel, client_ip, terminal=None, username='root'):
         """Handle shell session after successful authentication"""
+        session = SSHShellSession(self, client_ip, username)
+        term, width, height = terminal or (None, None, None)
+        recording = self.recorder.open_session('ssh', client_ip, username=username,
+                                               terminal_type=term, width=width, height=height)
         try:
-            channel.send(b'Welcome to Ubuntu 20.04.5 LTS (GNU/Linux 5.4.0-135-generic x86_64)\r\n\r\n')
-            channel.send(b'Last login: ' + datetime.now().strftime('%a %b %d %H:%M:%S %Y').encode() + b' from ' + client_ip.encode() + b'\r\n')
-            channel.send(b'$ ')
-            
-            command_buffer = b''
+            output = session.begin()
+            recording.output(output)
+            channel.sendall(output)
+            count_bytes(sent=len(output))
             
-            while True:
+            while not session.closed:
                 try:
-                    data = channel.recv(1024)
+                    data = channel.recv(4096)
                     if not data:
                         break
                     
-                    if data == b'\r' or data == b'\n' or data == b'\r\n':
-                        command = command_buffer.decode('utf-8', errors='ignore').strip()
-                        if command:
-                            self._log_event('command_executed', client_ip, command=command)
-                            self._handle_command(channel, command, client_ip)
-                        command_buffer = b''
-                        channel.send(b'$ ')
-                    elif data == b'\x03':  # Ctrl+C
-                        channel.send(b'^C\r\n$ ')
-                        command_buffer = b''
-                    elif data == b'\x04':  # Ctrl+D
-                        break
-                    elif data == b'\x7f':  # Backspace
-                        if command_buffer:
-                            command_buffer = command_buffer[:-1]
-                            channel.send(b'\b \b')
-                    else:
-                        command_buffer += data
-                        channel.send(data)
+                    recording.input(data)
+                    output = session.feed(data)
+                    count_bytes(received=len(data), sent=len(output))
+                    if output:
+                        recording.output(output)
+                        channel.sendall(output)
                         
                 except socket.timeout:
                     break
@@ -146,51 +456,53 @@ class SSHHoneypot:
         except Exception as e:
             self._log_event('shell_session_error', client_ip, error=str(e))
         finally:
+            recording.close()
             try:
                 channel.close()
             except:
                 pass
     
-    def _handle_command(self, channel, command, client_ip):
-        """Handle commands executed in the shell"""
-        command_lower = command.lower().strip()
-        
-        # Simulate common command responses
-        if command_lower == 'whoami':
-            channel.send(b'root\r\n')
-        elif command_lower == 'pwd':
-            channel.send(b'/root\r\n')
-        elif command_lower.startswith('ls'):
-            channel.send(b'Desktop  Documents  Downloads  Pictures  Videos\r\n')
-        elif command_lower == 'id':
-            channel.send(b'uid=0(root) gid=0(root) groups=0(root)\r\n')
-        elif command_lower == 'uname -a':
-            channel.send(b'Linux honeypot 5.4.0-135-generic #152-Ubuntu SMP Wed Nov 23 20:19:22 UTC 2022 x86_64 x86_64 x86_64 GNU/Linux\r\n')
-        elif command_lower.startswith('cat /etc/passwd'):
-            channel.send(b'root:x:0:0:root:/root:/bin/bash\r\ndaemon:x:1:1:daemon:/usr/sbin:/usr/sbin/nologin\r\n')
-        elif command_lower.startswith('ps'):
-            channel.send(b'  PID TTY          TIME CMD\r\n 1234 pts/0    00:00:00 bash\r\n 5678 pts/0    00:00:00 ps\r\n')
-        elif command_lower == 'exit' or command_lower == 'logout':
-            channel.send(b'logout\r\n')
-            return False
-        else:
-            # For unknown commands, simulate command not found or hang
-            if any(suspicious in command_lower for suspicious in ['wget', 'curl', 'nc', 'nmap']):
-                channel.send(f'{command}: command not found\r\n'.encode())
-            else:
-                channel.send(f'{command}: command not found\r\n'.encode())
-        
-        return True
+    def _handle_exec_request(self, channel, command, client_ip, username='root'):
+        """Run a non-interactive command (ssh host cmd) and close the channel"""
+        session = SSHShellSession(self, client_ip, username)
+        recording = self.recorder.open_session('ssh', client_ip, username=username, exec_command=command)
+        try:
+            self._run_command(session, command, client_ip, exec_request=True)
+            output = session.flush()
+            recording.output(output)
+            channel.sendall(output)
+            count_bytes(received=len(command), sent=len(output))
+            channel.send_exit_status(session.shell.status)
+        except Exception as e:
+            self._log_event('shell_session_error', client_ip, error=str(e))
+        finally:
+            recording.close()
+            try:
+                channel.close()
+            except:
+                pass
+    
+    def _run_command(self, session, command, client_ip, **kwargs):
+        """Log a command and write its emulated output"""
+        self._log_event('command_executed', client_ip, command=command,
+                        signatures=self.signatures.match('command', command),
+                        download_urls=self.payloads.record_urls(command, 'ssh', client_ip), **kwargs)
+        output, still_open = session.shell.execute(command)
+        session.send(output.encode('utf-8'))
+        return still_open
     
     def start(self):
         """Start the SSH honeypot server"""
         server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if reuse_port():
+            server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
         
         try:
             server_socket.bind((self.host, self.port))
             server_socket.listen(self.max_connections)
             
+            self.pool.start()
             self.logger.info(f"SSH Honeypot started on {self.host}:{self.port}")
             self._log_event('honeypot_started', '0.0.0.0')
             
@@ -198,15 +510,12 @@ class SSHHoneypot:
                 try:
                     client_socket, client_address = server_socket.accept()
                     
-                    if self.active_connections < self.max_connections:
-                        client_thread = threading.Thread(
-                            target=self.handle_client,
-                            args=(client_socket, client_address)
-                        )
-                        client_thread.daemon = True
-                        client_thread.start()
-                    else:
-                        client_socket.close()
+                    if not self.admission.admit(client_address[0]):
+                        self.admission.refuse(client_socket, client_address[0])
+                        continue
+                    
+                    if not self.pool.submit(client_socket, client_address):
+                        self.admission.release(client_address[0])
                         
                 except KeyboardInterrupt:
                     break
@@ -224,6 +533,10 @@ class SSHServerInterface(paramiko.ServerInterface):
     def __init__(self, honeypot, client_ip):
         self.honeypot = honeypot
         self.client_ip = client_ip
+        self.exec_command = None
+        self.terminal = None
+        self.username = None
+        self.request_ready = threading.Event()
     
     def check_channel_request(self, kind, chanid):
         if kind == 'session':
@@ -232,15 +545,19 @@ class SSHServerInterface(paramiko.ServerInterface):
     
     def check_auth_password(self, username, password):
         """Check password authentication"""
+        # The configured fake accounts log in to the emulated shell
+        success = self.honeypot.fake_users.get(username) == password
         self.honeypot._log_event(
             'login_attempt',
             self.client_ip,
             username=username,
             password=password,
-            success=False
+            success=success
         )
         
-        # Always fail authentication but log the attempt
+        if success:
+            self.username = username
+            return paramiko.AUTH_SUCCESSFUL
         return paramiko.AUTH_FAILED
     
     def check_auth_publickey(self, username, key):
@@ -258,9 +575,16 @@ class SSHServerInterface(paramiko.ServerInterface):
         return 'password,publickey'
     
     def check_channel_shell_request(self, channel):
+        self.request_ready.set()
+        return True
+    
+    def check_channel_exec_request(self, channel, command):
+        self.exec_command = command.decode('utf-8', errors='ignore').strip()
+        self.request_ready.set()
         return True
     
     def check_channel_pty_request(self, channel, term, width, height, pixelwidth, pixelheight, modes):
+        self.terminal = (term.decode('ascii', errors='ignore') if isinstance(term, bytes) else term, width, height)
         return True
 
 
@@ -12,10 +12,23 @@ from datetime import datetime
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from honeypots.ssh_honeypot import SSHHoneypot
-from honeypots.http_honeypot import HTTPHoneypot
+from honeypots.ssh_honeypot import SSHHoneypot, get_host_keys
+from honeypots.http_honeypot import HTTPHoneypot, HTTPSHoneypot, https_config
 from honeypots.ftp_honeypot import FTPHoneypot
 from honeypots.telnet_honeypot import TelnetHoneypot
+from honeypots.payloads import get_payload_store
+from honeypots.tarpit import get_tarpit
+from honeypots.workers import WorkerGroup, honeypot_stats
+from honeypots.tls import get_tls_server
+from honeypots.events import flush_event_writers
+
+SERVICES = (
+    ('SSH', SSHHoneypot),
+    ('HTTP', HTTPHoneypot),
+    ('HTTPS', HTTPSHoneypot),
+    ('FTP', FTPHoneypot),
+    ('Telnet', TelnetHoneypot)
+)
 
 class HoneypotOrchestrator:
     def __init__(self, config_path='config/honeypot_config.yaml'):
@@ -24,7 +37,9 @@ class HoneypotOrchestrator:
         self.logger = self._setup_logging()
         self.honeypots = {}
         self.threads = {}
+        self.worker_groups = {}
         self.running = False
+        self.overload_counts = {}
         
         # Setup signal handlers
         signal.signal(signal.SIGINT, self._signal_handler)
@@ -81,33 +96,68 @@ class HoneypotOrchestrator:
         except Exception as e:
             self.logger.error(f"Failed to start {name} honeypot: {e}")
     
+    def _processes(self, name):
+        """Worker processes configured for a service (1 runs it as a thread here)"""
+        return self.config['honeypot'].get(name.lower(), {}).get('processes', 1)
+    
+    def _start_workers(self, name, honeypot_class):
+        """Start a honeypot as worker processes sharing its port via SO_REUSEPORT"""
+        try:
+            if name == 'SSH':
+                # Generate missing host keys once instead of racing in every worker
+                get_host_keys(self.config['honeypot']['ssh'])
+            elif name == 'HTTPS':
+                # Likewise for a missing certificate
+                get_tls_server(https_config(self.config))
+            group = WorkerGroup(name, honeypot_class, self.config, self._processes(name))
+            self.worker_groups[name] = group
+            group.start()
+            self.logger.info(f"Started {name} honeypot with {group.processes} worker processes")
+            
+        except Exception as e:
+            self.logger.error(f"Failed to start {name} honeypot workers: {e}")
+    
+    def _check_overload(self):
+        """Warn when a honeypot has started shedding connections"""
+        for name, info in self.status()['honeypots'].items():
+            if 'connections' not in info:
+                continue
+            stats = info['connections']
+            shed = stats['rejected'] + stats['tarpitted']
+            previous = self.overload_counts.get(name, 0)
+            if shed > previous:
+                self.logger.warning(
+                    f"{name} honeypot overloaded: shed {shed - previous} connections "
+                    f"({stats['overload_policy']}; active {stats['active']}, queued {stats['queued']})"
+                )
+            self.overload_counts[name] = shed
+    
     def start_all(self):
         """Start all enabled honeypots"""
         self.logger.info("Starting Honeypot System...")
         self.running = True
         
-        # Start SSH honeypot
-        if self.config['honeypot']['ssh']['enabled']:
-            self._start_honeypot('SSH', SSHHoneypot)
-        
-        # Start HTTP honeypot
-        if self.config['honeypot']['http']['enabled']:
-            self._start_honeypot('HTTP', HTTPHoneypot)
+        services = [
+            (name, honeypot_class) for name, honeypot_class in SERVICES
+            if self.config['honeypot'].get(name.lower(), {}).get('enabled', False)
+        ]
         
-        # Start FTP honeypot
-        if self.config['honeypot']['ftp']['enabled']:
-            self._start_honeypot('FTP', FTPHoneypot)
+        # Fork worker processes before this process starts any honeypot threads
+        for name, honeypot_class in services:
+            if self._processes(name) > 1:
+                self._start_workers(name, honeypot_class)
         
-        # Start Telnet honeypot
-        if self.config['honeypot']['telnet']['enabled']:
-            self._start_honeypot('Telnet', TelnetHoneypot)
+        for name, honeypot_class in services:
+            if self._processes(name) <= 1:
+                self._start_honeypot(name, honeypot_class)
         
-        self.logger.info(f"Started {len(self.threads)} honeypot services")
+        self.logger.info(f"Started {len(self.threads) + len(self.worker_groups)} honeypot services")
         
         # Keep main thread alive
         try:
             while self.running:
                 time.sleep(1)
+                self._check_overload()
                 
                 # Check if any threads have died
                 for name, thread in list(self.threads.items()):
@@ -118,14 +168,11 @@ class HoneypotOrchestrator:
                         del self.honeypots[name]
                         
                         # Restart honeypot
-                        if name == 'SSH' and self.config['honeypot']['ssh']['enabled']:
-                            self._start_honeypot('SSH', SSHHoneypot)
-                        elif name == 'HTTP' and self.config['honeypot']['http']['enabled']:
-                            self._start_honeypot('HTTP', HTTPHoneypot)
-                        elif name == 'FTP' and self.config['honeypot']['ftp']['enabled']:
-                            self._start_honeypot('FTP', FTPHoneypot)
-                        elif name == 'Telnet' and self.config['honeypot']['telnet']['enabled']:
-                            self._start_honeypot('Telnet', TelnetHoneypot)
+                        self._start_honeypot(name, dict(SERVICES)[name])
+                
+                # Restart worker processes that have exited
+                for group in self.worker_groups.values():
+                    group.check()
                         
         except KeyboardInterrupt:
             self.logger.info("Received keyboard interrupt, shutting down...")
@@ -141,6 +188,15 @@ class HoneypotOrchestrator:
             self.logger.info(f"Stopping {name} honeypot...")
             thread.join(timeout=5)
         
+        for name, group in self.worker_groups.items():
+            self.logger.info(f"Stopping {name} worker processes...")
+            group.stop()
+        
+        for honeypot in self.honeypots.values():
+            if hasattr(honeypot, 'admission'):
+                honeypot.admission.flush()
+        get_payload_store(self.config).flush()
+        flush_event_writers()
         self.logger.info("All honeypots stopped")
     
     def status(self):
@@ -156,7 +212,14 @@ class HoneypotOrchestrator:
                 'running': thread.is_alive(),
                 'thread_name': thread.name
             }
+            honeypot = self.honeypots.get(name)
+            if honeypot is not None:
+                status_info['honeypots'][name].update(honeypot_stats(honeypot))
+        
+        for name, group in self.worker_groups.items():
+            status_info['honeypots'][name] = group.status()
         
+        status_info['tarpit'] = get_tarpit(self.config).stats()
         return status_info
     
     def print_status(self):
@@ -173,6 +236,26 @@ class HoneypotOrchestrator:
         for name, info in status['honeypots'].items():
             status_str = "RUNNING" if info['running'] else "STOPPED"
             print(f"  {name:10} : {status_str}")
+            if 'processes' in info:
+                alive = sum(1 for worker in info['workers'] if worker['alive'])
+                print(f"  {'':10}   {alive}/{info['processes']} worker processes, {info['restarts']} restarts")
+            if 'connections' in info:
+                pool = info['connections']
+                print(f"  {'':10}   active {pool['active']}/{pool['max_workers']}, "
+                      f"queued {pool['queued']}/{pool['queue_limit']}, "
+                      f"rejected {pool['rejected']}, tarpitted {pool['tarpitted']}")
+            if 'events' in info:
+                # Merged worker stats keep the first worker's tier; any degraded one matters
+                tiers = {info['events']['tier']}
+                tiers.update(worker['events']['tier'] for worker in info.get('workers', []) if 'events' in worker)
+                tiers.discard('normal')
+                if tiers:
+                    print(f"  {'':10}   event logging degraded ({', '.join(sorted(tiers))}), "
+                          f"{info['events']['queued']} events queued")
+        
+        tarpit = status['tarpit']
+        if tarpit['enabled']:
+            print(f"\nTarpit: holding {tarpit['held']} bots, {tarpit['flagged_sources']} sources flagged")
         
         print("="*50)
 
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+
+import os
+import time
+import socket
+import random
+import logging
+import selectors
+import threading
+from collections import Counter, OrderedDict, deque
+
+DEFAULT_TARPIT = {
+    'enabled': False,
+    'services': ['ssh', 'telnet', 'http', 'https'],
+    'interval': 10,
+    'chunk_bytes': 1,
+    'max_hold': 3600,
+    'max_sockets': 50000,
+    'tick': 0.5,
+    'wheel_slots': 512,
+    'socket_buffer': 4096,
+    'flag_ttl': 3600,
+    'max_flagged': 100000,
+    'signature_categories': []
+}
+
+# Telnet bots are kept in a login loop that never completes
+TELNET_SCRIPT = (
+    b'\r\nUbuntu 20.04.5 LTS\r\n',
+    b'login: ',
+    b'\r\nPassword: ',
+    b'\r\n\r\nLogin incorrect\r\n',
+)
+
+
+def _ssh_drip(index):
+    # RFC 4253 lets a server send other lines before its version string;
+    # clients keep waiting as long as none of them starts with "SSH-"
+    return b'%x\r\n' % random.getrandbits(32)
+
+
+def _telnet_drip(index):
+    return TELNET_SCRIPT[index % len(TELNET_SCRIPT)]
+
+
+def _http_drip(index):
+    # A status line followed by headers that never end
+    if index == 0:
+        return b'HTTP/1.1 200 OK\r\n'
+    return b'X-%x: %x\r\n' % (random.getrandbits(16), random.getrandbits(32))
+
+
+def _tls_drip(index):
+    # A handshake record header promising a full 16 KB record, then its
+    # bytes one drip at a time; the client waits for the whole record
+    if index == 0:
+        return b'\x16\x03\x03\x40\x00'
+    return random.getrandbits(32).to_bytes(4, 'big')
+
+
+DRIPS = {
+    'ssh': _ssh_drip,
+    'telnet': _telnet_drip,
+    'http': _http_drip,
+    'https': _tls_drip
+}
+
+
+class TimerWheel:
+    """Hashed timer wheel: O(1) scheduling, one slot visited per tick"""
+
+    def __init__(self, tick, slots):
+        self.tick = tick
+        self.slots = [[] for _ in range(slots)]
+        self.position = 0
+
+    def schedule(self, delay, item):
+        """Fire item after roughly delay seconds (at least one tick)"""
+        ticks = max(1, int(-(-delay // self.tick)))
+        rounds, offset = divmod(ticks - 1, len(self.slots))
+        slot = (self.position + offset + 1) % len(self.slots)
+        self.slots[slot].append((rounds, item))
+
+    def advance(self):
+        """Move one tick forward and return the items that are due"""
+        self.position = (self.position + 1) % len(self.slots)
+        due = []
+        pending = []
+        for rounds, item in self.slots[self.position]:
+            if rounds:
+                pending.append((rounds - 1, item))
+            else:
+                due.append(item)
+        self.slots[self.position] = pending
+        return due
+
+
+class _Held:
+    """One tarpitted connection; kept small so tens of thousands fit"""
+
+    __slots__ = ('sock', 'service', 'pending', 'index', 'deadline', 'sent', 'closed')
+
+    def __init__(self, sock, service, deadline):
+        self.sock = sock
+        self.service = service
+        self.pending = b''
+        self.index = 0
+        self.deadline = deadline
+        self.sent = 0
+        self.closed = False
+
+
+class Tarpit:
+    """Holds connections from identified bots and drips bytes to them.
+
+    Sources are identified by rate (connections refused by admission
+    control) or by signature (flag() from a service that matched an attack
+    signature) and stay flagged for flag_ttl seconds. Every held socket
+    belongs to one selector loop on a single thread; drips are driven by a
+    timer wheel, so a held connection costs a small object, a file
+    descriptor and its (shrunk) kernel buffers.
+    """
+
+    def __init__(self, config=None):
+        settings = dict(DEFAULT_TARPIT)
+        settings.update((config or {}).get('tarpit', {}))
+
+        self.enabled = settings['enabled']
+        self.services = set(settings['services'])
+        self.interval = settings['interval']
+        self.chunk_bytes = settings['chunk_bytes']
+        self.max_hold = settings['max_hold']
+        self.max_sockets = settings['max_sockets']
+        self.socket_buffer = settings['socket_buffer']
+        self.flag_ttl = settings['flag_ttl']
+        self.max_flagged = settings['max_flagged']
+        self.signature_categories = set(settings['signature_categories'])
+        self.logger = logging.getLogger('Tarpit')
+
+        self.wheel = TimerWheel(settings['tick'], settings['wheel_slots'])
+        self.selector = None
+        self.incoming = deque()
+        self.wake_reader, self.wake_writer = None, None
+
+        # ip -> flag expiry
+        self.flagged = OrderedDict()
+        self.held = 0
+        self.held_total = Counter()
+        self.bytes_sent = 0
+        self.seconds_held = 0.0
+        self.pid = None
+        self.lock = threading.Lock()
+
+    def enabled_for(self, service):
+        return self.enabled and service in self.services
+
+    def flag(self, client_ip, categories=None):
+        """Mark a source as a bot; categories restrict signature-based flags"""
+        if not self.enabled:
+            return
+        if categories is not None and self.signature_categories:
+            if not self.signature_categories.intersection(categories):
+                return
+        with self.lock:
+            self.flagged[client_ip] = time.monotonic() + self.flag_ttl
+            self.flagged.move_to_end(client_ip)
+            if len(self.flagged) > self.max_flagged:
+                self.flagged.popitem(last=False)
+
+    def wants(self, service, client_ip):
+        """Whether a new connection should go straight to the tarpit"""
+        if not self.enabled_for(service):
+            return False
+        with self.lock:
+            expiry = self.flagged.get(client_ip)
+            if expiry is None:
+                return False
+            if expiry < time.monotonic():
+                del self.flagged[client_ip]
+                return False
+            return True
+
+    def hold(self, client_socket, client_ip, service):
+        """Take over a connection (the caller still closes its own handle).
+
+        Works with plain sockets and asyncio transport sockets. Returns
+        False when the tarpit is off for this service or full.
+        """
+        if not self.enabled_for(service):
+            return False
+        self._ensure_loop()
+        with self.lock:
+            if self.held >= self.max_sockets:
+                return False
+            self.held += 1
+        self.flag(client_ip)
+
+        try:
+            sock = client_socket.dup()
+            sock.setblocking(False)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.socket_buffer)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.socket_buffer)
+        except OSError:
+            with self.lock:
+                self.held -= 1
+            return False
+
+        with self.lock:
+            self.held_total[service] += 1
+        self.incoming.append(_Held(sock, service, time.monotonic() + self.max_hold))
+        self._wake()
+        return True
+
+    def _ensure_loop(self):
+        with self.lock:
+            # The loop thread doesn't survive fork; a forked worker starts its own
+            if self.pid != os.getpid():
+                self.pid = os.getpid()
+                # Sockets held by the parent, and their totals, stay with the parent
+                self.wheel = TimerWheel(self.wheel.tick, len(self.wheel.slots))
+                self.incoming = deque()
+                self.held = 0
+                self.held_total = Counter()
+                self.bytes_sent = 0
+                self.seconds_held = 0.0
+                self.selector = selectors.DefaultSelector()
+                self.wake_reader, self.wake_writer = socket.socketpair()
+                self.wake_reader.setblocking(False)
+                self.wake_writer.setblocking(False)
+                self.selector.register(self.wake_reader, selectors.EVENT_READ)
+                thread = threading.Thread(target=self._loop, name='Tarpit')
+                thread.daemon = True
+                thread.start()
+
+    def _wake(self):
+        try:
+            self.wake_writer.send(b'\0')
+        except (BlockingIOError, OSError):
+            pass  # Loop is already due to wake up
+
+    def _loop(self):
+        """Single event loop serving every tarpitted socket"""
+        next_tick = time.monotonic() + self.wheel.tick
+        while True:
+            timeout = max(0.0, next_tick - time.monotonic())
+            for key, _ in self.selector.select(timeout):
+                if key.fileobj is self.wake_reader:
+                    try:
+                        while self.wake_reader.recv(4096):
+                            pass
+                    except (BlockingIOError, OSError):
+                        pass
+                else:
+                    self._readable(key.data)
+
+            while self.incoming:
+                held = self.incoming.popleft()
+                self.selector.register(held.sock, selectors.EVENT_READ, held)
+                self.wheel.schedule(0, held)
+
+            now = time.monotonic()
+            while now >= next_tick:
+                for held in self.wheel.advance():
+                    self._drip(held, now)
+                next_tick += self.wheel.tick
+
+    def _readable(self, held):
+        """Discard whatever the bot sends; close once it hangs up"""
+        try:
+            if held.sock.recv(4096):
+                return
+        except BlockingIOError:
+            return
+        except OSError:
+            pass
+        self._release(held)
+
+    def _drip(self, held, now):
+        if held.closed:
+            return
+        if now >= held.deadline:
+            self._release(held)
+            return
+
+        if not held.pending:
+            held.pending = DRIPS[held.service](held.index)
+            held.index += 1
+        try:
+            sent = held.sock.send(held.pending[:self.chunk_bytes])
+        except BlockingIOError:
+            sent = 0
+        except OSError:
+            self._release(held)
+            return
+
+        held.pending = held.pending[sent:]
+        held.sent += sent
+        self.wheel.schedule(self.interval, held)
+
+    def _release(self, held):
+        held.closed = True
+        try:
+            self.selector.unregister(held.sock)
+        except (KeyError, ValueError):
+            pass
+        held.sock.close()
+        with self.lock:
+            self.held -= 1
+            self.bytes_sent += held.sent
+            self.seconds_held += self.max_hold - max(0.0, held.deadline - time.monotonic())
+
+    def stats(self):
+        """Held sockets, flagged sources and totals"""
+        with self.lock:
+            return {
+                'enabled': self.enabled,
+                'held': self.held,
+                'flagged_sources': len(self.flagged),
+                'held_total': dict(self.held_total),
+                'bytes_sent': self.bytes_sent,
+                'seconds_held': round(self.seconds_held)
+            }
+
+
+_tarpit = None
+_tarpit_lock = threading.Lock()
+
+
+def get_tarpit(config):
+    """Get the process-wide tarpit shared by all services"""
+    global _tarpit
+    with _tarpit_lock:
+        if _tarpit is None:
+            _tarpit = Tarpit(config)
+        return _tarpit
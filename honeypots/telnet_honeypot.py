@@ -1,22 +1,337 @@
 #!/usr/bin/env python3
 
 import socket
-import threading
-import json
-import time
+import asyncio
 import logging
 import os
+import sys
 from datetime import datetime
 
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from honeypots.signatures import get_signature_matcher
+from honeypots.worker_pool import ConnectionPool
+from honeypots.admission import AdmissionController
+from honeypots.events import get_event_writer
+from honeypots.sessions import SessionTracker, stamp_session, count_bytes
+from honeypots.workers import reuse_port
+from honeypots.tarpit import get_tarpit
+from honeypots.shell import ShellSession, get_filesystem
+from honeypots.recordings import get_recorder
+from honeypots.payloads import get_payload_store
+
+# Telnet protocol bytes (RFC 854) and options used by the honeypot
+IAC, DONT, DO, WONT, WILL, SB, SE = 255, 254, 253, 252, 251, 250, 240
+OPT_ECHO, OPT_SGA, OPT_TTYPE, OPT_NAWS = 1, 3, 24, 31
+TTYPE_IS, TTYPE_SEND = 0, 1
+
+# Server side of the initial negotiation
+NEGOTIATION = bytes([
+    IAC, WILL, OPT_ECHO,
+    IAC, WILL, OPT_SGA,
+    IAC, DO, OPT_TTYPE,
+    IAC, DO, OPT_NAWS
+])
+
+
+class TelnetParser:
+    """Incremental Telnet stream parser.
+
+    Splits received bytes into application data and Telnet commands
+    (option negotiation and subnegotiation), keeping its state between
+    chunks so sequences split across reads are handled correctly.
+    """
+
+    DATA, COMMAND, OPTION, SUBNEG, SUBNEG_IAC = range(5)
+
+    def __init__(self, max_subnegotiation=256):
+        self.state = self.DATA
+        self.verb = None
+        self.subnegotiation = bytearray()
+        self.max_subnegotiation = max_subnegotiation
+
+    def feed(self, data):
+        """Parse a chunk, returning (payload bytes, list of commands)"""
+        if self.state == self.DATA and IAC not in data:
+            return data, []
+
+        payload = bytearray()
+        commands = []
+        index = 0
+        length = len(data)
+
+        while index < length:
+            if self.state == self.DATA:
+                # Copy plain data up to the next IAC in one slice
+                next_iac = data.find(b'\xff', index)
+                if next_iac == -1:
+                    payload += data[index:]
+                    break
+                payload += data[index:next_iac]
+                index = next_iac + 1
+                self.state = self.COMMAND
+                continue
+
+            byte = data[index]
+            index += 1
+
+            if self.state == self.COMMAND:
+                if byte == IAC:
+                    payload.append(IAC)  # Escaped 0xff data byte
+                    self.state = self.DATA
+                elif byte in (WILL, WONT, DO, DONT):
+                    self.verb = byte
+                    self.state = self.OPTION
+                elif byte == SB:
+                    self.subnegotiation.clear()
+                    self.state = self.SUBNEG
+                else:
+                    self.state = self.DATA  # NOP, GA, AYT, ... carry no data
+            elif self.state == self.OPTION:
+                commands.append((self.verb, byte))
+                self.state = self.DATA
+            elif self.state == self.SUBNEG:
+                if byte == IAC:
+                    self.state = self.SUBNEG_IAC
+                elif len(self.subnegotiation) < self.max_subnegotiation:
+                    self.subnegotiation.append(byte)
+            elif self.state == self.SUBNEG_IAC:
+                if byte == SE:
+                    commands.append((SB, bytes(self.subnegotiation)))
+                    self.state = self.DATA
+                else:
+                    if byte == IAC and len(self.subnegotiation) < self.max_subnegotiation:
+                        self.subnegotiation.append(IAC)
+                    self.state = self.SUBNEG
+
+        return bytes(payload), commands
+
+
+class _OutputBuffer:
+    """Collects everything sent while handling one chunk for a single write"""
+
+    def __init__(self):
+        self.data = bytearray()
+
+    def send(self, data):
+        self.data += data
+        return len(data)
+
+    def flush(self):
+        data = bytes(self.data)
+        self.data.clear()
+        return data
+
+
+class TelnetSession:
+    """Protocol state of one Telnet connection, independent of socket I/O.
+
+    feed() consumes received bytes and returns the bytes to send back, so
+    the same session logic runs under the threaded and asyncio servers.
+    """
+
+    LOGIN_USER, LOGIN_PASS, SHELL, CLOSED = range(4)
+    MAX_LOGIN_ATTEMPTS = 3
+    MAX_LINE = 4096
+
+    def __init__(self, honeypot, client_ip):
+        self.honeypot = honeypot
+        self.client_ip = client_ip
+        self.parser = TelnetParser()
+        self.output = _OutputBuffer()
+        self.state = self.LOGIN_USER
+        self.line = bytearray()
+        self.skip_lf = False
+        self.username = ''
+        self.login_attempts = 0
+        self.terminal_type = None
+        self.window_size = None
+        self.shell = None
+        # Text shown to the client, without option negotiation, for the recording
+        self.transcript = bytearray()
+        self.recording = honeypot.recorder.open_session('telnet', client_ip)
+
+    @property
+    def closed(self):
+        return self.state == self.CLOSED
+
+    def begin(self):
+        """Initial negotiation, banner and login prompt"""
+        self.output.send(NEGOTIATION)
+        self._prompt_login()
+        response = self._flush()
+        count_bytes(sent=len(response))
+        return response
+
+    def feed(self, data):
+        """Process received bytes and return the batched response"""
+        payload, commands = self.parser.feed(data)
+        self.recording.input(payload)
+        for command in commands:
+            self._handle_command(*command)
+
+        for byte in payload:
+            if self.state == self.CLOSED:
+                break
+            self._handle_byte(byte)
+
+        response = self._flush()
+        count_bytes(received=len(data), sent=len(response))
+        return response
+
+    def close(self):
+        """End the session recording"""
+        self.recording.close()
+
+    def _flush(self):
+        self.recording.output(self.transcript)
+        self.transcript.clear()
+        return self.output.flush()
+
+    def _send(self, data):
+        self.transcript += data.encode('utf-8') if isinstance(data, str) else data
+        self.honeypot._send_data(self.output, data)
+
+    def _handle_command(self, verb, value):
+        """React to option negotiation and capture terminal details"""
+        if verb == WILL and value == OPT_TTYPE:
+            self.output.send(bytes([IAC, SB, OPT_TTYPE, TTYPE_SEND, IAC, SE]))
+        elif verb == SB and value[:2] == bytes([OPT_TTYPE, TTYPE_IS]):
+            terminal_type = value[2:].decode('ascii', errors='ignore')
+            if terminal_type != self.terminal_type:
+                self.terminal_type = terminal_type
+                self.honeypot._log_event('telnet_negotiation', self.client_ip,
+                                         option='TTYPE', terminal_type=terminal_type)
+        elif verb == SB and value[:1] == bytes([OPT_NAWS]) and len(value) >= 5:
+            window_size = ((value[1] << 8) | value[2], (value[3] << 8) | value[4])
+            if window_size != self.window_size:
+                self.window_size = window_size
+                self.recording.resize(*window_size)
+                self.honeypot._log_event('telnet_negotiation', self.client_ip, option='NAWS',
+                                         width=window_size[0], height=window_size[1])
+
+    def _handle_byte(self, byte):
+        """Line discipline for one data byte"""
+        if self.skip_lf:
+            self.skip_lf = False
+            if byte in (0, 10):  # CR LF / CR NUL end a single line
+                return
+
+        if byte in (13, 10):
+            self.skip_lf = byte == 13
+            line = self.line.decode('utf-8', errors='ignore').strip()
+            self.line.clear()
+            self._handle_line(line)
+        elif byte in (127, 8):  # Backspace
+            if self.line:
+                self.line.pop()
+                if self.state != self.LOGIN_PASS:
+                    self._send(b'\b \b')
+        elif byte == 3 and self.state == self.SHELL:  # Ctrl+C
+            self.line.clear()
+            self._send("^C\r\n")
+            self._prompt_shell()
+        elif byte == 4 and self.state == self.SHELL:  # Ctrl+D
+            self._send("logout\r\n")
+            self.state = self.CLOSED
+        elif len(self.line) < self.MAX_LINE:
+            self.line.append(byte)
+            # Passwords are not echoed
+            if self.state != self.LOGIN_PASS:
+                self._send(bytes([byte]))
+
+    def _handle_line(self, line):
+        """Act on a completed input line"""
+        if self.state == self.LOGIN_USER:
+            self.username = line
+            if not line:
+                self._login_failed()
+            else:
+                self._send("\r\nPassword: ")
+                self.state = self.LOGIN_PASS
+        elif self.state == self.LOGIN_PASS:
+            # The configured fake accounts log in to the emulated shell
+            success = self.honeypot.fake_users.get(self.username) == line
+            self.honeypot._log_event('login_attempt', self.client_ip,
+                                     username=self.username, password=line, success=success)
+            if success:
+                self._send("\r\n")
+                self.state = self.SHELL
+                self._prompt_shell()
+            else:
+                self._login_failed()
+        elif self.state == self.SHELL:
+            self._send("\r\n")
+            if line:
+                self.honeypot._log_event('command_executed', self.client_ip, command=line,
+                                         username=self.username,
+                                         signatures=self.honeypot.signatures.match('command', line),
+                                         download_urls=self.honeypot.payloads.record_urls(
+                                             line, 'telnet', self.client_ip))
+                shell = self._shell()
+                cwd = shell.cwd
+                output, still_open = shell.execute(line)
+                self._send(output)
+                if shell.cwd != cwd:
+                    self.honeypot._log_event('directory_change', self.client_ip,
+                                             directory=shell.cwd, username=self.username)
+                if not still_open:
+                    self.state = self.CLOSED
+                    return
+            self._prompt_shell()
+
+    def _login_failed(self):
+        """Reject a login and prompt again until attempts run out"""
+        self.login_attempts += 1
+        self._send("\r\nLogin incorrect\r\n")
+        if self.login_attempts >= self.MAX_LOGIN_ATTEMPTS:
+            self._send("\r\nToo many login failures\r\n")
+            self.state = self.CLOSED
+        else:
+            self._prompt_login()
+
+    def _prompt_login(self):
+        self._send(f"\r\n{self.honeypot.banner}\r\n\r\nlogin: ")
+        self.state = self.LOGIN_USER
+
+    def _shell(self):
+        """Emulated shell for the logged-in user, created on first use"""
+        if self.shell is None:
+            self.shell = ShellSession(self.honeypot.filesystem, self.username,
+                                      self.honeypot.max_overlay_bytes)
+        return self.shell
+
+    def _prompt_shell(self):
+        self._send(self._shell().prompt())
+
+
 class TelnetHoneypot:
     def __init__(self, config, logger):
         self.config = config
         self.logger = logger
         self.host = '0.0.0.0'
         self.port = config['honeypot']['telnet']['port']
+        self.events = get_event_writer('logs/telnet_honeypot.log', config)
         self.banner = config['honeypot']['telnet']['banner']
         self.fake_users = {user['username']: user['password'] 
                           for user in config['honeypot']['telnet']['fake_users']}
+        self.signatures = get_signature_matcher(config)
+        self.filesystem = get_filesystem(config)
+        self.recorder = get_recorder(config)
+        self.payloads = get_payload_store(config)
+        self.max_overlay_bytes = config.get('shell', {}).get('max_overlay_bytes', 1048576)
+        self.tarpit = get_tarpit(config)
+        self.sessions = SessionTracker('telnet', self._log_event)
+        self.admission = AdmissionController('telnet', config, self._log_event, tarpit=self.tarpit)
+        self.pool = ConnectionPool(
+            'Telnet',
+            self.admission.guard(self.sessions.track(self.handle_client)),
+            config['honeypot']['telnet'],
+            reject_message=b'\r\nToo many connections, please try again later.\r\n'
+        )
+        self.server_mode = config['honeypot']['telnet'].get('server_mode', 'threaded')
+        self.session_timeout = config['honeypot']['telnet'].get('session_timeout', 300)
         
     def _log_event(self, event_type, client_ip, **kwargs):
         """Log honeypot events in JSON format"""
@@ -30,14 +345,15 @@ class TelnetHoneypot:
             **kwargs
         }
         
+        # Events of a connection carry its session id
+        stamp_session(log_entry)
+        
         # Log to file
-        log_file = 'logs/telnet_honeypot.log'
-        os.makedirs(os.path.dirname(log_file), exist_ok=True)
-        with open(log_file, 'a') as f:
-            f.write(json.dumps(log_entry) + '\n')
+        self.events.write(log_entry)
         
-        # Log to console
-        self.logger.info(f"Telnet Event: {event_type} from {client_ip}")
+        # Log to console, unless the event pipeline is shedding load
+        if self.events.console:
+            self.logger.info(f"Telnet Event: {event_type} from {client_ip}")
     
     def _send_data(self, client_socket, data):
         """Send data to client"""
@@ -48,273 +364,114 @@ class TelnetHoneypot:
         except Exception:
             pass
     
-    def _negotiate_telnet(self, client_socket):
-        """Handle basic Telnet option negotiation"""
-        # Send basic telnet options
-        # IAC WILL ECHO
-        self._send_data(client_socket, b'\xff\xfb\x01')
-        # IAC WILL SUPPRESS_GO_AHEAD
-        self._send_data(client_socket, b'\xff\xfb\x03')
-        # IAC DO TERMINAL_TYPE
-        self._send_data(client_socket, b'\xff\xfd\x18')
-    
-    def _handle_login(self, client_socket, client_ip):
-        """Handle login process"""
-        username = ''
-        password = ''
-        
-        # Send login prompt
-        self._send_data(client_socket, f"\r\n{self.banner}\r\n\r\nlogin: ")
-        
-        # Get username
-        username_buffer = b''
-        while True:
-            try:
-                data = client_socket.recv(1)
-                if not data:
-                    return False, '', ''
-                
-                # Handle telnet commands
-                if data == b'\xff':
-                    # Skip telnet command sequences
-                    client_socket.recv(2)
-                    continue
-                
-                if data == b'\r' or data == b'\n':
-                    username = username_buffer.decode('utf-8', errors='ignore').strip()
-                    break
-                elif data == b'\x7f' or data == b'\x08':  # Backspace
-                    if username_buffer:
-                        username_buffer = username_buffer[:-1]
-                        self._send_data(client_socket, b'\b \b')
-                else:
-                    username_buffer += data
-                    self._send_data(client_socket, data)
-                    
-            except Exception:
-                return False, '', ''
-        
-        if not username:
-            return False, '', ''
-        
-        # Send password prompt
-        self._send_data(client_socket, "Password: ")
-        
-        # Get password (don't echo)
-        password_buffer = b''
-        while True:
-            try:
-                data = client_socket.recv(1)
-                if not data:
-                    return False, username, ''
-                
-                # Handle telnet commands
-                if data == b'\xff':
-                    # Skip telnet command sequences
-                    client_socket.recv(2)
-                    continue
-                
-                if data == b'\r' or data == b'\n':
-                    password = password_buffer.decode('utf-8', errors='ignore').strip()
-                    break
-                elif data == b'\x7f' or data == b'\x08':  # Backspace
-                    if password_buffer:
-                        password_buffer = password_buffer[:-1]
-                else:
-                    password_buffer += data
-                    
-            except Exception:
-                return False, username, ''
-        
-        # Log login attempt
-        self._log_event('login_attempt', client_ip, username=username, password=password)
-        
-        # Check credentials (always fail for security)
-        return False, username, password
-    
-    def _handle_shell_session(self, client_socket, client_ip, username):
-        """Handle shell session after login"""
-        try:
-            # Send welcome message
-            self._send_data(client_socket, f"\r\nWelcome to {self.banner}\r\n")
-            self._send_data(client_socket, f"Last login: {datetime.now().strftime('%a %b %d %H:%M:%S %Y')} from {client_ip}\r\n")
-            
-            current_dir = "/home/" + username
-            hostname = "honeypot"
-            
-            while True:
-                # Send prompt
-                prompt = f"{username}@{hostname}:{current_dir}$ "
-                self._send_data(client_socket, prompt)
-                
-                # Get command
-                command_buffer = b''
-                while True:
-                    try:
-                        data = client_socket.recv(1)
-                        if not data:
-                            return
-                        
-                        # Handle telnet commands
-                        if data == b'\xff':
-                            # Skip telnet command sequences
-                            try:
-                                client_socket.recv(2)
-                            except:
-                                pass
-                            continue
-                        
-                        if data == b'\r' or data == b'\n':
-                            command = command_buffer.decode('utf-8', errors='ignore').strip()
-                            self._send_data(client_socket, "\r\n")
-                            break
-                        elif data == b'\x03':  # Ctrl+C
-                            self._send_data(client_socket, "^C\r\n")
-                            command_buffer = b''
-                            break
-                        elif data == b'\x04':  # Ctrl+D
-                            self._send_data(client_socket, "logout\r\n")
-                            return
-                        elif data == b'\x7f' or data == b'\x08':  # Backspace
-                            if command_buffer:
-                                command_buffer = command_buffer[:-1]
-                                self._send_data(client_socket, b'\b \b')
-                        else:
-                            command_buffer += data
-                            self._send_data(client_socket, data)
-                            
-                    except Exception:
-                        return
-                
-                if not command:
-                    continue
-                
-                # Log command
-                self._log_event('command_executed', client_ip, command=command, username=username)
-                
-                # Handle commands
-                if not self._execute_command(client_socket, command, client_ip, username):
-                    break
-                    
-        except Exception as e:
-            self._log_event('shell_session_error', client_ip, error=str(e))
-    
-    def _execute_command(self, client_socket, command, client_ip, username):
-        """Execute shell commands"""
-        command_lower = command.lower().strip()
-        
-        if command_lower in ['exit', 'logout', 'quit']:
-            self._send_data(client_socket, "logout\r\n")
-            return False
-        
-        elif command_lower == 'whoami':
-            self._send_data(client_socket, f"{username}\r\n")
-        
-        elif command_lower == 'pwd':
-            self._send_data(client_socket, f"/home/{username}\r\n")
-        
-        elif command_lower.startswith('ls'):
-            self._send_data(client_socket, "Desktop  Documents  Downloads  Pictures  Videos\r\n")
-        
-        elif command_lower == 'id':
-            self._send_data(client_socket, f"uid=1000({username}) gid=1000({username}) groups=1000({username})\r\n")
-        
-        elif command_lower == 'uname -a':
-            self._send_data(client_socket, "Linux honeypot 5.4.0-135-generic #152-Ubuntu SMP Wed Nov 23 20:19:22 UTC 2022 x86_64 x86_64 x86_64 GNU/Linux\r\n")
-        
-        elif command_lower.startswith('cat /etc/passwd'):
-            self._send_data(client_socket, f"root:x:0:0:root:/root:/bin/bash\r\n{username}:x:1000:1000::/home/{username}:/bin/bash\r\n")
-        
-        elif command_lower.startswith('ps'):
-            self._send_data(client_socket, "  PID TTY          TIME CMD\r\n 1234 pts/0    00:00:00 bash\r\n 5678 pts/0    00:00:00 ps\r\n")
-        
-        elif command_lower.startswith('netstat'):
-            self._send_data(client_socket, "Active Internet connections (w/o servers)\r\nProto Recv-Q Send-Q Local Address           Foreign Address         State\r\n")
-        
-        elif command_lower.startswith('ifconfig') or command_lower.startswith('ip addr'):
-            self._send_data(client_socket, "eth0: flags=4163<UP,BROADCAST,RUNNING,MULTICAST>  mtu 1500\r\n        inet 192.168.1.100  netmask 255.255.255.0  broadcast 192.168.1.255\r\n")
-        
-        elif command_lower.startswith('cd'):
-            parts = command.split()
-            if len(parts) > 1:
-                directory = parts[1]
-                self._log_event('directory_change', client_ip, directory=directory, username=username)
-            # Don't actually change directory, just acknowledge
-        
-        elif any(suspicious in command_lower for suspicious in ['wget', 'curl', 'nc', 'nmap', 'ncat']):
-            # Simulate command not found for suspicious commands
-            self._send_data(client_socket, f"{command.split()[0]}: command not found\r\n")
-        
-        elif command_lower.startswith('rm'):
-            self._send_data(client_socket, "rm: cannot remove: Permission denied\r\n")
-        
-        elif command_lower.startswith('sudo'):
-            self._send_data(client_socket, f"{username} is not in the sudoers file. This incident will be reported.\r\n")
-        
-        elif command_lower.startswith('history'):
-            self._send_data(client_socket, "    1  ls\r\n    2  pwd\r\n    3  whoami\r\n")
-        
-        elif command_lower.startswith('env') or command_lower.startswith('printenv'):
-            self._send_data(client_socket, f"HOME=/home/{username}\r\nUSER={username}\r\nPATH=/usr/local/bin:/usr/bin:/bin\r\n")
-        
-        else:
-            # For unknown commands, simulate command not found
-            cmd_name = command.split()[0] if command.split() else command
-            self._send_data(client_socket, f"{cmd_name}: command not found\r\n")
-        
-        return True
-    
     def handle_client(self, client_socket, client_address):
         """Handle individual Telnet client connections"""
         client_ip = client_address[0]
         client_port = client_address[1]
         
+        session = None
         try:
             self._log_event('connection_attempt', client_ip, source_port=client_port)
             
-            client_socket.settimeout(300)  # 5 minute timeout
-            
-            # Handle telnet negotiation
-            self._negotiate_telnet(client_socket)
+            client_socket.settimeout(self.session_timeout)
             
-            # Handle login
-            login_success, username, password = self._handle_login(client_socket, client_ip)
+            session = TelnetSession(self, client_ip)
+            client_socket.sendall(session.begin())
             
-            if login_success:
-                # This should never happen as we always fail login for security
-                self._handle_shell_session(client_socket, client_ip, username)
-            else:
-                # Send login failed message
-                self._send_data(client_socket, "\r\nLogin incorrect\r\n")
-                
-                # Allow a few more attempts
-                for attempt in range(2):
-                    login_success, username, password = self._handle_login(client_socket, client_ip)
-                    if not login_success:
-                        self._send_data(client_socket, "\r\nLogin incorrect\r\n")
-                    else:
-                        break
+            while not session.closed:
+                data = client_socket.recv(4096)
+                if not data:
+                    break
                 
-                if not login_success:
-                    self._send_data(client_socket, "\r\nToo many login failures\r\n")
+                response = session.feed(data)
+                if response:
+                    client_socket.sendall(response)
                     
+        except socket.timeout:
+            pass
         except Exception as e:
             self._log_event('connection_error', client_ip, error=str(e))
         finally:
+            if session is not None:
+                session.close()
             try:
                 client_socket.close()
             except:
                 pass
     
+    async def handle_client_async(self, reader, writer):
+        """Handle a Telnet client connection on the event loop"""
+        client_ip, client_port = writer.get_extra_info('peername')[:2]
+        session = None
+        
+        try:
+            self._log_event('connection_attempt', client_ip, source_port=client_port)
+            
+            session = TelnetSession(self, client_ip)
+            writer.write(session.begin())
+            
+            while not session.closed:
+                data = await asyncio.wait_for(reader.read(4096), self.session_timeout)
+                if not data:
+                    break
+                
+                response = session.feed(data)
+                if response:
+                    writer.write(response)
+                    await writer.drain()
+                    
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        except Exception as e:
+            self._log_event('connection_error', client_ip, error=str(e))
+        finally:
+            if session is not None:
+                session.close()
+            writer.close()
+    
+    async def _serve_async(self):
+        """Run the asyncio Telnet server until cancelled"""
+        server = await asyncio.start_server(
+            self.admission.guard_async(self.sessions.track_async(self.handle_client_async)),
+            self.host,
+            self.port,
+            backlog=1024,
+            reuse_address=True,
+            reuse_port=reuse_port()
+        )
+        
+        self.logger.info(f"Telnet Honeypot (asyncio) started on {self.host}:{self.port}")
+        self._log_event('honeypot_started', '0.0.0.0', server_mode='asyncio')
+        
+        async with server:
+            await server.serve_forever()
+    
+    def _start_asyncio(self):
+        """Start the Telnet honeypot as a single-threaded asyncio server"""
+        try:
+            asyncio.run(self._serve_async())
+        except KeyboardInterrupt:
+            pass
+        except Exception as e:
+            self.logger.error(f"Failed to start Telnet honeypot: {e}")
+        finally:
+            self._log_event('honeypot_stopped', '0.0.0.0')
+    
     def start(self):
         """Start the Telnet honeypot server"""
+        if self.server_mode == 'asyncio':
+            return self._start_asyncio()
+        
         server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if reuse_port():
+            server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
         
         try:
             server_socket.bind((self.host, self.port))
             server_socket.listen(50)
             
+            self.pool.start()
             self.logger.info(f"Telnet Honeypot started on {self.host}:{self.port}")
             self._log_event('honeypot_started', '0.0.0.0')
             
@@ -322,12 +479,12 @@ class TelnetHoneypot:
                 try:
                     client_socket, client_address = server_socket.accept()
                     
-                    client_thread = threading.Thread(
-                        target=self.handle_client,
-                        args=(client_socket, client_address)
-                    )
-                    client_thread.daemon = True
-                    client_thread.start()
+                    if not self.admission.admit(client_address[0]):
+                        self.admission.refuse(client_socket, client_address[0])
+                        continue
+                    
+                    if not self.pool.submit(client_socket, client_address):
+                        self.admission.release(client_address[0])
                     
                 except KeyboardInterrupt:
                     break
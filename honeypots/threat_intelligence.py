@@ -6,10 +6,18 @@ import time
 import logging
 import threading
 import os
+import sys
 from datetime import datetime, timedelta
 import geoip2.database
 import geoip2.errors
 
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from honeypots.signatures import get_signature_matcher
+from honeypots.campaigns import CampaignClusterer
+from honeypots.credential_stats import CredentialStats, CredentialSprayDetector
+
 class ThreatIntelligence:
     def __init__(self, config):
         self.config = config
@@ -212,9 +220,13 @@ class ThreatIntelligence:
 
 
 class AttackAnalyzer:
-    def __init__(self, threat_intel):
+    def __init__(self, threat_intel, signatures=None):
         self.threat_intel = threat_intel
         self.logger = logging.getLogger('AttackAnalyzer')
+        self.signatures = signatures or get_signature_matcher(threat_intel.config)
+        self.campaigns = CampaignClusterer(threat_intel.config)
+        self.credential_stats = CredentialStats(threat_intel.config)
+        self.spray_detector = CredentialSprayDetector(threat_intel.config)
         self.attack_patterns = {}
         self.ip_activity = {}
     
@@ -224,7 +236,8 @@ class AttackAnalyzer:
         service = log_entry.get('service')
         event_type = log_entry.get('event_type')
         
-        if not source_ip:
+        # Session summaries restate events that were analyzed one by one
+        if not source_ip or event_type == 'session_end':
             return None
         
         # Get IP intelligence
@@ -244,7 +257,22 @@ class AttackAnalyzer:
         activity['last_seen'] = log_entry.get('timestamp')
         activity['services_targeted'].add(service)
         activity['attack_types'].add(event_type)
-        activity['total_attempts'] += 1
+        # Coalesced records stand for count identical events
+        activity['total_attempts'] += log_entry.get('count', 1)
+        
+        # Feed campaign clustering and credential statistics
+        self.campaigns.add_event(log_entry)
+        self.credential_stats.add_event(log_entry)
+        
+        # Distinct sources trying the same credential pair (spraying)
+        spray_sources = 0
+        if event_type == 'login_attempt' and 'password' in log_entry:
+            spray_sources = self.spray_detector.add(
+                log_entry.get('username', ''),
+                log_entry.get('password', ''),
+                source_ip,
+                log_entry.get('timestamp')
+            )
         
         # Analyze attack pattern
         attack_analysis = {
@@ -253,13 +281,16 @@ class AttackAnalyzer:
             'service': service,
             'event_type': event_type,
             'ip_intelligence': ip_analysis,
-            'attack_pattern': self._classify_attack_pattern(log_entry, activity),
-            'severity': self._calculate_severity(log_entry, activity, ip_analysis)
+            'attack_pattern': self._classify_attack_pattern(log_entry, activity, spray_sources),
+            'severity': self._calculate_severity(log_entry, activity, ip_analysis, spray_sources)
         }
         
+        if spray_sources:
+            attack_analysis['credential_spray_sources'] = spray_sources
+        
         return attack_analysis
     
-    def _classify_attack_pattern(self, log_entry, activity):
+    def _classify_attack_pattern(self, log_entry, activity, spray_sources=0):
         """Classify attack pattern"""
         service = log_entry.get('service')
         event_type = log_entry.get('event_type')
@@ -270,29 +301,42 @@ class AttackAnalyzer:
         if event_type == 'login_attempt' and activity['total_attempts'] > 5:
             patterns.append('brute_force')
         
+        # Credential spraying: the same pair tried from many distinct sources
+        if self.spray_detector.is_spraying(spray_sources):
+            patterns.append('credential_spraying')
+        
         # Multi-service scanning
         if len(activity['services_targeted']) > 2:
             patterns.append('multi_service_scan')
         
         # Reconnaissance
-        if any(attack_type in ['command_executed', 'file_access_attempt'] 
-               for attack_type in activity['attack_types']):
+        if (any(attack_type in ['command_executed', 'file_access_attempt'] 
+                for attack_type in activity['attack_types'])
+                or 'file_access' in log_entry.get('categories', [])):
             patterns.append('reconnaissance')
         
         # Automated scanning
-        user_agent = log_entry.get('user_agent', '').lower()
-        if any(tool in user_agent for tool in ['nmap', 'masscan', 'nikto']):
+        if 'scanner' in self.signatures.match('user_agent', log_entry.get('user_agent', '')):
             patterns.append('automated_scan')
         
+        # Suspicious or destructive shell commands
+        command = log_entry.get('command')
+        if command:
+            patterns.extend(self.signatures.match('command', command))
+        
         return patterns if patterns else ['unknown']
     
-    def _calculate_severity(self, log_entry, activity, ip_analysis):
+    def _calculate_severity(self, log_entry, activity, ip_analysis, spray_sources=0):
         """Calculate attack severity"""
         severity_score = 0
         
         # Base score from IP intelligence
         severity_score += ip_analysis.get('risk_score', 0)
         
+        # Coordinated spraying is scored even when each IP only tries once
+        if self.spray_detector.is_spraying(spray_sources):
+            severity_score += 25
+        
         # Activity-based scoring
         if activity['total_attempts'] > 10:
             severity_score += 20
@@ -308,6 +352,12 @@ class AttackAnalyzer:
             severity_score += 25
         elif event_type in ['sql_injection_attempt', 'xss_attempt']:
             severity_score += 30
+        elif event_type == 'attack_detected':
+            # Full-request inspection reports every matched category at once
+            if {'sql_injection', 'xss'} & set(log_entry.get('categories', [])):
+                severity_score += 30
+            else:
+                severity_score += 20
         
         # Convert to severity level
         if severity_score >= 80:
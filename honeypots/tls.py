@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+
+import os
+import ssl
+import time
+import asyncio
+import socket
+import hashlib
+import logging
+import datetime
+import threading
+from collections import OrderedDict
+
+from cryptography import x509
+from cryptography.x509.oid import NameOID
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+# TLS record header (5 bytes) plus handshake header (4 bytes)
+HELLO_HEADER = 9
+MAX_RECORD = 16384 + 5
+
+EXT_SERVER_NAME = 0
+EXT_SUPPORTED_GROUPS = 10
+EXT_EC_POINT_FORMATS = 11
+EXT_ALPN = 16
+
+MINIMUM_VERSIONS = {
+    'TLSv1': ssl.TLSVersion.TLSv1,
+    'TLSv1_1': ssl.TLSVersion.TLSv1_1,
+    'TLSv1_2': ssl.TLSVersion.TLSv1_2,
+    'TLSv1_3': ssl.TLSVersion.TLSv1_3
+}
+
+
+def client_hello_size(data):
+    """Bytes needed for the ClientHello record that starts data.
+
+    Returns 0 when data does not start with a TLS handshake record.
+    """
+    if len(data) < 5:
+        return 5 if not data or data[0] == 0x16 else 0
+    if data[0] != 0x16:
+        return 0
+    return min(5 + int.from_bytes(data[3:5], 'big'), MAX_RECORD)
+
+
+def peek_client_hello(client_socket, timeout):
+    """The ClientHello record, read without consuming it, or b'' if there is none.
+
+    The bytes stay queued for the TLS handshake that follows.
+    """
+    deadline = time.monotonic() + timeout
+    needed = 5
+    while True:
+        data = client_socket.recv(needed, socket.MSG_PEEK)
+        if not data:
+            return b''
+        needed = client_hello_size(data)
+        if not needed:
+            return b''
+        if len(data) >= needed:
+            return data
+        # Part of the hello is still in flight
+        if time.monotonic() >= deadline:
+            return b''
+        time.sleep(0.01)
+
+
+async def peek_client_hello_async(client_socket, timeout):
+    """peek_client_hello for a non-blocking socket on the running event loop"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    needed = 5
+    while True:
+        try:
+            data = client_socket.recv(needed, socket.MSG_PEEK)
+        except BlockingIOError:
+            # Nothing received yet: wait until the socket is readable
+            readable = loop.create_future()
+            loop.add_reader(client_socket, lambda: readable.done() or readable.set_result(None))
+            try:
+                await asyncio.wait_for(readable, max(0.0, deadline - loop.time()))
+            except asyncio.TimeoutError:
+                return b''
+            finally:
+                loop.remove_reader(client_socket)
+            continue
+        if not data:
+            return b''
+        needed = client_hello_size(data)
+        if not needed:
+            return b''
+        if len(data) >= needed:
+            return data
+        if loop.time() >= deadline:
+            return b''
+        await asyncio.sleep(0.01)
+
+
+def _is_grease(value):
+    # RFC 8701 reserved values (0x0a0a, 0x1a1a, ...) vary per connection
+    return value & 0x0f0f == 0x0a0a and value >> 8 == value & 0xff
+
+
+def _uint16s(data):
+    return [int.from_bytes(data[i:i + 2], 'big') for i in range(0, len(data) - 1, 2)]
+
+
+def _split_client_hello(data):
+    """Raw fields of a ClientHello record; raises ValueError if it is malformed"""
+    if client_hello_size(data) != len(data) or len(data) < HELLO_HEADER + 38 or data[5] != 1:
+        raise ValueError("not a complete ClientHello")
+    body = data[HELLO_HEADER:HELLO_HEADER + int.from_bytes(data[6:9], 'big')]
+
+    version = body[0:2]
+    pos = 34  # version and random
+    pos += 1 + body[pos]  # session id
+    cipher_length = int.from_bytes(body[pos:pos + 2], 'big')
+    ciphers = body[pos + 2:pos + 2 + cipher_length]
+    pos += 2 + cipher_length
+    pos += 1 + body[pos]  # compression methods
+
+    extensions = []
+    if pos + 2 <= len(body):
+        end = min(len(body), pos + 2 + int.from_bytes(body[pos:pos + 2], 'big'))
+        pos += 2
+        while pos + 4 <= end:
+            ext_type = body[pos:pos + 2]
+            length = int.from_bytes(body[pos + 2:pos + 4], 'big')
+            extensions.append((ext_type, body[pos + 4:pos + 4 + length]))
+            pos += 4 + length
+    if pos > len(body):
+        raise ValueError("truncated ClientHello")
+    return version, ciphers, extensions
+
+
+def _server_name(data):
+    # server_name_list: length(2), name_type(1), name length(2), name
+    if len(data) < 5 or data[2] != 0:
+        return None
+    return data[5:5 + int.from_bytes(data[3:5], 'big')].decode('ascii', errors='replace')
+
+
+def _alpn(data):
+    protocols = []
+    pos = 2
+    while pos < len(data):
+        length = data[pos]
+        protocols.append(data[pos + 1:pos + 1 + length].decode('ascii', errors='replace'))
+        pos += 1 + length
+    return protocols
+
+
+class ClientHelloCache:
+    """JA3 fingerprints of ClientHellos, computed once per distinct hello.
+
+    Hellos from the same client differ in their random, session id and
+    key shares, so the cache is keyed on the raw bytes JA3 is built from
+    (version, cipher suites, extension types, groups, point formats).
+    Building the JA3 string and hashing it only happens on a miss.
+    """
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def fingerprint(self, data):
+        """JA3 string and hash plus SNI and ALPN of a ClientHello record, or None"""
+        try:
+            version, ciphers, extensions = _split_client_hello(data)
+        except (ValueError, IndexError):
+            return None
+
+        ext_data = {int.from_bytes(ext_type, 'big'): value for ext_type, value in extensions}
+        key = (
+            version,
+            ciphers,
+            b''.join(ext_type for ext_type, _ in extensions),
+            ext_data.get(EXT_SUPPORTED_GROUPS, b''),
+            ext_data.get(EXT_EC_POINT_FORMATS, b'')
+        )
+
+        with self.lock:
+            ja3 = self.entries.get(key)
+            if ja3 is not None:
+                self.hits += 1
+                self.entries.move_to_end(key)
+        if ja3 is None:
+            ja3 = self._ja3(key)
+            with self.lock:
+                self.misses += 1
+                self.entries[key] = ja3
+                if len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+
+        fingerprint = dict(ja3)
+        if EXT_SERVER_NAME in ext_data:
+            fingerprint['sni'] = _server_name(ext_data[EXT_SERVER_NAME])
+        if EXT_ALPN in ext_data:
+            fingerprint['alpn'] = _alpn(ext_data[EXT_ALPN])
+        return fingerprint
+
+    @staticmethod
+    def _ja3(key):
+        version, ciphers, ext_types, groups, point_formats = key
+
+        def field(values):
+            return '-'.join(str(value) for value in values if not _is_grease(value))
+
+        ja3 = ','.join((
+            str(int.from_bytes(version, 'big')),
+            field(_uint16s(ciphers)),
+            field(_uint16s(ext_types)),
+            field(_uint16s(groups[2:])),
+            '-'.join(str(value) for value in point_formats[1:])
+        ))
+        return {'ja3': ja3, 'ja3_hash': hashlib.md5(ja3.encode('ascii')).hexdigest()}
+
+    def stats(self):
+        with self.lock:
+            return {'fingerprints': len(self.entries), 'hits': self.hits, 'misses': self.misses}
+
+
+def _create_certificate(cert_file, key_file, common_name, days):
+    """Generate a self-signed certificate, like a distribution's snakeoil cert"""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, common_name)])
+    now = datetime.datetime.utcnow()
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(private_key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=days))
+        .add_extension(x509.SubjectAlternativeName([x509.DNSName(common_name)]), critical=False)
+        .sign(private_key, hashes.SHA256())
+    )
+
+    os.makedirs(os.path.dirname(key_file) or '.', mode=0o700, exist_ok=True)
+    os.makedirs(os.path.dirname(cert_file) or '.', exist_ok=True)
+    fd = os.open(key_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.TraditionalOpenSSL,
+            encryption_algorithm=serialization.NoEncryption()
+        ))
+    with open(cert_file, 'wb') as f:
+        f.write(certificate.public_bytes(serialization.Encoding.PEM))
+
+
+class TLSServer:
+    """Server-side TLS for a honeypot listener.
+
+    One SSLContext is shared by every connection, so OpenSSL's session
+    cache and session ticket keys are too: repeat scanners resume their
+    session instead of paying for a full handshake. ClientHellos are
+    fingerprinted through a ClientHelloCache.
+    """
+
+    def __init__(self, tls_config):
+        self.logger = logging.getLogger('TLS')
+        cert_file = tls_config.get('cert_file', 'config/tls/server.crt')
+        key_file = tls_config.get('key_file', 'config/tls/server.key')
+        if not os.path.exists(cert_file) and not os.path.exists(key_file):
+            _create_certificate(cert_file, key_file, tls_config.get('common_name', 'ubuntu'),
+                                tls_config.get('certificate_days', 3650))
+            self.logger.info(f"Generated self-signed certificate {cert_file}")
+
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        # Old scanners are worth talking to, so accept legacy versions and ciphers
+        context.minimum_version = MINIMUM_VERSIONS[tls_config.get('minimum_version', 'TLSv1')]
+        context.set_ciphers(tls_config.get('ciphers', 'DEFAULT:@SECLEVEL=0'))
+        context.load_cert_chain(cert_file, key_file)
+        context.set_alpn_protocols(['http/1.1'])
+        tickets = tls_config.get('session_tickets', 2)
+        context.num_tickets = tickets
+        if not tickets:
+            context.options |= ssl.OP_NO_TICKET
+        self.context = context
+        self.client_hellos = ClientHelloCache(tls_config.get('fingerprint_cache_size', 10000))
+
+    def describe(self, ssl_object):
+        """Negotiated parameters of a completed handshake, for the event log"""
+        cipher = ssl_object.cipher()
+        return {
+            'tls_version': ssl_object.version(),
+            'cipher': cipher[0] if cipher else None,
+            'resumed': ssl_object.session_reused
+        }
+
+    def stats(self):
+        """Session cache counters and fingerprint cache usage"""
+        sessions = self.context.session_stats()
+        return {
+            'handshakes': sessions['accept_good'],
+            'resumed': sessions['hits'],
+            'session_cache_misses': sessions['misses'],
+            'session_cache_size': sessions['number'],
+            **self.client_hellos.stats()
+        }
+
+
+_tls_servers = {}
+_tls_servers_lock = threading.Lock()
+
+
+def get_tls_server(tls_config):
+    """Get the process-wide TLS server for a certificate, generating it once if missing"""
+    cache_key = (
+        os.path.abspath(tls_config.get('cert_file', 'config/tls/server.crt')),
+        os.path.abspath(tls_config.get('key_file', 'config/tls/server.key'))
+    )
+    with _tls_servers_lock:
+        server = _tls_servers.get(cache_key)
+        if server is None:
+            server = _tls_servers[cache_key] = TLSServer(tls_config)
+        return server
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+
+import time
+import queue
+import logging
+import threading
+from collections import deque
+
+OVERLOAD_POLICIES = ('reject', 'tarpit')
+
+
+class ConnectionPool:
+    """Bounded worker pool for accepted client sockets.
+
+    A fixed number of worker threads serve connections from a bounded
+    queue. When both are full the overload policy decides what happens to
+    new connections: 'reject' sends a protocol-appropriate refusal and
+    closes the socket, 'tarpit' holds the socket silently for a while
+    (up to tarpit_limit sockets, beyond which it falls back to reject).
+    """
+
+    def __init__(self, name, handler, config=None, reject_message=b''):
+        pool_config = config or {}
+        self.name = name
+        self.handler = handler
+        self.reject_message = reject_message
+        self.max_workers = pool_config.get('max_workers', 100)
+        self.queue_limit = pool_config.get('queue_limit', 200)
+        self.overload_policy = pool_config.get('overload_policy', 'reject')
+        self.tarpit_seconds = pool_config.get('tarpit_seconds', 30)
+        self.tarpit_limit = pool_config.get('tarpit_limit', 1000)
+        if self.overload_policy not in OVERLOAD_POLICIES:
+            raise ValueError(f"Unknown overload policy: {self.overload_policy}")
+
+        self.logger = logging.getLogger(f'{name}_Pool')
+        self.queue = queue.Queue(maxsize=self.queue_limit)
+        self.tarpit = deque()
+        self.tarpit_ready = threading.Condition()
+        self.lock = threading.Lock()
+        self.active = 0
+        self.accepted = 0
+        self.rejected = 0
+        self.tarpitted = 0
+        self.started = False
+
+    def start(self):
+        """Start the worker threads (and the tarpit reaper if used)"""
+        if self.started:
+            return
+        self.started = True
+        for index in range(self.max_workers):
+            worker = threading.Thread(target=self._worker, name=f'{self.name}_Worker_{index}')
+            worker.daemon = True
+            worker.start()
+        if self.overload_policy == 'tarpit':
+            reaper = threading.Thread(target=self._reap_tarpit, name=f'{self.name}_Tarpit')
+            reaper.daemon = True
+            reaper.start()
+
+    def submit(self, client_socket, client_address):
+        """Queue an accepted connection, applying the overload policy when full"""
+        try:
+            self.queue.put_nowait((client_socket, client_address))
+        except queue.Full:
+            self._overload(client_socket)
+            return False
+
+        with self.lock:
+            self.accepted += 1
+        return True
+
+    def _worker(self):
+        """Serve queued connections one at a time"""
+        while True:
+            client_socket, client_address = self.queue.get()
+            with self.lock:
+                self.active += 1
+            try:
+                self.handler(client_socket, client_address)
+            except Exception as e:
+                self.logger.error(f"Unhandled error serving {client_address[0]}: {e}")
+            finally:
+                with self.lock:
+                    self.active -= 1
+
+    def _overload(self, client_socket):
+        """Apply the overload policy to a connection that cannot be queued"""
+        if self.overload_policy == 'tarpit':
+            with self.tarpit_ready:
+                if len(self.tarpit) < self.tarpit_limit:
+                    self.tarpit.append((time.monotonic() + self.tarpit_seconds, client_socket))
+                    self.tarpit_ready.notify()
+                    with self.lock:
+                        self.tarpitted += 1
+                    return
+
+        with self.lock:
+            self.rejected += 1
+        try:
+            if self.reject_message:
+                client_socket.settimeout(1)
+                client_socket.sendall(self.reject_message)
+        except OSError:
+            pass
+        finally:
+            client_socket.close()
+
+    def _reap_tarpit(self):
+        """Close tarpitted sockets once they have been held long enough"""
+        while True:
+            with self.tarpit_ready:
+                while not self.tarpit:
+                    self.tarpit_ready.wait()
+                # Every socket is held for the same time, so deadlines are FIFO
+                deadline, client_socket = self.tarpit[0]
+                delay = deadline - time.monotonic()
+                if delay > 0:
+                    self.tarpit_ready.wait(delay)
+                    continue
+                self.tarpit.popleft()
+            try:
+                client_socket.close()
+            except OSError:
+                pass
+
+    def stats(self):
+        """Current gauges and counters of the pool"""
+        with self.lock:
+            return {
+                'max_workers': self.max_workers,
+                'active': self.active,
+                'queued': self.queue.qsize(),
+                'queue_limit': self.queue_limit,
+                'tarpitted_now': len(self.tarpit),
+                'accepted': self.accepted,
+                'rejected': self.rejected,
+                'tarpitted': self.tarpitted,
+                'overload_policy': self.overload_policy
+            }
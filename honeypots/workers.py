@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import time
+import queue
+import signal
+import logging
+import threading
+import multiprocessing
+
+# (index, count) inside a worker process, None in the orchestrator
+_worker = None
+_worker_tag = None
+
+# How merge_stats() combines a stat across workers. Counters and
+# per-process totals add up; latency and queue-depth gauges take the
+# worst worker. Anything else (limits, modes) is the same in every
+# worker and taken from the first.
+SUMMED_STATS = frozenset((
+    'accepted', 'rejected', 'tarpitted', 'active', 'tarpitted_now',
+    'tracked_ips', 'dropped_in_window',
+    'written', 'dropped_pending',
+    'handshakes', 'resumed', 'session_cache_misses', 'session_cache_size',
+    'fingerprints', 'hits', 'misses', 'failed', 'cpu_ms'
+))
+MAX_STATS = frozenset(('queued', 'write_latency_ms', 'avg_ms', 'max_ms', 'cpu_fraction'))
+
+
+def current_worker():
+    """Index and count of this worker process, or None when single-process"""
+    return _worker
+
+
+def worker_tag():
+    """Stable name of this worker process (e.g. "http-0"), or None"""
+    return _worker_tag
+
+
+def reuse_port():
+    """Whether listeners must bind with SO_REUSEPORT to share their port"""
+    return _worker is not None
+
+
+def worker_range(first, last):
+    """This worker's share of an inclusive range, e.g. FTP passive ports"""
+    if _worker is None:
+        return first, last
+    index, count = _worker
+    size = (last - first + 1) // count
+    if size < 1:
+        return first, last
+    start = first + index * size
+    end = last if index == count - 1 else start + size - 1
+    return start, end
+
+
+def honeypot_stats(honeypot):
+    """Pool, admission, handshake and event pipeline stats of a running honeypot"""
+    stats = {}
+    if hasattr(honeypot, 'pool'):
+        stats['connections'] = honeypot.pool.stats()
+    if hasattr(honeypot, 'admission'):
+        stats['admission'] = honeypot.admission.stats()
+    if hasattr(honeypot, 'handshake'):
+        stats['handshake'] = honeypot.handshake.stats()
+    if getattr(honeypot, 'tls', None) is not None:
+        stats['tls'] = honeypot.tls.stats()
+    if hasattr(honeypot, 'events'):
+        stats['events'] = honeypot.events.stats()
+    return stats
+
+
+def merge_stats(reports):
+    """Combine workers' stats: SUMMED_STATS add up, MAX_STATS take the largest, others come from the first"""
+    merged = {}
+    for report in reports:
+        for key, value in report.items():
+            if key not in merged:
+                merged[key] = merge_stats([value]) if isinstance(value, dict) else value
+            elif isinstance(value, dict):
+                merged[key] = merge_stats([merged[key], value])
+            elif key in SUMMED_STATS:
+                merged[key] += value
+            elif key in MAX_STATS:
+                merged[key] = max(merged[key], value)
+    return merged
+
+
+def _run_worker(name, honeypot_class, config, index, count, reports, report_interval):
+    """Entry point of a forked worker process"""
+    global _worker, _worker_tag
+    _worker = (index, count)
+    _worker_tag = f'{name.lower()}-{index}'
+
+    # The orchestrator handles Ctrl+C and stops workers with SIGTERM
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    honeypot = honeypot_class(config, logging.getLogger(f'{name}_Honeypot_{index}'))
+
+    def report():
+        while True:
+            try:
+                reports.put_nowait((index, os.getpid(), honeypot_stats(honeypot)))
+            except queue.Full:
+                pass
+            time.sleep(report_interval)
+
+    reporter = threading.Thread(target=report, name=f'{name}_Reporter')
+    reporter.daemon = True
+    reporter.start()
+    try:
+        honeypot.start()
+    finally:
+        # Imported here: these modules themselves ask which worker they run in
+        from honeypots.payloads import get_payload_store
+        from honeypots.events import flush_event_writers
+        if hasattr(honeypot, 'admission'):
+            honeypot.admission.flush()
+        get_payload_store(config).flush()
+        flush_event_writers()
+
+
+class WorkerGroup:
+    """Worker processes serving one honeypot service on a shared port.
+
+    Each worker builds its own honeypot and binds the service port with
+    SO_REUSEPORT, so the kernel spreads new connections across processes
+    (and cores). Workers report their stats over a queue every
+    report_interval seconds; status() returns them merged.
+    """
+
+    def __init__(self, name, honeypot_class, config, processes, report_interval=5):
+        self.name = name
+        self.honeypot_class = honeypot_class
+        self.config = config
+        self.processes = processes
+        self.report_interval = report_interval
+        self.context = multiprocessing.get_context('fork')
+        self.reports = self.context.Queue(maxsize=processes * 16)
+        self.workers = {}
+        self.latest = {}
+        self.restarts = 0
+        self.logger = logging.getLogger(f'{name}_Workers')
+
+    def start(self):
+        for index in range(self.processes):
+            self._spawn(index)
+
+    def _spawn(self, index):
+        process = self.context.Process(
+            target=_run_worker,
+            args=(self.name, self.honeypot_class, self.config, index, self.processes,
+                  self.reports, self.report_interval),
+            name=f'{self.name}_Worker_{index}'
+        )
+        process.daemon = True
+        process.start()
+        self.workers[index] = process
+        self.logger.info(f"Started {self.name} worker {index} (pid {process.pid})")
+
+    def check(self):
+        """Restart workers that have exited; returns how many were restarted"""
+        restarted = 0
+        for index, process in list(self.workers.items()):
+            if not process.is_alive():
+                self.logger.warning(f"{self.name} worker {index} exited ({process.exitcode}), restarting...")
+                self.latest.pop(index, None)
+                self._spawn(index)
+                restarted += 1
+        self.restarts += restarted
+        return restarted
+
+    def is_alive(self):
+        return any(process.is_alive() for process in self.workers.values())
+
+    def collect(self):
+        """Drain pending stats reports from the workers"""
+        while True:
+            try:
+                index, pid, stats = self.reports.get_nowait()
+            except queue.Empty:
+                return
+            self.latest[index] = {'pid': pid, 'reported': time.time(), **stats}
+
+    def stop(self, timeout=5):
+        for process in self.workers.values():
+            if process.is_alive():
+                process.terminate()
+        for process in self.workers.values():
+            process.join(timeout)
+
+    def status(self):
+        """Merged stats of all workers plus a per-worker breakdown"""
+        self.collect()
+        workers = []
+        for index, process in sorted(self.workers.items()):
+            report = self.latest.get(index, {})
+            workers.append({
+                'index': index,
+                'pid': process.pid,
+                'alive': process.is_alive(),
+                **{key: value for key, value in report.items() if key != 'pid'}
+            })
+
+        reports = [self.latest[index] for index in sorted(self.latest)]
+        status = {
+            'running': self.is_alive(),
+            'processes': self.processes,
+            'restarts': self.restarts,
+            'workers': workers
+        }
+        for section in ('connections', 'admission', 'tls', 'events'):
+            sections = [report[section] for report in reports if section in report]
+            if sections:
+                status[section] = merge_stats(sections)
+        return status
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import time
+import yaml
+import socket
+import asyncio
+import logging
+import argparse
+import resource
+import tempfile
+import multiprocessing
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from honeypots.http_honeypot import HTTPHoneypot
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def raise_fd_limit():
+    """Allow as many open sockets as the hard limit permits"""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    return hard
+
+
+def free_port():
+    """Find an unused local TCP port"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def run_server(mode, port, request_timeout):
+    """Run an HTTP honeypot in this (child) process"""
+    raise_fd_limit()
+    with open(os.path.join(ROOT_DIR, 'config', 'honeypot_config.yaml'), 'r') as f:
+        config = yaml.safe_load(f)
+
+    config['honeypot']['http'].update({
+        'port': port,
+        'server_mode': mode,
+        'request_timeout': request_timeout
+    })
+    config.setdefault('admission', {})['allowlist'] = ['127.0.0.1']
+    config.setdefault('signatures', {})['rules_file'] = os.path.join(ROOT_DIR, 'config', 'signatures.yaml')
+
+    # Keep event logs out of the working tree
+    os.chdir(tempfile.mkdtemp(prefix='honeypot-bench-'))
+    logging.basicConfig(level=logging.WARNING)
+
+    honeypot = HTTPHoneypot(config, logging.getLogger('HTTP_Benchmark'))
+    honeypot.host = '127.0.0.1'
+    honeypot.start()
+
+
+def process_stats(pid):
+    """Resident memory (KB) and thread count of a process"""
+    stats = {}
+    with open(f'/proc/{pid}/status', 'r') as f:
+        for line in f:
+            key, _, value = line.partition(':')
+            if key == 'VmRSS':
+                stats['rss_kb'] = int(value.split()[0])
+            elif key == 'Threads':
+                stats['threads'] = int(value.strip())
+    return stats
+
+
+async def wait_for_port(port, timeout=10):
+    """Wait until the server accepts connections"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError(f"Server did not start on port {port}")
+
+
+async def request_once(port, semaphore, failures):
+    """Send one request and read the full response"""
+    async with semaphore:
+        try:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(b'GET / HTTP/1.1\r\nHost: bench\r\nUser-Agent: bench\r\nConnection: close\r\n\r\n')
+            await writer.drain()
+            await reader.read()
+            writer.close()
+        except OSError:
+            failures.append(1)
+
+
+async def measure_throughput(port, connections, concurrency):
+    """Connections per second for short request/response exchanges"""
+    semaphore = asyncio.Semaphore(concurrency)
+    failures = []
+    started = time.perf_counter()
+    await asyncio.gather(*(request_once(port, semaphore, failures) for _ in range(connections)))
+    elapsed = time.perf_counter() - started
+    return (connections - len(failures)) / elapsed, len(failures)
+
+
+async def pipeline_once(port, semaphore, depth, failures):
+    """Send depth pipelined requests on one connection; returns responses read"""
+    request = b'GET / HTTP/1.1\r\nHost: bench\r\nUser-Agent: bench\r\n\r\n'
+    last = b'GET / HTTP/1.1\r\nHost: bench\r\nUser-Agent: bench\r\nConnection: close\r\n\r\n'
+    async with semaphore:
+        try:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(request * (depth - 1) + last)
+            await writer.drain()
+            data = await reader.read(-1)
+            writer.close()
+            return data.count(b'HTTP/1.1 ')
+        except OSError:
+            failures.append(1)
+            return 0
+
+
+async def measure_keepalive(port, connections, concurrency, depth):
+    """Requests per second when clients pipeline requests on kept-alive connections"""
+    semaphore = asyncio.Semaphore(concurrency)
+    failures = []
+    started = time.perf_counter()
+    served = await asyncio.gather(*(pipeline_once(port, semaphore, depth, failures) for _ in range(connections)))
+    elapsed = time.perf_counter() - started
+    return sum(served) / elapsed
+
+
+async def measure_idle_memory(port, pid, idle_connections):
+    """Memory held per slow (incomplete request) connection"""
+    baseline = process_stats(pid)
+    writers = []
+    for _ in range(idle_connections):
+        try:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(b'GET / HTTP/1.1\r\nHost: bench\r\n')
+            writers.append(writer)
+        except OSError:
+            break
+
+    await asyncio.sleep(2)
+    loaded = process_stats(pid)
+    for writer in writers:
+        writer.close()
+
+    held = max(len(writers), 1)
+    return {
+        'idle_connections': len(writers),
+        'rss_baseline_kb': baseline['rss_kb'],
+        'rss_loaded_kb': loaded['rss_kb'],
+        'kb_per_connection': round((loaded['rss_kb'] - baseline['rss_kb']) / held, 2),
+        'threads': loaded['threads']
+    }
+
+
+def benchmark(mode, args):
+    """Benchmark one server mode in a separate process"""
+    port = free_port()
+    server = multiprocessing.Process(
+        target=run_server,
+        args=(mode, port, args.idle_hold + 30),
+        daemon=True
+    )
+    server.start()
+
+    async def run():
+        await wait_for_port(port)
+        throughput, failures = await measure_throughput(port, args.connections, args.concurrency)
+        await asyncio.sleep(1)
+        pipelined = await measure_keepalive(port, args.connections // args.pipeline_depth or 1,
+                                            args.concurrency, args.pipeline_depth)
+        await asyncio.sleep(1)
+        memory = await measure_idle_memory(port, server.pid, args.idle)
+        return throughput, pipelined, failures, memory
+
+    try:
+        throughput, pipelined, failures, memory = asyncio.run(run())
+    finally:
+        server.terminate()
+        server.join()
+
+    return {'mode': mode, 'connections_per_sec': round(throughput, 1),
+            'pipelined_requests_per_sec': round(pipelined, 1), 'failures': failures, **memory}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark threaded vs asyncio HTTP honeypot modes')
+    parser.add_argument('--mode', choices=['threaded', 'asyncio', 'both'], default='both')
+    parser.add_argument('--connections', type=int, default=5000,
+                        help='Short request/response connections for the throughput test')
+    parser.add_argument('--concurrency', type=int, default=200,
+                        help='Concurrent client connections during the throughput test')
+    parser.add_argument('--pipeline-depth', type=int, default=20,
+                        help='Requests pipelined per keep-alive connection')
+    parser.add_argument('--idle', type=int, default=2000,
+                        help='Slow connections held open for the memory test')
+    parser.add_argument('--idle-hold', type=int, default=10,
+                        help='Seconds the server keeps slow connections before timing out')
+    args = parser.parse_args()
+
+    limit = raise_fd_limit()
+    if args.idle + args.concurrency > limit - 64:
+        print(f"Warning: open file limit {limit} may be too low for {args.idle} idle connections")
+
+    modes = ['threaded', 'asyncio'] if args.mode == 'both' else [args.mode]
+    results = [benchmark(mode, args) for mode in modes]
+
+    print("\n" + "=" * 78)
+    print("HTTP HONEYPOT BENCHMARK")
+    print("=" * 89)
+    print(f"{'Mode':10} {'Conn/s':>10} {'Pipe req/s':>10} {'Failed':>7} {'Idle':>7} {'RSS base':>10} "
+          f"{'RSS load':>10} {'KB/conn':>8} {'Threads':>8}")
+    for result in results:
+        print(f"{result['mode']:10} {result['connections_per_sec']:>10} "
+              f"{result['pipelined_requests_per_sec']:>10} {result['failures']:>7} "
+              f"{result['idle_connections']:>7} {result['rss_baseline_kb']:>10} "
+              f"{result['rss_loaded_kb']:>10} {result['kb_per_connection']:>8} {result['threads']:>8}")
+    print("=" * 89)
+
+
+if __name__ == '__main__':
+    main()
@@ -130,6 +130,7 @@ if command -v ufw &> /dev/null; then
     echo "Setting up UFW firewall rules..."
     sudo ufw allow 2222/tcp comment "SSH Honeypot"
     sudo ufw allow 8080/tcp comment "HTTP Honeypot"
+    sudo ufw allow 8443/tcp comment "HTTPS Honeypot"
     sudo ufw allow 2121/tcp comment "FTP Honeypot"
     sudo ufw allow 2323/tcp comment "Telnet Honeypot"
     sudo ufw allow 12000/tcp comment "Dashboard"
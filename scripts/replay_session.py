@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import time
+import yaml
+import argparse
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from honeypots.recordings import OUTPUT, find_recording, list_recordings, read_recording, to_asciicast
+
+
+def load_directory(config_path):
+    """Recordings directory from the honeypot configuration"""
+    try:
+        with open(config_path, 'r') as f:
+            config = yaml.safe_load(f) or {}
+    except OSError:
+        config = {}
+    return config.get('recordings', {}).get('directory', 'recordings')
+
+
+def resolve(directory, session):
+    """Accept a session id or a path to a recording file"""
+    if os.path.exists(session):
+        return session
+    path = find_recording(directory, session)
+    if path is None:
+        sys.exit(f"Recording not found: {session}")
+    return path
+
+
+def replay(path, speed, max_idle):
+    """Write recorded output to the terminal with its original timing"""
+    header, records = read_recording(path)
+    print(f"# {header['service']} session {header['session_id']} from {header['source_ip']} "
+          f"at {header['timestamp']}", file=sys.stderr)
+
+    previous = 0.0
+    for kind, seconds, data in records:
+        if kind != OUTPUT:
+            continue
+        delay = min(seconds - previous, max_idle) / speed
+        if delay > 0:
+            time.sleep(delay)
+        previous = seconds
+        sys.stdout.buffer.write(data)
+        sys.stdout.buffer.flush()
+    print(file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='List, replay or export recorded SSH/Telnet sessions')
+    parser.add_argument('--config', '-c', default='config/honeypot_config.yaml',
+                        help='Configuration file path')
+    subparsers = parser.add_subparsers(dest='action', required=True)
+
+    list_parser = subparsers.add_parser('list', help='List recent recordings')
+    list_parser.add_argument('--service', choices=['ssh', 'telnet'])
+    list_parser.add_argument('--limit', type=int, default=20)
+
+    replay_parser = subparsers.add_parser('replay', help='Replay a session in this terminal')
+    replay_parser.add_argument('session', help='Session id or recording file')
+    replay_parser.add_argument('--speed', type=float, default=1.0, help='Playback speed multiplier')
+    replay_parser.add_argument('--max-idle', type=float, default=2.0,
+                               help='Cap pauses between outputs at this many seconds')
+
+    export_parser = subparsers.add_parser('export', help='Export a session as asciicast v2')
+    export_parser.add_argument('session', help='Session id or recording file')
+    export_parser.add_argument('--output', '-o', help='Output .cast file (default: stdout)')
+
+    args = parser.parse_args()
+    directory = load_directory(args.config)
+
+    if args.action == 'list':
+        for item in list_recordings(directory, args.service, args.limit):
+            print(f"{item['session_id']:40} {item['bytes']:>10}  {item['path']}")
+    elif args.action == 'replay':
+        replay(resolve(directory, args.session), args.speed, args.max_idle)
+    elif args.action == 'export':
+        cast = to_asciicast(resolve(directory, args.session))
+        if args.output:
+            with open(args.output, 'w') as f:
+                f.write(cast)
+        else:
+            sys.stdout.write(cast)
+
+
+if __name__ == '__main__':
+    main()